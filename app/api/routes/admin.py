@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
+from datetime import date
 
+from app.db import database
 from app.db.database import get_db
+from app.db.pool import pool_status, reset_pool_stats
 from app.models.menu import MenuItem
 from app.models.staff import Staff
-from app.models.order import Order
+from app.models.enums import OrderStatus
 from app.schemas.menu import MenuCreate, MenuResponse, MenuUpdate
 from app.core.config import get_settings
+from app.services.menu_cache import menu_cache
+from app.services.order_history import (
+    ORDER_HISTORY_MAX_PAGE_SIZE,
+    ORDER_HISTORY_PAGE_SIZE,
+    OrderHistoryFilters,
+    order_history_page,
+)
 
 router = APIRouter(
     prefix="/admin",
@@ -72,6 +82,7 @@ def create_menu_item(
     
     menu_item = MenuItem(**item.model_dump())
     db.add(menu_item)
+    menu_cache.invalidate(db)
     db.commit()
     db.refresh(menu_item)
     
@@ -96,6 +107,7 @@ def update_menu_item(
     for field, value in update_data.items():
         setattr(menu_item, field, value)
     
+    menu_cache.invalidate(db)
     db.commit()
     db.refresh(menu_item)
     
@@ -116,6 +128,7 @@ def delete_menu_item(
         raise HTTPException(status_code=404, detail="Menu item not found")
     
     db.delete(menu_item)
+    menu_cache.invalidate(db)
     db.commit()
     
     return {"message": "Menu item deleted successfully"}
@@ -137,12 +150,21 @@ def get_all_menu_items(
 # ==============================
 @router.get("/orders")
 def view_orders(
+    limit: int = Query(ORDER_HISTORY_PAGE_SIZE, ge=1, le=ORDER_HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[OrderStatus] = None,
+    table_number: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """View all orders"""
+    """View orders, newest first, one page at a time"""
     
-    orders = db.query(Order).all()
-    return orders
+    filters = OrderHistoryFilters(start_date, end_date, status, table_number)
+    try:
+        return order_history_page(db, filters, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # ==============================
 # CREATE STAFF
@@ -167,3 +189,21 @@ def create_staff(
     db.commit()
     
     return {"message": "Staff created successfully"}
+
+# ==============================
+# DATABASE POOL STATS
+# ==============================
+@router.get("/db-pool")
+def get_db_pool_stats(reset: bool = False):
+    """Connection pool usage and checkout wait times for the sync and async engines
+
+    Pass reset=true to start a new measuring window after reading.
+    """
+    stats = {
+        "sync": pool_status(database.engine),
+        "async": pool_status(database.async_engine)
+    }
+    if reset:
+        reset_pool_stats(database.engine)
+        reset_pool_stats(database.async_engine)
+    return stats
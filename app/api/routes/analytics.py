@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import Optional
+
+from app.db.database import get_db
+from app.api.routes.sales import date_range
+
+router = APIRouter()
+
+# Reports are CPU-bound pandas work, so these are plain defs and run in the threadpool
+
+
+def run_report(db: Session, name: str, start_date: date, end_date: date, report: str, **params):
+    """Cached report by function name; pandas is imported with the first request, not at startup"""
+    from app.services import analytics
+
+    return analytics.analytics_cache.report(db, name, start_date, end_date, getattr(analytics, report), **params)
+
+
+@router.get("/analytics/items")
+def get_item_popularity(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """Best sellers with order count, revenue share and how often they appear in an order"""
+    start_date, end_date = date_range(start_date, end_date)
+    return run_report(db, "items", start_date, end_date, "item_popularity", limit=limit)
+
+
+@router.get("/analytics/co-occurrence")
+def get_basket_pairs(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=200),
+    min_orders: int = Query(2, ge=1),
+    db: Session = Depends(get_db)
+):
+    """Items ordered together, for combo and upsell suggestions"""
+    start_date, end_date = date_range(start_date, end_date)
+    return run_report(
+        db, "co-occurrence", start_date, end_date, "basket_pairs", limit=limit, min_orders=min_orders
+    )
+
+
+@router.get("/analytics/heatmap")
+def get_hourly_heatmap(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Orders and revenue by weekday and hour"""
+    start_date, end_date = date_range(start_date, end_date)
+    return run_report(db, "heatmap", start_date, end_date, "hourly_heatmap")
+
+
+@router.get("/analytics/tables")
+def get_table_turnover(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Seatings per day, minutes per seating and spend per seating for each table"""
+    start_date, end_date = date_range(start_date, end_date)
+    return run_report(db, "tables", start_date, end_date, "table_turnover")
+
+
+@router.get("/analytics/cache-stats")
+def get_analytics_cache_stats():
+    from app.services.analytics import analytics_cache
+
+    return analytics_cache.stats()
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-import pandas as pd
 import io
 from typing import List
 
@@ -24,6 +23,8 @@ def read_attendance(db: Session = Depends(get_db)):
 # --- THE EXPORT ROUTE ---
 @router.get("/export")
 def export_attendance(db: Session = Depends(get_db)):
+    import pandas as pd
+
     try:
         records = db.query(Attendance).all()
         data = [{"ID": r.id, "Name": r.name, "Status": r.status, "Date": r.date_time} for r in records]
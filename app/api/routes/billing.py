@@ -1,146 +1,167 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.models.order import Order, OrderItem
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import Optional
+import asyncio
+
+from app.db.database import get_db, get_async_db
+from app.models.order import Order, OrderStatus, PaymentStatus
 from app.models.customer import Customer
-from app.models.menu import MenuItem
+from app.services.job_queue import job_queue, PermanentJobError
+from app.services.bill_jobs import BILL_EMAIL, BILL_PDF, load_bill_details, bill_document_id
+from app.services.bill_cache import bill_cache, bill_key
+from app.services.menu_cache import etag_matches
+from app.services.invoice_export import INVOICE_PDF_MAX_INVOICES, count_invoices, export_invoices_pdf, export_invoices_zip
+from app.services.pdf_pool import pdf_renderer, PDFRenderBusy
 from app.services.email_service import email_service
-from app.services.pdf_service import pdf_service
+from app.services.order_loader import load_order_items
+from app.services.order_archive import find_order
+from app.services.sales_rollup import record_paid_orders
 from app.models.order_session import OrderSession, SessionStatus
-from app.models.order import OrderStatus, PaymentStatus
-
-
-
-import os
-from datetime import datetime
 
 router = APIRouter()
 
 @router.post("/billing/send-email/{order_id}")
 def send_bill_email(
     order_id: int,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
-    """Send bill email with PDF attachment"""
+    """Queue the bill PDF + e-mail; poll /api/jobs/{job_id} for the outcome"""
     
-    # Get order details
-    order = db.query(Order).filter(Order.id == order_id).first()
+    # Validate up front so obvious mistakes fail fast instead of dead-lettering
+    order = find_order(db, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    # Get customer details
     customer = db.query(Customer).filter(Customer.id == order.customer_id).first()
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    # Get order items
-    order_items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
+    job = job_queue.enqueue(db, BILL_EMAIL, {"order_id": order.id})
     
-    items_list = []
-    for item in order_items:
-        menu_item = db.query(MenuItem).filter(MenuItem.id == item.menu_item_id).first()
-        if menu_item:
-            items_list.append({
-                "name": menu_item.name,
-                "quantity": item.quantity,
-                "price": item.price
-            })
-    
-    order_details = {
+    return {
+        "message": "Bill is being sent to your email",
+        "email": customer.email,
         "order_number": order.order_number,
-        "table_number": order.table_number,
-        "total_amount": order.total_price,
-        "payment_method": order.payment_method,
-        "items": items_list
-    }
-    
-    customer_info = {
-        "name": customer.name,
-        "phone": customer.phone_number,
-        "email": customer.email
+        "job_id": job.id
     }
-    
-    # Generate PDF
-    try:
-        pdf_path = pdf_service.generate_bill_pdf(order_details, customer_info)
-        
-        # Send email in background
-        background_tasks.add_task(
-            email_service.send_bill_email,
-            customer.email,
-            customer.name,
-            order_details,
-            pdf_path
-        )
-        
-        return {
-            "message": "Bill is being sent to your email",
-            "email": customer.email,
-            "order_number": order.order_number
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to generate bill: {str(e)}")
 
 @router.get("/billing/download/{order_id}")
 def download_bill_pdf(order_id: int, db: Session = Depends(get_db)):
-    """Generate and return bill PDF for download"""
-    
-    # Get order details
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+    """Return the cached bill's download_url, or queue rendering and return the job"""
     
-    # Get customer details
-    customer = db.query(Customer).filter(Customer.id == order.customer_id).first()
-    if not customer:
-        raise HTTPException(status_code=404, detail="Customer not found")
+    try:
+        order, order_details, customer_info = load_bill_details(db, order_id)
+    except PermanentJobError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     
-    # Get order items
-    order_items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
+    if bill_cache.contains(bill_key(order_details, customer_info)):
+        return {
+            "message": "PDF is ready",
+            "status": "ready",
+            "download_url": f"/api/billing/pdf/{order.id}",
+            "filename": f"bill_{order.order_number}.pdf"
+        }
     
-    items_list = []
-    for item in order_items:
-        menu_item = db.query(MenuItem).filter(MenuItem.id == item.menu_item_id).first()
-        if menu_item:
-            items_list.append({
-                "name": menu_item.name,
-                "quantity": item.quantity,
-                "price": item.price
-            })
+    job = job_queue.enqueue(db, BILL_PDF, {"order_id": order.id})
     
-    order_details = {
-        "order_number": order.order_number,
-        "table_number": order.table_number,
-        "total_amount": order.total_price,
-        "payment_method": order.payment_method,
-        "items": items_list
+    return {
+        "message": "PDF is being generated",
+        "job_id": job.id,
+        "status_url": f"/api/jobs/{job.id}",
+        "filename": f"bill_{order.order_number}.pdf"
     }
+
+@router.get("/billing/pdf/{order_id}")
+async def stream_bill_pdf(order_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Stream the bill from the cache, rendering it in the PDF process pool on a miss"""
+    try:
+        order, order_details, customer_info = await db.run_sync(load_bill_details, order_id)
+    except PermanentJobError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     
-    customer_info = {
-        "name": customer.name,
-        "phone": customer.phone_number,
-        "email": customer.email
-    }
+    key = bill_key(order_details, customer_info)
+    etag = f'"{key}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
     
-    # Generate PDF
-    try:
-        pdf_path = pdf_service.generate_bill_pdf(order_details, customer_info)
-        
-        return {
-            "message": "PDF generated successfully",
-            "download_url": f"/api/billing/file/{os.path.basename(pdf_path)}",
-            "filename": f"bill_{order.order_number}.pdf"
+    # The cache reads and writes files, so it runs in a thread like the rendering
+    pdf = await asyncio.to_thread(bill_cache.get, key)
+    if pdf is None:
+        try:
+            pdf = await pdf_renderer.render_bill_pdf(order_details, customer_info)
+        except PDFRenderBusy as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+        await asyncio.to_thread(bill_cache.put, key, pdf, bill_document_id(order_details))
+    
+    return StreamingResponse(
+        iter([pdf]),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename=bill_{order.order_number}.pdf",
+            "Content-Length": str(len(pdf)),
+            "ETag": etag
         }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {str(e)}")
+    )
+
+@router.get("/billing/invoices/export")
+def export_invoices(
+    start_date: date,
+    end_date: Optional[date] = None,
+    format: str = Query("zip", pattern="^(zip|pdf)$"),
+    db: Session = Depends(get_db)
+):
+    """Every closed session invoice in a date range, as a streamed ZIP or one merged PDF
+
+    The merged PDF is built whole in the PDF pool before it is sent, so it
+    is limited to INVOICE_PDF_MAX_INVOICES invoices; the ZIP has no limit.
+    """
+    end_date = end_date or start_date
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+    
+    invoices = count_invoices(db, start_date, end_date)
+    if not invoices:
+        raise HTTPException(status_code=404, detail="No closed sessions in this date range")
+    
+    filename = f"invoices_{start_date.isoformat()}_{end_date.isoformat()}"
+    if format == "pdf":
+        if invoices > INVOICE_PDF_MAX_INVOICES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"{invoices} invoices is over the merged PDF limit of {INVOICE_PDF_MAX_INVOICES}; use format=zip"
+            )
+        try:
+            pdf = export_invoices_pdf(start_date, end_date)
+        except PDFRenderBusy as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+        return Response(
+            content=pdf,
+            media_type="application/pdf",
+            headers={"Content-Disposition": f"attachment; filename={filename}.pdf"}
+        )
+    
+    return StreamingResponse(
+        export_invoices_zip(start_date, end_date),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}.zip"}
+    )
+
+@router.get("/billing/email-stats")
+def get_email_stats():
+    """Throughput and connection reuse counters for the pooled SMTP sender"""
+    return email_service.stats()
+
+@router.get("/billing/pdf-stats")
+def get_pdf_stats():
+    """Render processes and queue depth of the PDF pool, plus bill cache usage"""
+    return {**pdf_renderer.stats(), "cache": bill_cache.stats()}
 
 @router.post("/billing/place-order-with-email")
 def place_order_with_email(
     order_data: dict,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Place order and automatically send bill email"""
@@ -173,7 +194,7 @@ def place_order_with_email(
             db.commit()
         
         # Create order (using existing order service logic)
-        from app.services.order_service import create_order
+        from app.services.create_order import create_order
         
         order = create_order(
             db=db,
@@ -182,50 +203,20 @@ def place_order_with_email(
             items=order_data.get("items", [])
         )
         
-        # Get order items for email
-        order_items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
-        items_list = []
-        for item in order_items:
-            menu_item = db.query(MenuItem).filter(MenuItem.id == item.menu_item_id).first()
-            if menu_item:
-                items_list.append({
-                    "name": menu_item.name,
-                    "quantity": item.quantity,
-                    "price": item.price
-                })
-        
-        order_details = {
-            "order_number": order.order_number,
-            "table_number": order.table_number,
-            "total_amount": order.total_price,
-            "payment_method": order_data.get("payment_method", "UPI"),
-            "items": items_list
-        }
-        
-        customer_info = {
-            "name": customer.name,
-            "phone": customer.phone_number,
-            "email": customer.email
-        }
-        
-        # Generate PDF and send email in background
-        pdf_path = pdf_service.generate_bill_pdf(order_details, customer_info)
-        background_tasks.add_task(
-            email_service.send_bill_email,
-            customer.email,
-            customer.name,
-            order_details,
-            pdf_path
-        )
+        # PDF rendering and SMTP happen on the job workers
+        job = job_queue.enqueue(db, BILL_EMAIL, {"order_id": order.id})
         
         return {
             "message": "Order placed successfully! Bill will be sent to your email.",
             "order_id": order.id,
             "order_number": order.order_number,
             "total": order.total_price,
-            "email": customer.email
+            "email": customer.email,
+            "job_id": job.id
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to place order: {str(e)}")
     
@@ -250,22 +241,20 @@ def generate_session_bill(session_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="No orders found")
 
     subtotal = 0
+    items_by_order = load_order_items(db, (order.id for order in orders))
 
     for order in orders:
-        order_items = db.query(OrderItem).filter(
-            OrderItem.order_id == order.id
-        ).all()
-
-        for item in order_items:
+        for item, _ in items_by_order.get(order.id, []):
             subtotal += float(item.price) * item.quantity
 
-        order.status = OrderStatus.PAID
-        order.payment_status = PaymentStatus.COMPLETED
+        order.status = OrderStatus.COMPLETED
+        order.payment_status = PaymentStatus.PAID
 
     gst = subtotal * 0.05
     total = subtotal + gst
 
     session.status = SessionStatus.CLOSED
+    record_paid_orders(db, orders)
 
     db.commit()
 
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.models.job import Job, JobStatus
+from app.services.job_queue import job_queue, job_to_dict
+
+router = APIRouter()
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """Poll a background job (bill PDF, e-mail, WhatsApp)"""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_dict(job)
+
+
+@router.get("/jobs")
+def list_dead_jobs(db: Session = Depends(get_db)):
+    """Dead-lettered jobs, newest first"""
+    jobs = db.query(Job).filter(
+        Job.status == JobStatus.DEAD
+    ).order_by(Job.id.desc()).limit(100).all()
+    return [job_to_dict(job) for job in jobs]
+
+
+@router.post("/jobs/{job_id}/retry")
+def retry_job(job_id: int, db: Session = Depends(get_db)):
+    """Requeue a dead-lettered job"""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != JobStatus.DEAD:
+        raise HTTPException(status_code=400, detail="Only dead jobs can be retried")
+    return job_to_dict(job_queue.retry(db, job))
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.models.order import Order, OrderItem
-from app.models.menu import MenuItem
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.db.database import get_async_db
+from app.models.order import Order
 from app.models.enums import OrderStatus
+from app.services.order_loader import load_order_items
 
 router = APIRouter()
 
@@ -11,38 +12,33 @@ router = APIRouter()
 # GET KITCHEN ORDERS
 # ---------------------------------------------------------
 @router.get("/kitchen/orders")
-def get_kitchen_orders(
+async def get_kitchen_orders(
     table_number: str | None = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
 
-    query = db.query(Order).filter(
+    query = select(Order).where(
         Order.status != OrderStatus.SERVED
     )
 
     # 🔥 Optional table filter
     if table_number:
-        query = query.filter(Order.table_number == table_number)
+        query = query.where(Order.table_number == table_number)
 
-    orders = query.order_by(Order.created_at.desc()).all()
+    orders = (await db.execute(query.order_by(Order.created_at.desc()))).scalars().all()
+
+    items_by_order = await db.run_sync(load_order_items, [order.id for order in orders])
 
     result = []
 
     for order in orders:
 
-        items = (
-            db.query(OrderItem, MenuItem)
-            .join(MenuItem, OrderItem.menu_item_id == MenuItem.id)
-            .filter(OrderItem.order_id == order.id)
-            .all()
-        )
-
         formatted_items = [
             {
-                "name": menu.name,
+                "name": name,
                 "quantity": item.quantity
             }
-            for item, menu in items
+            for item, name in items_by_order.get(order.id, [])
         ]
 
         result.append({
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.db.database import get_db
 from app.models.menu import MenuItem
 from app.schemas.menu import MenuCreate, MenuResponse, MenuUpdate
+from app.services.menu_cache import menu_cache, etag_matches
 
 router = APIRouter(
     tags=["Menu"]
@@ -18,6 +19,7 @@ def create_menu(item: MenuCreate, db: Session = Depends(get_db)):
     """Create a new menu item"""
     new_item = MenuItem(**item.model_dump())
     db.add(new_item)
+    menu_cache.invalidate(db)
     db.commit()
     db.refresh(new_item)
     return new_item
@@ -28,19 +30,22 @@ def create_menu(item: MenuCreate, db: Session = Depends(get_db)):
 # ==============================
 @router.get("/menu", response_model=List[MenuResponse])
 def get_menu(
+    request: Request,
     category: Optional[str] = Query(None, description="Filter by category"),
     db: Session = Depends(get_db)
 ):
     """
     Get all available menu items.
     Single-restaurant system (no restaurant_id filter).
+    Served from the in-memory menu cache; repeat scans get 304 via ETag.
     """
-    query = db.query(MenuItem).filter(MenuItem.is_available == True)
+    etag, body = menu_cache.get(db, category)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
 
-    if category:
-        query = query.filter(MenuItem.category == category)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
 
-    return query.order_by(MenuItem.category, MenuItem.name).all()
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 # ==============================
@@ -73,6 +78,7 @@ def update_menu_item(
     for field, value in update_data.items():
         setattr(item, field, value)
 
+    menu_cache.invalidate(db)
     db.commit()
     db.refresh(item)
     return item
@@ -93,6 +99,7 @@ def update_availability(
         raise HTTPException(status_code=404, detail="Item not found")
 
     item.is_available = available
+    menu_cache.invalidate(db)
     db.commit()
 
     return {
@@ -111,6 +118,7 @@ def delete_menu_item(item_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Item not found")
 
     db.delete(item)
+    menu_cache.invalidate(db)
     db.commit()
 
     return {"message": "Menu item deleted successfully"}
@@ -1,17 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 import random
-import io
 
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.models.order import (
     Order,
-    OrderItem,
     OrderStatus,
     PaymentMethod,
     PaymentStatus,
@@ -21,7 +20,16 @@ from app.models.customer import Customer
 from app.models.menu import MenuItem
 from app.services.websocket_service import websocket_manager
 from app.services.order_session_service import OrderSessionService
-from app.services.pdf_service import PDFService
+from app.services.order_loader import build_kitchen_board
+from app.services.create_order import price_order_items, insert_order_items
+from app.services.order_archive import find_order, find_session, is_archived, load_items, session_orders
+from app.services.order_history import (
+    ORDER_HISTORY_MAX_PAGE_SIZE,
+    ORDER_HISTORY_PAGE_SIZE,
+    OrderHistoryFilters,
+    order_history_page,
+    stream_order_history_ndjson,
+)
 
 router = APIRouter()
 
@@ -47,15 +55,18 @@ class UpdateOrderStatusRequest(BaseModel):
 
 def generate_order_number():
     now = datetime.now().strftime("%Y%m%d%H%M%S")
-    random_part = random.randint(100, 999)
+    random_part = random.randint(100000, 999999)
     return f"ORD{now}{random_part}"
 
 # -------------------- Place Order --------------------
 
-@router.post("/orders")
-async def place_order(order_request: PlaceOrderRequest, db: Session = Depends(get_db)):
-    if not order_request.table_number.strip():
-        raise HTTPException(status_code=400, detail="Table number is required")
+def save_order(db: Session, order_request: PlaceOrderRequest) -> dict:
+    """Create customer, session, order and items; runs inside AsyncSession.run_sync"""
+    # One IN (...) lookup for every line item, validated before anything is written:
+    # create_or_get_session below commits the customer and session
+    total_price, order_items_data = price_order_items(
+        db, [item.model_dump() for item in order_request.items]
+    )
 
     customer = db.query(Customer).filter(
         Customer.phone_number == order_request.phone_number
@@ -68,8 +79,8 @@ async def place_order(order_request: PlaceOrderRequest, db: Session = Depends(ge
             email=order_request.email,
         )
         db.add(customer)
-        db.commit()
-        db.refresh(customer)
+        db.flush()
+    customer_id = customer.id
 
     if order_request.session_id:
         session = db.query(OrderSession).filter(
@@ -80,35 +91,18 @@ async def place_order(order_request: PlaceOrderRequest, db: Session = Depends(ge
         session_id = order_request.session_id
     else:
         session = OrderSessionService.create_or_get_session(
-            db, order_request.table_number, customer.id
+            db, order_request.table_number, customer_id
         )
         session_id = session.session_id
 
-    total_price = 0
-    order_items_data = []
-
-    for item_request in order_request.items:
-        menu_item = db.query(MenuItem).filter(MenuItem.id == item_request.menu_item_id).first()
-        if not menu_item:
-            raise HTTPException(status_code=404, detail="Menu item not found")
-
-        item_total = float(menu_item.price) * item_request.quantity
-        total_price += item_total
-        order_items_data.append({
-            "menu_item_id": menu_item.id,
-            "quantity": item_request.quantity,
-            "price": menu_item.price,
-            "subtotal": item_total,
-            "special_instructions": item_request.special_instructions,
-        })
-
+    placed_at = datetime.now()
     order = Order(
         order_number=generate_order_number(),
         session_id=session_id,
-        customer_id=customer.id,
+        customer_id=customer_id,
         table_number=order_request.table_number,
-        order_date=datetime.now().date(),
-        order_time=datetime.now().time(),
+        order_date=placed_at.date(),
+        order_time=placed_at.time(),
         total_price=total_price,
         subtotal=total_price,
         payment_method=order_request.payment_method,
@@ -117,22 +111,44 @@ async def place_order(order_request: PlaceOrderRequest, db: Session = Depends(ge
         special_instructions=order_request.special_instructions,
     )
 
+    # Order and items go out in the same transaction
     db.add(order)
-    db.commit()
-    db.refresh(order)
-
-    for item in order_items_data:
-        db.add(OrderItem(order_id=order.id, **item))
+    db.flush()
+    insert_order_items(db, order.id, order_items_data)
 
-    db.commit()
-    await websocket_manager.broadcast_new_order({
+    new_order = {
         "id": order.id,
         "order_number": order.order_number,
         "status": order.status.value,
-        "table_number": order.table_number
-    })
+        "table_number": order.table_number,
+        "session_id": session_id,
+        # Sales fields feed the live dashboard counters on every worker
+        "placed_at": placed_at.isoformat(),
+        "total_price": float(total_price),
+        "items": [
+            {
+                "menu_item_id": item["menu_item_id"],
+                # Already in the identity map from price_order_items, so no query
+                "name": db.get(MenuItem, item["menu_item_id"]).name,
+                "quantity": item["quantity"],
+                "subtotal": item["subtotal"],
+            }
+            for item in order_items_data
+        ],
+    }
+    db.commit()
+    return new_order
 
-    return {"id": order.id, "order_number": order.order_number, "session_id": session_id}
+@router.post("/orders")
+async def place_order(order_request: PlaceOrderRequest, db: AsyncSession = Depends(get_async_db)):
+    if not order_request.table_number.strip():
+        raise HTTPException(status_code=400, detail="Table number is required")
+
+    new_order = await db.run_sync(save_order, order_request)
+
+    await websocket_manager.broadcast_new_order(new_order)
+
+    return {"id": new_order["id"], "order_number": new_order["order_number"], "session_id": new_order["session_id"]}
 
 # -------------------- Update Order Status (FIXED) --------------------
 
@@ -140,9 +156,9 @@ async def place_order(order_request: PlaceOrderRequest, db: Session = Depends(ge
 async def update_order_status(
     order_id: int,
     payload: UpdateOrderStatusRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = (await db.execute(select(Order).where(Order.id == order_id))).scalars().first()
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
@@ -152,28 +168,29 @@ async def update_order_status(
     except KeyError:
         raise HTTPException(status_code=400, detail=f"Invalid status: {payload.status}")
 
-    db.commit()
-    db.refresh(order)
+    await db.commit()
 
     # Notify Tracking Page via WebSocket
-    await websocket_manager.broadcast_order_update(order_id, order.status.value)
+    await websocket_manager.broadcast_order_update(
+        order_id, order.status.value, order.table_number, order.session_id
+    )
 
     return {"order_id": order.id, "status": order.status.value}
 
 # -------------------- Get Kitchen Orders (FIXED DISAPPEARING) --------------------
 
 @router.get("/kitchen/orders")
-def get_kitchen_orders(status: Optional[str] = None, db: Session = Depends(get_db)):
-    query = db.query(Order)
+async def get_kitchen_orders(status: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    query = select(Order)
 
     if status:
         try:
-            query = query.filter(Order.status == OrderStatus[status.upper()])
+            query = query.where(Order.status == OrderStatus[status.upper()])
         except KeyError:
             raise HTTPException(status_code=400, detail="Invalid status")
     else:
         # FIX: Include KITCHEN and READY so they STAY on the screen
-        query = query.filter(
+        query = query.where(
             Order.status.in_([
                 OrderStatus.PENDING,
                 OrderStatus.KITCHEN,
@@ -181,35 +198,14 @@ def get_kitchen_orders(status: Optional[str] = None, db: Session = Depends(get_d
             ])
         )
 
-    orders = query.order_by(Order.created_at).all()
-    result = []
-
-    for order in orders:
-        customer = db.query(Customer).filter(Customer.id == order.customer_id).first()
-        items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
-
-        result.append({
-            "id": order.id,
-            "order_number": order.order_number,
-            "table_number": order.table_number,
-            "customer_name": customer.name if customer else "Guest",
-            "status": order.status.value,
-            "total_price": float(order.total_price),
-            "created_at": order.created_at.isoformat(),
-            "items": [
-                {
-                    "name": db.query(MenuItem).get(item.menu_item_id).name,
-                    "quantity": item.quantity,
-                } for item in items
-            ],
-        })
-    return result
+    orders = (await db.execute(query.order_by(Order.created_at))).scalars().all()
+    return await db.run_sync(build_kitchen_board, orders)
 
 # -------------------- Get Order by ID (For Track Page) --------------------
 
 @router.get("/orders/{order_id}")
-def get_order_by_id(order_id: int, db: Session = Depends(get_db)):
-    order = db.query(Order).filter(Order.id == order_id).first()
+async def get_order_by_id(order_id: int, db: AsyncSession = Depends(get_async_db)):
+    order = await db.run_sync(find_order, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
@@ -221,25 +217,26 @@ def get_order_by_id(order_id: int, db: Session = Depends(get_db)):
         "total_price": float(order.total_price),
         "session_id": order.session_id,  # ADD THIS LINE
         "created_at": order.created_at.isoformat(),
+        "archived": is_archived(order),
     }
 
 # -------------------- Get Full Session Orders (For Multi-Card View) --------------------
 
 @router.get("/sessions/{session_id}")
-def get_session_orders(session_id: str, db: Session = Depends(get_db)):
-    # 1. Fetch the session details
-    session_obj = db.query(OrderSession).filter(OrderSession.session_id == session_id).first()
+async def get_session_orders(session_id: str, db: AsyncSession = Depends(get_async_db)):
+    # 1. Fetch the session details (closed sessions may have moved to the archive)
+    session_obj = await db.run_sync(find_session, session_id)
     if not session_obj:
         raise HTTPException(status_code=404, detail="Session not found")
 
     # 2. Fetch all orders belonging to this session
-    orders = db.query(Order).filter(Order.session_id == session_id).order_by(Order.created_at.asc()).all()
-    
+    orders = await db.run_sync(session_orders, session_obj)
+
+    # 3. Fetch items for every order in one query
+    items_by_order = await db.run_sync(load_items, orders)
+
     result_orders = []
     for order in orders:
-        # Fetch items for each order
-        items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
-        
         result_orders.append({
             "id": order.id,
             "order_number": order.order_number,
@@ -248,11 +245,11 @@ def get_session_orders(session_id: str, db: Session = Depends(get_db)):
             "created_at": order.created_at.isoformat(),
             "items": [
                 {
-                    "name": db.query(MenuItem).get(item.menu_item_id).name,
+                    "name": name,
                     "quantity": item.quantity,
                     "price": float(item.price),
                     "subtotal": float(item.subtotal)
-                } for item in items
+                } for item, name in items_by_order.get(order.id, [])
             ]
         })
 
@@ -260,38 +257,48 @@ def get_session_orders(session_id: str, db: Session = Depends(get_db)):
         "session_id": session_id,
         "table_number": session_obj.table_number,
         "status": session_obj.status.value,
+        "archived": is_archived(session_obj),
         "orders": result_orders
     }
 
+# -------------------- Finish Meal Session (For Order Placed Page) --------------------
+
+@router.post("/sessions/{session_id}/finish")
+async def finish_session(session_id: str, db: AsyncSession = Depends(get_async_db)):
+    # The session service stays synchronous; run_sync keeps it off the event loop
+    try:
+        return await db.run_sync(OrderSessionService.finish_meal_session, session_id)
+    except ValueError as e:
+        status_code = 404 if str(e) == "Session not found" else 400
+        raise HTTPException(status_code=status_code, detail=str(e))
+
 # -------------------- Get All Orders (For Admin Orders Page) --------------------
 
 @router.get("/orders")
-def get_all_orders(db: Session = Depends(get_db)):
-    orders = db.query(Order).order_by(Order.created_at.desc()).all()
-
-    result = []
+async def get_all_orders(
+    limit: int = Query(ORDER_HISTORY_PAGE_SIZE, ge=1, le=ORDER_HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[OrderStatus] = None,
+    table_number: Optional[str] = None,
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Newest orders first, one page at a time; pass next_cursor back to continue
 
-    for order in orders:
-        customer = db.query(Customer).filter(Customer.id == order.customer_id).first()
-        items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
+    stream=true returns every matching order as NDJSON instead.
+    """
+    filters = OrderHistoryFilters(start_date, end_date, status, table_number)
 
-        result.append({
-            "id": order.id,
-            "order_number": order.order_number,
-            "customer_name": customer.name if customer else "Guest",
-            "customer_phone": customer.phone_number if customer else "",
-            "order_date": order.order_date.isoformat() if order.order_date else "",
-            "order_time": str(order.order_time) if order.order_time else "",
-            "status": order.status.value,
-            "total_price": float(order.total_price),
-            "items": [
-                {
-                    "item_name": db.query(MenuItem).get(item.menu_item_id).name,
-                    "quantity": item.quantity,
-                    "price": float(item.price)
-                }
-                for item in items
-            ]
-        })
+    if stream:
+        return StreamingResponse(
+            stream_order_history_ndjson(filters),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": "attachment; filename=orders.ndjson"}
+        )
 
-    return result
+    try:
+        return await db.run_sync(order_history_page, filters, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from typing import Optional
+
+from app.db.database import get_db
+from app.schemas.order import TodaySalesResponse
+from app.services.live_sales import live_sales
+from app.services.sales_rollup import category_sales, daily_sales, hourly_sales, today_sales, top_items
+
+router = APIRouter()
+
+
+def date_range(start_date: Optional[date], end_date: Optional[date], default_days: int = 30):
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=default_days - 1)
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+    return start_date, end_date
+
+
+@router.get("/sales/today", response_model=TodaySalesResponse)
+def get_today_sales(db: Session = Depends(get_db)):
+    """Today's paid revenue for the dashboard header"""
+    return today_sales(db)
+
+
+@router.get("/sales/live")
+async def get_live_sales():
+    """Today so far plus the last 15 minutes and hour, from in-memory counters
+
+    Runs on the event loop because the counters are updated there; the
+    dashboard topic on /ws pushes the same shape on every change.
+    """
+    return live_sales.snapshot()
+
+
+@router.get("/sales/daily")
+def get_daily_sales(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Revenue per day, last 30 days by default"""
+    start_date, end_date = date_range(start_date, end_date)
+    return daily_sales(db, start_date, end_date)
+
+
+@router.get("/sales/hourly")
+def get_hourly_sales(day: Optional[date] = None, db: Session = Depends(get_db)):
+    """Revenue per hour for one day, today by default"""
+    return hourly_sales(db, day or date.today())
+
+
+@router.get("/sales/categories")
+def get_category_sales(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    start_date, end_date = date_range(start_date, end_date)
+    return category_sales(db, start_date, end_date)
+
+
+@router.get("/sales/items")
+def get_top_items(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Best sellers by quantity"""
+    start_date, end_date = date_range(start_date, end_date)
+    return top_items(db, start_date, end_date, limit)
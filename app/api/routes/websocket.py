@@ -1,19 +1,18 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from app.services.websocket_service import websocket_manager
-import json
+from app.services.websocket_service import websocket_manager, parse_topics, parse_last_seq
 
 router = APIRouter()
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    await websocket_manager.connect(websocket)
+    topics = parse_topics(websocket.query_params.get("topics"))
+    last_seq = parse_last_seq(websocket.query_params.get("last_seq"))
+    await websocket_manager.connect(websocket, topics, last_seq)
     try:
         while True:
-            # Keep connection alive and listen for messages
+            # Keep connection alive and listen for subscribe/unsubscribe messages
             data = await websocket.receive_text()
-            # Handle any incoming messages if needed
-            message = json.loads(data)
-            print(f"📨 Received message: {message}")
+            await websocket_manager.handle_message(websocket, data)
     except WebSocketDisconnect:
         websocket_manager.disconnect(websocket)
         print("🔌 WebSocket disconnected")
@@ -25,6 +25,13 @@ def validate_database_url():
     try:
         parsed = urlparse(database_url)
 
+        # SQLite (local benchmarks) has a file path instead of a host
+        if parsed.scheme.startswith("sqlite"):
+            if not parsed.path.lstrip('/'):
+                raise ValueError("SQLite URL needs a database file path")
+            print(f"Database URL loaded: {database_url}")
+            return database_url
+
         if not parsed.scheme or not parsed.netloc or not parsed.path.lstrip('/'):
             raise ValueError("Invalid URL structure")
 
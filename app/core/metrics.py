@@ -0,0 +1,364 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+# Per-worker snapshots are written here so any worker can serve totals for all of them
+METRICS_DIR = os.getenv("METRICS_DIR", "temp_metrics")
+# Seconds between snapshot writes; a snapshot older than three intervals belongs to a dead worker
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# (name, type, help, label names, {label values: value})
+Family = Tuple[str, str, str, Sequence[str], Dict[tuple, object]]
+
+
+class MetricsRegistry:
+    """Counters, up/down gauges and histograms kept in per-thread shards
+
+    Every thread writes only to its own dict, so recording never takes a
+    lock; a scrape adds the shards together. Collectors add values read at
+    scrape time (pool usage, open sockets).
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        self.shards: List[dict] = []
+        self.metrics: Dict[str, "Metric"] = {}
+        self.collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def shard(self) -> dict:
+        shard = getattr(self.local, "values", None)
+        if shard is None:
+            shard = self.local.values = {}
+            # list.append is atomic, and happens once per thread
+            self.shards.append(shard)
+        return shard
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> "Counter":
+        return self.register(Counter(self, name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> "Gauge":
+        return self.register(Gauge(self, name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> "Histogram":
+        return self.register(Histogram(self, name, help, labels, buckets))
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collect: Callable[[], Iterable[Family]]):
+        self.collectors.append(collect)
+
+    def collect(self) -> Dict[str, dict]:
+        """This worker's values as {name: {type, help, labels, buckets, samples}}"""
+        families = {
+            name: {
+                "type": metric.type,
+                "help": metric.help,
+                "labels": list(metric.labels),
+                "buckets": list(getattr(metric, "buckets", ())),
+                "samples": {}
+            }
+            for name, metric in self.metrics.items()
+        }
+        for shard in list(self.shards):
+            # dict() copies in one step under the GIL, even while the owner thread writes
+            for (name, values), value in dict(shard).items():
+                merge_sample(families[name], values, value)
+
+        for collect in self.collectors:
+            try:
+                for name, kind, help, labels, samples in collect():
+                    family = families.setdefault(name, {
+                        "type": kind, "help": help, "labels": list(labels), "buckets": [], "samples": {}
+                    })
+                    for values, value in samples.items():
+                        merge_sample(family, values, value)
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+        return families
+
+
+def merge_sample(family: dict, values: tuple, value):
+    samples = family["samples"]
+    current = samples.get(values)
+    if family["type"] == "histogram":
+        if current is None:
+            samples[values] = list(value)
+        else:
+            samples[values] = [a + b for a, b in zip(current, value)]
+    else:
+        samples[values] = (current or 0) + value
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, registry: MetricsRegistry, name: str, help: str, labels: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+
+    def key(self, labels: dict) -> tuple:
+        return self.name, tuple(str(labels[label]) for label in self.labels)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        shard = self.registry.shard()
+        key = self.key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+
+class Gauge(Counter):
+    """An up/down value such as requests in flight; shards hold each thread's net change"""
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, registry: MetricsRegistry, name: str, help: str, labels: Sequence[str], buckets: Sequence[float]):
+        super().__init__(registry, name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        shard = self.registry.shard()
+        key = self.key(labels)
+        counts = shard.get(key)
+        if counts is None:
+            # One count per bucket, one for +Inf, then the sum
+            counts = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+
+# -------------------- Exposition --------------------
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def label_text(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render(families: Dict[str, dict]) -> str:
+    """Prometheus text exposition format (version 0.0.4)"""
+    lines = []
+    for name in sorted(families):
+        family = families[name]
+        if not family["samples"]:
+            continue
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        labels = family["labels"]
+        for values in sorted(family["samples"]):
+            value = family["samples"][values]
+            if family["type"] != "histogram":
+                lines.append(f"{name}{label_text(labels, values)} {format_value(value)}")
+                continue
+
+            cumulative = 0
+            bounds = [format_value(float(bound)) for bound in family["buckets"]] + ["+Inf"]
+            for bound, count in zip(bounds, value[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{label_text(labels, values, ('le', bound))} {cumulative}")
+            lines.append(f"{name}_sum{label_text(labels, values)} {format_value(value[-1])}")
+            lines.append(f"{name}_count{label_text(labels, values)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+# -------------------- Multi-worker aggregation --------------------
+
+class WorkerMetrics:
+    """Writes this worker's snapshot to METRICS_DIR and merges every live worker's on scrape
+
+    Each uvicorn worker process has its own registry. Snapshots are plain
+    JSON files named by pid; files not refreshed for three flush intervals
+    belong to workers that are gone and are removed.
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: str = METRICS_DIR, interval: float = METRICS_FLUSH_INTERVAL):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"{os.getpid()}.json")
+
+    def write(self, families: Optional[Dict[str, dict]] = None):
+        families = families if families is not None else self.registry.collect()
+        snapshot = {
+            name: {**family, "samples": [[list(values), value] for values, value in family["samples"].items()]}
+            for name, family in families.items()
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(snapshot, f)
+        os.replace(self.path + ".tmp", self.path)
+
+    def aggregate(self) -> Dict[str, dict]:
+        """Totals over every live worker, this one included (freshly collected)"""
+        families = self.registry.collect()
+        try:
+            self.write(families)
+        except OSError as e:
+            print(f"Metrics snapshot write failed: {e}")
+            return families
+
+        stale = time.time() - 3 * self.interval
+        for filename in os.listdir(self.directory):
+            path = os.path.join(self.directory, filename)
+            if not filename.endswith(".json") or path == self.path:
+                continue
+            try:
+                if os.path.getmtime(path) < stale:
+                    os.remove(path)
+                    continue
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            for name, family in snapshot.items():
+                merged = families.setdefault(name, {**family, "samples": {}})
+                for values, value in family["samples"]:
+                    merge_sample(merged, tuple(values), value)
+        return families
+
+    async def flush_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.write)
+            except Exception as e:
+                print(f"Metrics snapshot write failed: {e}")
+
+    async def start(self):
+        self.task = asyncio.create_task(self.flush_loop())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+# Global registry and this worker's exporter
+metrics = MetricsRegistry()
+worker_metrics = WorkerMetrics(metrics)
+
+# -------------------- Request metrics --------------------
+
+HTTP_REQUESTS = metrics.counter("http_requests_total", "HTTP requests by route, method and status", ("method", "route", "status"))
+HTTP_LATENCY = metrics.histogram("http_request_duration_seconds", "HTTP request latency, including streaming the body", ("method", "route"))
+HTTP_IN_FLIGHT = metrics.gauge("http_requests_in_flight", "HTTP requests being handled")
+HTTP_DB_QUERIES = metrics.histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+DB_QUERIES = metrics.counter("db_queries_total", "SQL statements executed, including background jobs")
+
+
+class RequestStats:
+    __slots__ = ("queries",)
+
+    def __init__(self):
+        self.queries = 0
+
+
+# Set by MetricsMiddleware; sync routes see the same object from the threadpool
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def count_query(conn, cursor, statement, parameters, context, executemany):
+    DB_QUERIES.inc()
+    stats = request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+
+
+def watch_queries(engine):
+    """Count statements on a sync engine (an async engine's .sync_engine)"""
+    event.listen(engine, "before_cursor_execute", count_query)
+
+
+def route_label(scope: dict) -> str:
+    """The full route template (include_router prefix included), one series per endpoint
+
+    FastAPI 0.14x keeps included routes unprefixed (scope["route"].path is
+    "/menu" for /api/menu) and records the prefixed template in
+    scope["fastapi"]; older releases copy each route with the prefix added.
+    """
+    context = (scope.get("fastapi") or {}).get("effective_route_context")
+    path = getattr(context, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status, in-flight count and SQL statements per request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status = 500
+        start = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            method, route = scope["method"], route_label(scope)
+            HTTP_REQUESTS.inc(method=method, route=route, status=status)
+            HTTP_LATENCY.observe(elapsed, method=method, route=route)
+            HTTP_DB_QUERIES.observe(stats.queries, method=method, route=route)
+            request_stats.reset(token)
@@ -0,0 +1,173 @@
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+# Per-request SQL profiling for development and staging; adds a little work to every statement
+QUERY_PROFILER = os.getenv("QUERY_PROFILER", "false").lower() in ("1", "true", "yes")
+# The same statement shape this many times in one request is reported as an N+1 pattern
+QUERY_PROFILER_REPEAT_THRESHOLD = int(os.getenv("QUERY_PROFILER_REPEAT_THRESHOLD", "3"))
+# Requests running more statements than this are logged as warnings (0 = no limit)
+QUERY_PROFILER_MAX_QUERIES = int(os.getenv("QUERY_PROFILER_MAX_QUERIES", "25"))
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+BIND_PARAMETER = re.compile(r"%\(\w+\)s|%s|:\w+|\?")
+PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    """Statement shape: literals and bind parameters become ?, IN lists collapse to (?...)"""
+    shape = STRING_LITERAL.sub("?", statement)
+    shape = BIND_PARAMETER.sub("?", shape)
+    shape = NUMBER_LITERAL.sub("?", shape)
+    shape = PLACEHOLDER_LIST.sub("(?...)", shape)
+    return WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by QueryProfile.check_budget when code runs more statements than allowed"""
+    pass
+
+
+class QueryProfile:
+    """Statements executed during one request (or one profile_queries block), grouped by shape"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # statement text -> [executions, total seconds]; normalized only when reported
+        self.statements: Dict[str, list] = {}
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        entry = self.statements.get(statement)
+        if entry is None:
+            entry = self.statements[statement] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += seconds
+
+    def grouped(self) -> Dict[str, list]:
+        groups: Dict[str, list] = {}
+        for statement, (count, seconds) in self.statements.items():
+            group = groups.setdefault(normalize(statement), [0, 0.0])
+            group[0] += count
+            group[1] += seconds
+        return groups
+
+    def repeated(self, threshold: int = QUERY_PROFILER_REPEAT_THRESHOLD) -> List[dict]:
+        """Shapes run at least threshold times, most frequent first: likely N+1 loops"""
+        return [
+            {"statement": shape, "count": count, "ms": round(seconds * 1000, 2)}
+            for shape, (count, seconds) in sorted(self.grouped().items(), key=lambda item: -item[1][0])
+            if count >= threshold
+        ]
+
+    def summary(self) -> dict:
+        return {
+            "queries": self.count,
+            "ms": round(self.seconds * 1000, 2),
+            "distinct": len(self.grouped()),
+            "n_plus_one": self.repeated()
+        }
+
+    def check_budget(self, max_queries: int, label: str = "block"):
+        if self.count > max_queries:
+            details = "".join(f"\n   {item['count']}x {item['statement']}" for item in self.repeated(2))
+            raise QueryBudgetExceeded(f"{label} ran {self.count} SQL statements, budget is {max_queries}{details}")
+
+
+# The profile statements are recorded into; sync routes see the same object from the threadpool
+current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("current_profile", default=None)
+
+
+def before_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None:
+        conn.info.setdefault("query_profiler_start", []).append(time.perf_counter())
+
+
+def after_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    starts = conn.info.get("query_profiler_start")
+    if profile is not None and starts:
+        profile.record(statement, time.perf_counter() - starts.pop())
+
+
+def watch_statements(engine):
+    """Time statements on a sync engine (an async engine's .sync_engine) into the current profile"""
+    event.listen(engine, "before_cursor_execute", before_execute)
+    event.listen(engine, "after_cursor_execute", after_execute)
+
+
+@contextmanager
+def profile_queries(max_queries: Optional[int] = None, label: str = "block"):
+    """Profile the statements run inside the block, optionally failing when over budget
+
+    with profile_queries(max_queries=3, label="GET /api/menu") as profile:
+        client.get("/api/menu")
+    """
+    profile = QueryProfile()
+    token = current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        current_profile.reset(token)
+    if max_queries is not None:
+        profile.check_budget(max_queries, label)
+
+
+class QueryProfilerMiddleware:
+    """ASGI middleware adding X-DB-* response headers and a log record per request
+
+    Headers are set when the response starts, so statements run while a
+    streaming body is sent only show up in the log record.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = current_profile.set(profile)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(profile.count)
+                headers["X-DB-Query-Time-Ms"] = f"{profile.seconds * 1000:.2f}"
+                headers["X-DB-N-Plus-One"] = str(len(profile.repeated()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_profile.reset(token)
+            log_profile(f"{scope['method']} {scope['path']}", profile)
+
+
+def log_profile(label: str, profile: QueryProfile):
+    summary = profile.summary()
+    over_budget = QUERY_PROFILER_MAX_QUERIES and profile.count > QUERY_PROFILER_MAX_QUERIES
+    message = f"{label}: {profile.count} queries in {summary['ms']} ms"
+    if not summary["n_plus_one"] and not over_budget:
+        logger.info(message, extra={"query_profile": summary})
+        return
+
+    lines = [message]
+    for item in summary["n_plus_one"]:
+        lines.append(f"   N+1? {item['count']}x ({item['ms']} ms) {item['statement'][:200]}")
+    logger.warning("\n".join(lines), extra={"query_profile": summary})
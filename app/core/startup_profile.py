@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+# Optional dependencies that should only be imported by the requests that need them
+HEAVY_MODULES = ("pandas", "pyarrow", "reportlab", "twilio")
+
+# Log a warning when the app takes longer than this to become ready (seconds)
+STARTUP_WARN_SECONDS = float(os.getenv("STARTUP_WARN_SECONDS", "1.0"))
+
+
+class StartupProfile:
+    """Wall-clock time of each startup phase, reported once the app is ready"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self.ready_after: Optional[float] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def ready(self) -> float:
+        self.ready_after = time.perf_counter() - self.started
+        return self.ready_after
+
+    @staticmethod
+    def heavy_modules_loaded() -> List[str]:
+        return [name for name in HEAVY_MODULES if name in sys.modules]
+
+    def summary(self) -> dict:
+        return {
+            "ready_ms": round(self.ready_after * 1000, 1) if self.ready_after is not None else None,
+            "phases": [{"phase": name, "ms": round(seconds * 1000, 1)} for name, seconds in self.phases],
+            "heavy_modules_loaded": self.heavy_modules_loaded()
+        }
+
+    def report(self) -> str:
+        total = self.ready_after if self.ready_after is not None else time.perf_counter() - self.started
+        lines = [f"Startup profile: ready in {total * 1000:.0f} ms"]
+        for name, seconds in self.phases:
+            lines.append(f"   {name:<24} {seconds * 1000:>8.1f} ms")
+        lines.append(f"   heavy modules loaded: {', '.join(self.heavy_modules_loaded()) or 'none'}")
+        return "\n".join(lines)
+
+
+# Started when app.main is first imported
+startup_profile = StartupProfile()
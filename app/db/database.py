@@ -1,12 +1,18 @@
 import os
+import ssl
 import sys
 import time
 from urllib.parse import urlparse
 import pymysql
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import DATABASE_URL, ConfigurationError
+from app.db.pool import pool_options, pool_status, watch_pool
+from app.core.metrics import metrics, watch_queries
+from app.core.query_profiler import watch_statements
 
 class DatabaseConnectionError(Exception):
     """Custom exception for database connection errors"""
@@ -15,12 +21,32 @@ class DatabaseConnectionError(Exception):
 # Install pymysql as MySQLdb
 pymysql.install_as_MySQLdb()
 
+def create_sqlite_engine():
+    """File-backed SQLite engine for local benchmarks and load tests; not for production"""
+    engine = create_engine(
+        DATABASE_URL,
+        **pool_options(QueuePool, "sync"),
+        # Pooled connections move between threadpool threads; wait on SQLite's write lock
+        connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    watch_pool(engine)
+    watch_queries(engine)
+    watch_statements(engine)
+    return engine
+
 def create_database_engine():
-    """Create database engine with retry logic and validation"""
+    """Create the pooled database engine
+
+    No connection is opened here: the pool connects on first use, so
+    importing the app never waits on MySQL. wait_for_database() is the
+    explicit connectivity check, run by migrate.py rather than every worker.
+    """
     
     # Validate DATABASE_URL format
     try:
         parsed = urlparse(DATABASE_URL)
+        if parsed.scheme.startswith("sqlite"):
+            return create_sqlite_engine()
         if not all([parsed.scheme, parsed.hostname, parsed.path.lstrip('/')]):
             raise ValueError("Invalid DATABASE_URL format")
     except Exception as e:
@@ -28,11 +54,10 @@ def create_database_engine():
         print(f"Current DATABASE_URL: {DATABASE_URL}")
         raise DatabaseConnectionError(f"DATABASE_URL validation failed: {e}")
     
-    # Engine configuration with connection pooling
+    # Engine configuration with connection pooling (DB_POOL_* settings in app/db/pool.py)
     engine_config = {
         "echo": False,  # Set to True for SQL debugging
-        "pool_pre_ping": True,  # Validate connections before use
-        "pool_recycle": 3600,  # Recycle connections every hour
+        **pool_options(QueuePool, "sync"),
         "connect_args": {
             "connect_timeout": 10,  # Connection timeout
             "read_timeout": 30,    # Read timeout
@@ -44,22 +69,31 @@ def create_database_engine():
     if "localhost" not in DATABASE_URL:
         engine_config["connect_args"]["ssl"] = {"ca": "/etc/ssl/certs/ca-certificates.crt"}
     
-    # Create engine with retry logic
-    max_retries = 3
-    retry_delay = 2
-    
+    try:
+        engine = create_engine(DATABASE_URL, **engine_config)
+        watch_pool(engine)
+        watch_queries(engine)
+        watch_statements(engine)
+        return engine
+    except Exception as e:
+        print(f"Unexpected error creating database engine: {e}")
+        raise DatabaseConnectionError(f"Unexpected error: {e}")
+
+def wait_for_database(max_retries: int = 3, retry_delay: float = 2) -> bool:
+    """Connect with retries and exponential backoff, printing diagnostics for each failure"""
+    if engine is None:
+        print("Database engine not available - cannot connect")
+        return False
+
     for attempt in range(max_retries):
         try:
             print(f"Attempting database connection (attempt {attempt + 1}/{max_retries})...")
             
-            engine = create_engine(DATABASE_URL, **engine_config)
-            
-            # Test the connection
             with engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
             
             print("Database connection successful!")
-            return engine
+            return True
             
         except OperationalError as e:
             error_msg = str(e).lower()
@@ -88,26 +122,20 @@ def create_database_engine():
                 
             else:
                 print(f"Database connection failed: {e}")
-            
-            if attempt < max_retries - 1:
-                print(f"   Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                retry_delay *= 2  # Exponential backoff
-            else:
-                print(f"Failed to connect after {max_retries} attempts")
-                print(f"   DATABASE_URL: {DATABASE_URL}")
-                raise DatabaseConnectionError(f"Failed to connect after {max_retries} attempts")
                 
         except Exception as e:
-            print(f"Unexpected error creating database engine: {e}")
-            if attempt < max_retries - 1:
-                print(f"   Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                retry_delay *= 2
-            else:
-                raise DatabaseConnectionError(f"Unexpected error: {e}")
+            print(f"Unexpected database error: {e}")
+        
+        if attempt < max_retries - 1:
+            print(f"   Retrying in {retry_delay} seconds...")
+            time.sleep(retry_delay)
+            retry_delay *= 2  # Exponential backoff
+    
+    print(f"Failed to connect after {max_retries} attempts")
+    print(f"   DATABASE_URL: {DATABASE_URL}")
+    return False
 
-# Create engine with validation
+# Create engine with validation (no connection yet)
 try:
     engine = create_database_engine()
 except DatabaseConnectionError as e:
@@ -125,9 +153,98 @@ if engine:
 else:
     SessionLocal = None
 
+# Async drivers used in place of the sync driver in DATABASE_URL
+ASYNC_DRIVERS = {
+    "mysql+pymysql://": "mysql+aiomysql://",
+    "mysql://": "mysql+aiomysql://",
+    "sqlite://": "sqlite+aiosqlite://",
+}
+
+def get_async_database_url():
+    """Return ASYNC_DATABASE_URL, or DATABASE_URL rewritten for its async driver"""
+    url = os.getenv("ASYNC_DATABASE_URL")
+    if url:
+        return url
+
+    for sync_prefix, async_prefix in ASYNC_DRIVERS.items():
+        if DATABASE_URL.startswith(sync_prefix):
+            return async_prefix + DATABASE_URL[len(sync_prefix):]
+    return DATABASE_URL
+
+def create_async_database_engine():
+    """Create the async engine used by the non-blocking routes
+
+    No connection is opened here; the pool connects on first use, so a slow
+    or unavailable MySQL server never blocks the event loop at startup.
+    """
+    url = get_async_database_url()
+
+    engine_config = {
+        "echo": False,
+        **pool_options(AsyncAdaptedQueuePool, "async"),
+    }
+
+    try:
+        if url.startswith("mysql"):
+            engine_config["connect_args"] = {
+                "connect_timeout": 10,
+                "charset": "utf8mb4"
+            }
+            if "localhost" not in url:
+                engine_config["connect_args"]["ssl"] = ssl.create_default_context(
+                    cafile="/etc/ssl/certs/ca-certificates.crt"
+                )
+        elif url.startswith("sqlite"):
+            engine_config["connect_args"] = {"timeout": 30}
+
+        async_engine = create_async_engine(url, **engine_config)
+        watch_pool(async_engine.sync_engine)
+        watch_queries(async_engine.sync_engine)
+        watch_statements(async_engine.sync_engine)
+        return async_engine
+
+    except Exception as e:
+        print(f"Async database engine creation failed: {e}")
+        print("Async routes will fail until the async driver is installed (aiomysql)")
+        return None
+
+async_engine = create_async_database_engine()
+
+if async_engine:
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+else:
+    AsyncSessionLocal = None
+
 # Base class for models
 Base = declarative_base()
 
+def pool_metrics():
+    """Pool usage per engine for /metrics"""
+    pools = {
+        name: status for name, status in (("sync", pool_status(engine)), ("async", pool_status(async_engine)))
+        if status and "checked_out" in status
+    }
+    for name, kind, help, key in (
+        ("db_pool_size", "gauge", "Connections the pool keeps open", "pool_size"),
+        ("db_pool_checked_out", "gauge", "Connections currently in use", "checked_out"),
+        ("db_pool_overflow", "gauge", "Connections open beyond the pool size (negative while filling)", "overflow"),
+        ("db_pool_checkouts_total", "counter", "Connections handed out by the pool", "checkouts"),
+        ("db_pool_checkout_timeouts_total", "counter", "Checkouts that gave up after DB_POOL_TIMEOUT", "timeouts"),
+        ("db_pool_connects_total", "counter", "New database connections opened", "connects"),
+    ):
+        yield name, kind, help, ("engine",), {(engine_name,): status[key] for engine_name, status in pools.items()}
+    yield (
+        "db_pool_checkout_wait_seconds_total", "counter", "Time spent waiting for a pooled connection", ("engine",),
+        {(engine_name,): status["total_wait_ms"] / 1000 for engine_name, status in pools.items()}
+    )
+
+metrics.add_collector(pool_metrics)
+
 def get_db():
     """Database dependency for FastAPI"""
     if SessionLocal is None:
@@ -143,36 +260,15 @@ def get_db():
     finally:
         db.close()
 
-def test_database_connection():
-    """Test database connection and print diagnostics"""
-    if engine is None:
-        print("Database engine not available - cannot test connection")
-        return False
-        
-    try:
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT VERSION() as version"))
-            row = result.fetchone()
-            
-            print("Database test successful!")
-            print(f"   MySQL Version: {row.version}")
-            print(f"   Current Database: restaurant_db")
-            
-            # Test if required tables exist
-            tables_result = conn.execute(text("""
-                SELECT COUNT(*) as table_count 
-                FROM information_schema.tables 
-                WHERE table_schema = 'restaurant_db'
-            """))
-            table_count = tables_result.fetchone().table_count
-            print(f"   Tables found: {table_count}")
-            
-            return True
-            
-    except Exception as e:
-        print(f"Database test failed: {e}")
-        return False
+async def get_async_db():
+    """Async database dependency for FastAPI"""
+    if AsyncSessionLocal is None:
+        raise DatabaseConnectionError("Async database session not available - check async driver")
 
-# Test connection at startup
-if __name__ != "__main__":  # Only test when imported, not when run directly
-    test_database_connection()
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            await db.rollback()
+            print(f"Async database session error: {e}")
+            raise
@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from typing import Optional, Type
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# Pool settings shared by the sync and async engines (each engine gets its own pool of this size)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Seconds a checkout waits for a free connection before TimeoutError
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Seconds before a connection is replaced; keep below MySQL's wait_timeout
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Checkouts slower than this count as having waited for a connection (milliseconds)
+DB_POOL_SLOW_CHECKOUT_MS = float(os.getenv("DB_POOL_SLOW_CHECKOUT_MS", "10"))
+
+
+class PoolStats:
+    """Checkout counters and wait times for one engine's pool
+
+    Wait time is measured around the pool's own checkout, so it includes
+    queueing for a free connection and opening a new one when the pool
+    grows into its overflow.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.since = time.time()
+            self.checkouts = 0
+            self.slow_checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.connects = 0
+            self.invalidations = 0
+
+    def record_checkout(self, seconds: float, timed_out: bool = False):
+        with self.lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            if seconds * 1000 >= DB_POOL_SLOW_CHECKOUT_MS:
+                self.slow_checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_connect(self):
+        with self.lock:
+            self.connects += 1
+
+    def record_invalidation(self):
+        with self.lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool) -> dict:
+        with self.lock:
+            attempts = self.checkouts + self.timeouts
+            counters = {
+                "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.since)),
+                "checkouts": self.checkouts,
+                "slow_checkouts": self.slow_checkouts,
+                "timeouts": self.timeouts,
+                "average_wait_ms": round(self.wait_total / attempts * 1000, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.wait_max * 1000, 3),
+                "total_wait_ms": round(self.wait_total * 1000, 3),
+                "connects": self.connects,
+                "invalidations": self.invalidations
+            }
+        return {
+            "pool_size": pool.size(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "timeout": pool.timeout(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            # Negative until the pool has opened pool_size connections
+            "overflow": pool.overflow(),
+            **counters
+        }
+
+
+def instrumented_pool(base: Type[QueuePool], stats: PoolStats) -> Type[QueuePool]:
+    """A subclass of base that times every checkout into stats
+
+    Defined per engine so the pool the engine recreates on dispose() (built
+    from self.__class__) keeps reporting into the same stats.
+    """
+
+    class InstrumentedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeoutError:
+                stats.record_checkout(time.perf_counter() - start, timed_out=True)
+                raise
+            stats.record_checkout(time.perf_counter() - start)
+            return connection
+
+    InstrumentedPool.stats = stats
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def pool_options(base: Type[QueuePool], name: str) -> dict:
+    """create_engine / create_async_engine keyword arguments for a configured, instrumented pool"""
+    return {
+        "poolclass": instrumented_pool(base, PoolStats(name)),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def watch_pool(engine):
+    """Count new and invalidated connections for a sync engine (an async engine's .sync_engine)"""
+    stats = getattr(engine.pool, "stats", None)
+    if stats is None:
+        return
+    event.listen(engine, "connect", lambda dbapi_connection, record: stats.record_connect())
+    event.listen(engine, "invalidate", lambda dbapi_connection, record, exception: stats.record_invalidation())
+
+
+def pool_status(engine) -> Optional[dict]:
+    """Live pool usage plus counters, or None when the engine has no instrumented pool"""
+    if engine is None:
+        return None
+    pool = getattr(engine, "sync_engine", engine).pool
+    stats = getattr(pool, "stats", None)
+    if stats is None:
+        return {"pool": pool.status()}
+    return stats.snapshot(pool)
+
+
+def reset_pool_stats(engine):
+    if engine is not None:
+        stats = getattr(getattr(engine, "sync_engine", engine).pool, "stats", None)
+        if stats is not None:
+            stats.reset()
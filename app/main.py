@@ -1,17 +1,15 @@
-import sys
 import os
 import logging
 from contextlib import asynccontextmanager
-from datetime import datetime
-from urllib.parse import unquote, urlparse
 
-from fastapi import FastAPI, WebSocket, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import text
-from twilio.rest import Client
-import mysql.connector
-from dotenv import load_dotenv
-from app.schemas import staff
+from app.core.startup_profile import startup_profile, STARTUP_WARN_SECONDS
+
+with startup_profile.phase("framework and schemas"):
+    from fastapi import FastAPI, WebSocket, HTTPException
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import PlainTextResponse
+    from dotenv import load_dotenv
+    from app.schemas import staff
 
 
 
@@ -29,59 +27,41 @@ load_dotenv()
 # --------------------------------------------------
 # Safe Imports for Database & Config
 # --------------------------------------------------
-try:
-    from app.core.config import DATABASE_URL
-    from app.db.database import Base, engine, test_database_connection
-except Exception as e:
-    logger.error(f"Initialization Error: {e}")
-    Base = engine = None
-    DATABASE_URL = os.getenv("DATABASE_URL")
+# The engine connects on first use; tables are created by migrate.py, not here
+with startup_profile.phase("config and database"):
+    try:
+        from app.core.config import DATABASE_URL
+        from app.db.database import engine, async_engine, SessionLocal
+    except Exception as e:
+        logger.error(f"Initialization Error: {e}")
+        engine = async_engine = SessionLocal = None
+        DATABASE_URL = os.getenv("DATABASE_URL")
 
 # --------------------------------------------------
 # Import API Routers & Models
 # --------------------------------------------------
-from app.models import menu, order, table, customer
-from app.api.routes import (
-    menu as menu_routes,
-    orders as order_routes,
-    tables as table_routes,
-    admin as admin_routes,
-    billing as billing_routes,
-    kitchen as kitchen_routes,
-    attendance
-)
-from app.services.websocket_service import websocket_manager
-
-# --------------------------------------------------
-# Database Helper
-# --------------------------------------------------
-def get_db_connection():
-    try:
-        url = os.getenv("DATABASE_URL")
-        if not url:
-            raise ValueError("DATABASE_URL missing")
-
-        if url.startswith("mysql+pymysql://"):
-            url = url.replace("mysql+pymysql://", "mysql://")
-
-        parsed = urlparse(url)
-
-        connection = mysql.connector.connect(
-            host=parsed.hostname or "localhost",
-            user=parsed.username,
-            password=unquote(parsed.password or ""),
-            database=parsed.path.lstrip('/')
-        )
-        return connection
-
-    except Exception as e:
-        logger.error(f"Connection Failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"DB Error: {str(e)}")
-
-def create_tables():
-    if engine and Base:
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables verified")
+with startup_profile.phase("routes and services"):
+    from app.models import menu, order, table, customer
+    from app.api.routes import (
+        menu as menu_routes,
+        orders as order_routes,
+        tables as table_routes,
+        admin as admin_routes,
+        billing as billing_routes,
+        kitchen as kitchen_routes,
+        jobs as job_routes,
+        sales as sales_routes,
+        analytics as analytics_routes,
+        attendance
+    )
+    from app.services.websocket_service import websocket_manager, parse_topics, parse_last_seq
+    from app.services.job_queue import job_queue
+    from app.services.bill_jobs import WHATSAPP_BILL
+    from app.services.email_service import email_service
+    from app.services.pdf_pool import pdf_renderer
+    from app.services.live_sales import live_sales
+    from app.core.metrics import MetricsMiddleware, render, worker_metrics
+    from app.core.query_profiler import QUERY_PROFILER, QueryProfilerMiddleware
 
 # --------------------------------------------------
 # App Lifespan
@@ -89,12 +69,37 @@ def create_tables():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("🚀 Starting Restaurant Backend API")
-    if test_database_connection and test_database_connection():
-        create_tables()
+    # Nothing here waits on MySQL or on child processes: live sales recovery
+    # and the PDF render processes finish in the background
+    with startup_profile.phase("websocket manager"):
+        await websocket_manager.start()
+    with startup_profile.phase("live sales"):
+        await live_sales.start()
+    with startup_profile.phase("pdf render pool"):
+        pdf_renderer.start()
+    with startup_profile.phase("job queue"):
+        job_queue.start()
+    with startup_profile.phase("metrics"):
+        await worker_metrics.start()
+    ready_after = startup_profile.ready()
+    app.state.startup_profile = startup_profile.summary()
+    if ready_after > STARTUP_WARN_SECONDS:
+        logger.warning(startup_profile.report())
+    else:
+        logger.info(startup_profile.report())
     yield
+    await worker_metrics.stop()
+    job_queue.stop()
+    pdf_renderer.stop()
+    email_service.close()
+    await live_sales.stop()
+    await websocket_manager.stop()
     if engine:
         engine.dispose()
         print("Database connections closed")
+    if async_engine:
+        await async_engine.dispose()
+        print("Async database connections closed")
 
 # --------------------------------------------------
 # FastAPI App
@@ -111,6 +116,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Development/staging only: per-request SQL counts and N+1 warnings (QUERY_PROFILER=true)
+if QUERY_PROFILER:
+    app.add_middleware(QueryProfilerMiddleware)
+# Added last so it is outermost and times everything, CORS included
+app.add_middleware(MetricsMiddleware)
 
 # --------------------------------------------------
 # Register Routers
@@ -121,6 +131,9 @@ app.include_router(table_routes.router, prefix="/api", tags=["Tables"])
 app.include_router(admin_routes.router, prefix="/api", tags=["Admin"])
 app.include_router(billing_routes.router, prefix="/api", tags=["Billing"])
 app.include_router(kitchen_routes.router, prefix="/api", tags=["Kitchen"])
+app.include_router(job_routes.router, prefix="/api", tags=["Jobs"])
+app.include_router(sales_routes.router, prefix="/api", tags=["Sales"])
+app.include_router(analytics_routes.router, prefix="/api", tags=["Analytics"])
 app.include_router(attendance.router, prefix="/api/attendance", tags=["Attendance"])
 app.include_router(staff.router,prefix="/staff",tags=["staff"])
 
@@ -129,10 +142,15 @@ app.include_router(staff.router,prefix="/staff",tags=["staff"])
 # --------------------------------------------------
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    await websocket_manager.connect(websocket)
+    # e.g. /ws?topics=kitchen, /ws?topics=dashboard or /ws?topics=session:SES2024...,order:42
+    # Reconnecting clients add &last_seq=<seq of the last event they saw>
+    topics = parse_topics(websocket.query_params.get("topics"))
+    last_seq = parse_last_seq(websocket.query_params.get("last_seq"))
+    await websocket_manager.connect(websocket, topics, last_seq)
     try:
         while True:
-            await websocket.receive_text()
+            data = await websocket.receive_text()
+            await websocket_manager.handle_message(websocket, data)
     except:
         websocket_manager.disconnect(websocket)
 
@@ -140,114 +158,37 @@ async def websocket_endpoint(websocket: WebSocket):
 def root():
     return {"message": "Restaurant Backend Running 🔥", "docs": "/docs"}
 
-# --------------------------------------------------
-# Twilio Config
-# --------------------------------------------------
-TWILIO_SID = os.getenv("TWILIO_SID")
-TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
-TWILIO_WHATSAPP_NUMBER = os.getenv("TWILIO_WHATSAPP_NUMBER")
-
-def get_twilio_client():
-    if not TWILIO_SID or not TWILIO_AUTH_TOKEN:
-        raise HTTPException(status_code=500, detail="Twilio not configured")
-    return Client(TWILIO_SID, TWILIO_AUTH_TOKEN)
+@app.get("/api/startup-profile")
+def get_startup_profile():
+    """How long this worker took to become ready, by startup phase"""
+    return startup_profile.summary()
 
-# --------------------------------------------------
-# WhatsApp Message Formatter
-# --------------------------------------------------
-def format_whatsapp_message(customer_name, order_id, items, total_amount):
-    message = (
-        f"🍽️ *RESTAURANT BILL*\n\n"
-        f"👤 Customer: {customer_name}\n"
-        f"🧾 Order ID: #{order_id}\n"
-        f"📅 Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n"
-        f"📋 *Items:*\n"
-    )
-
-    for item in items:
-        name = item.get("item_name") or item.get("name")
-        line_total = float(item["price"]) * int(item["quantity"])
-        message += f"• {name} x{item['quantity']} - ₹{line_total:.2f}\n"
-
-    message += f"\n💰 *Total Amount: ₹{total_amount:.2f}*\n\nThank you for dining with us! 🙏"
-    return message
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus scrape endpoint with totals for every worker process"""
+    return PlainTextResponse(render(worker_metrics.aggregate()), media_type="text/plain; version=0.0.4")
 
 # --------------------------------------------------
 # Generate Bill & Send WhatsApp
 # --------------------------------------------------
 @app.post("/api/generate-bill/{order_id}")
 def generate_bill(order_id: int):
-    connection = get_db_connection()
-    cursor = connection.cursor(dictionary=True)
+    if SessionLocal is None:
+        raise HTTPException(status_code=500, detail="DB Error: database session not available")
 
+    db = SessionLocal()
     try:
-        # Fetch order + customer
-        cursor.execute("""
-            SELECT 
-                o.id, 
-                o.total_price, 
-                c.name AS customer_name, 
-                c.phone_number AS customer_phone
-            FROM orders o
-            JOIN customers c ON o.customer_id = c.id
-            WHERE o.id = %s
-        """, (order_id,))
-        order_data = cursor.fetchone()
-
-        if not order_data:
+        existing = db.query(order.Order).filter(order.Order.id == order_id).first()
+        if not existing:
             raise HTTPException(status_code=404, detail="Order not found")
 
-        # Fetch items
-        cursor.execute("""
-            SELECT 
-                m.name, 
-                oi.quantity, 
-                oi.price 
-            FROM order_items oi
-            JOIN menu_items m ON oi.menu_item_id = m.id
-            WHERE oi.order_id = %s
-        """, (order_id,))
-        items = cursor.fetchall()
-
-        # Format message
-        msg_body = format_whatsapp_message(
-            order_data["customer_name"],
-            order_data["id"],
-            items,
-            order_data["total_price"]
-        )
-
-        # ✅ FIXED PHONE FORMAT HERE
-        phone_number = str(order_data["customer_phone"]).strip()
-
-        if phone_number.startswith("0"):
-            phone_number = "+91" + phone_number[1:]
-        elif not phone_number.startswith("+"):
-            phone_number = "+91" + phone_number
-
-        client = get_twilio_client()
-
-        client.messages.create(
-            body=msg_body,
-            from_=TWILIO_WHATSAPP_NUMBER,
-            to=f"whatsapp:{phone_number}"
-        )
-
-        cursor.execute(
-            "UPDATE orders SET status = 'CONFIRMED' WHERE id = %s",
-            (order_id,)
-        )
-        connection.commit()
-
-        return {"status": "success", "message": "WhatsApp bill sent successfully!"}
+        # Twilio call and the CONFIRMED status update run on the job workers
+        job = job_queue.enqueue(db, WHATSAPP_BILL, {"order_id": order_id})
 
-    except Exception as e:
-        logger.error(f"Error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        return {"status": "queued", "message": "WhatsApp bill queued", "job_id": job.id}
 
     finally:
-        cursor.close()
-        connection.close()
+        db.close()
 
 
 if __name__ == "__main__":
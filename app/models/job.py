@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Text, Enum, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+import enum
+
+
+class JobStatus(enum.Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    DEAD = "DEAD"  # gave up after max_attempts; kept for inspection and manual retry
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("idx_status_run_after", "status", "run_after"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False, index=True)
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    run_after = Column(DateTime, nullable=False)
+    locked_by = Column(String(100), nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    result = Column(Text, nullable=True)  # JSON
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
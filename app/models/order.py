@@ -2,7 +2,7 @@ from sqlalchemy import Column, Integer, Float, String, ForeignKey, Enum, Date, T
 from app.models.enums import OrderStatus
 from app.db.database import Base
 from sqlalchemy.sql import func
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, Index
 import enum
 
 
@@ -27,6 +27,12 @@ class OrderType(enum.Enum):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Keyset pagination for order history: newest first on (created_at, id)
+        Index("idx_orders_created_id", "created_at", "id"),
+        Index("idx_orders_status_created", "status", "created_at", "id"),
+        Index("idx_orders_table_created", "table_number", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_number = Column(String(50), unique=True, nullable=True)
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, DateTime, Index, Table
+from sqlalchemy.sql import func
+from app.db.database import Base
+from app.models.order import Order, OrderItem
+from app.models.order_session import OrderSession
+
+
+def archive_columns(table: Table) -> list:
+    """Copies of a hot table's columns, without foreign keys or defaults: archived rows arrive complete"""
+    return [
+        Column(column.name, column.type, primary_key=column.primary_key, autoincrement=False, nullable=column.nullable)
+        for column in table.columns
+    ] + [Column("archived_at", DateTime(timezone=True), server_default=func.now())]
+
+
+class ArchivedOrderSession(Base):
+    """Closed sessions moved out of order_sessions; same columns, so serializers work on both"""
+    __table__ = Table(
+        "order_sessions_archive",
+        Base.metadata,
+        *archive_columns(OrderSession.__table__),
+        Index("idx_sessions_archive_session", "session_id", unique=True),
+    )
+
+
+class ArchivedOrder(Base):
+    __table__ = Table(
+        "orders_archive",
+        Base.metadata,
+        *archive_columns(Order.__table__),
+        Index("idx_orders_archive_session", "session_id"),
+        Index("idx_orders_archive_created", "created_at", "id"),
+    )
+
+
+class ArchivedOrderItem(Base):
+    __table__ = Table(
+        "order_items_archive",
+        Base.metadata,
+        *archive_columns(OrderItem.__table__),
+        Index("idx_order_items_archive_order", "order_id"),
+    )
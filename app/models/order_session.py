@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime, Index
 from app.db.database import Base
 from sqlalchemy.sql import func
 import enum
@@ -11,6 +11,10 @@ class SessionStatus(enum.Enum):
 
 class OrderSession(Base):
     __tablename__ = "order_sessions"
+    __table_args__ = (
+        # Closed sessions due for archiving
+        Index("idx_sessions_status_closed", "status", "closed_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String(50), unique=True, nullable=False, index=True)
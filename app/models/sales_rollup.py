@@ -0,0 +1,67 @@
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Numeric
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class DailySales(Base):
+    __tablename__ = "sales_daily"
+
+    sales_date = Column(Date, primary_key=True)
+    orders_count = Column(Integer, nullable=False, default=0)
+    items_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class HourlySales(Base):
+    __tablename__ = "sales_hourly"
+
+    sales_date = Column(Date, primary_key=True)
+    hour = Column(Integer, primary_key=True, autoincrement=False)
+    orders_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
+
+
+class CategorySales(Base):
+    __tablename__ = "sales_category_daily"
+
+    sales_date = Column(Date, primary_key=True)
+    category = Column(String(100), primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
+
+
+class ItemSales(Base):
+    __tablename__ = "sales_item_daily"
+
+    sales_date = Column(Date, primary_key=True)
+    menu_item_id = Column(Integer, primary_key=True, autoincrement=False)
+    item_name = Column(String(255), nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
+
+
+class RolledUpOrder(Base):
+    """Orders already counted in the rollups, so re-billing or a backfill never counts twice
+
+    No foreign key to orders: the ids stay valid after the order is archived.
+    """
+    __tablename__ = "sales_rollup_orders"
+
+    order_id = Column(Integer, primary_key=True, autoincrement=False)
+    sales_date = Column(Date, nullable=False, index=True)
+    rolled_up_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class LiveSalesCheckpoint(Base):
+    """Periodic snapshot of the in-memory "today so far" counters, used to recover after a restart"""
+    __tablename__ = "sales_live_checkpoints"
+
+    sales_date = Column(Date, primary_key=True)
+    orders_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
+    # JSON: counted order ids, {session_id: orders}, {menu_item_id: [name, quantity, revenue]}
+    order_ids = Column(Text(16777215), nullable=False)
+    sessions = Column(Text(16777215), nullable=False)
+    items = Column(Text, nullable=False)
+    checkpointed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
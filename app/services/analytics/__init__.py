@@ -0,0 +1,4 @@
+# Sales and menu analytics computed with pandas over columnar extracts
+from app.services.analytics.cache import AnalyticsCache, analytics_cache
+from app.services.analytics.frames import SalesFrames, load_sales_frames
+from app.services.analytics.reports import basket_pairs, hourly_heatmap, item_popularity, table_turnover
@@ -0,0 +1,126 @@
+from sqlalchemy.orm import Session
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, List, Tuple
+import os
+import threading
+import time
+
+from app.services.analytics.frames import SalesFrames, load_sales_frames
+
+# Seconds a report stays cached when its range includes today, and when it is all in the past
+ANALYTICS_CACHE_TTL = float(os.getenv("ANALYTICS_CACHE_TTL", "300"))
+ANALYTICS_HISTORY_TTL = float(os.getenv("ANALYTICS_HISTORY_TTL", "3600"))
+# Date ranges whose frames are kept in memory
+ANALYTICS_CACHED_RANGES = int(os.getenv("ANALYTICS_CACHED_RANGES", "4"))
+# Finished reports kept (each distinct range and parameter set is one entry)
+ANALYTICS_CACHED_REPORTS = int(os.getenv("ANALYTICS_CACHED_REPORTS", "128"))
+
+
+class AnalyticsCache:
+    """Process-local cache of loaded frames per date range and of finished reports
+
+    The dashboard asks for several reports over the same range at once, so
+    the frames are loaded once per range (concurrent requests wait for the
+    first load) and every report is computed from them.
+    """
+
+    def __init__(
+        self,
+        ttl: float = ANALYTICS_CACHE_TTL,
+        history_ttl: float = ANALYTICS_HISTORY_TTL,
+        max_ranges: int = ANALYTICS_CACHED_RANGES,
+        max_reports: int = ANALYTICS_CACHED_REPORTS
+    ):
+        self.ttl = ttl
+        self.history_ttl = history_ttl
+        self.max_ranges = max_ranges
+        self.max_reports = max_reports
+        self.frames: "OrderedDict[Tuple[date, date], Tuple[float, SalesFrames]]" = OrderedDict()
+        self.reports: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+        # range -> [lock, requests using it]; dropped when the last one finishes
+        self.loading: Dict[Tuple[date, date], List] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def expires_at(self, end_date: date) -> float:
+        ttl = self.ttl if end_date >= date.today() else self.history_ttl
+        return time.monotonic() + ttl
+
+    def get_frames(self, db: Session, start_date: date, end_date: date) -> SalesFrames:
+        key = (start_date, end_date)
+        with self.lock:
+            loading = self.loading.setdefault(key, [threading.Lock(), 0])
+            loading[1] += 1
+
+        try:
+            with loading[0]:
+                with self.lock:
+                    cached = self.frames.get(key)
+                    if cached and cached[0] > time.monotonic():
+                        self.frames.move_to_end(key)
+                        return cached[1]
+
+                frames = load_sales_frames(db, start_date, end_date)
+
+                with self.lock:
+                    self.frames[key] = (self.expires_at(end_date), frames)
+                    self.frames.move_to_end(key)
+                    while len(self.frames) > self.max_ranges:
+                        self.frames.popitem(last=False)
+                return frames
+        finally:
+            with self.lock:
+                loading[1] -= 1
+                if not loading[1]:
+                    del self.loading[key]
+
+    def report(
+        self,
+        db: Session,
+        name: str,
+        start_date: date,
+        end_date: date,
+        compute: Callable[[SalesFrames], Any],
+        **params
+    ) -> Any:
+        """Cached result of compute(frames, **params) for the range"""
+        key = (name, start_date, end_date, tuple(sorted(params.items())))
+        with self.lock:
+            cached = self.reports.get(key)
+            if cached and cached[0] > time.monotonic():
+                self.reports.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        result = compute(self.get_frames(db, start_date, end_date), **params)
+
+        with self.lock:
+            now = time.monotonic()
+            for expired in [k for k, v in self.reports.items() if v[0] <= now]:
+                del self.reports[expired]
+            self.reports[key] = (self.expires_at(end_date), result)
+            self.reports.move_to_end(key)
+            while len(self.reports) > self.max_reports:
+                self.reports.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.frames.clear()
+            self.reports.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "cached_ranges": len(self.frames),
+                "cached_reports": len(self.reports),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+# Global analytics cache
+analytics_cache = AnalyticsCache()
@@ -0,0 +1,133 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from datetime import date, datetime, time, timedelta
+from typing import List
+import os
+
+import pandas as pd
+
+from app.models.order import Order, OrderItem
+from app.models.enums import OrderStatus
+from app.models.menu import MenuItem
+from app.models.order_session import OrderSession
+from app.models.order_archive import ArchivedOrder, ArchivedOrderItem, ArchivedOrderSession
+
+# Rows turned into a DataFrame at a time
+ANALYTICS_CHUNK_ROWS = int(os.getenv("ANALYTICS_CHUNK_ROWS", "20000"))
+
+ORDER_COLUMNS = ["order_id", "session_id", "table_number", "created_at", "total_price"]
+ITEM_COLUMNS = ["order_id", "menu_item_id", "quantity", "revenue"]
+MENU_COLUMNS = ["menu_item_id", "name", "category"]
+SESSION_COLUMNS = ["session_id", "table_number", "created_at", "closed_at"]
+
+
+class SalesFrames:
+    """Orders, order items, menu and sessions for a date range as DataFrames
+
+    Cancelled orders are left out. Money columns are float64 and
+    timestamps datetime64, so every report is a vectorized group-by.
+    """
+
+    def __init__(
+        self,
+        start_date: date,
+        end_date: date,
+        orders: pd.DataFrame,
+        items: pd.DataFrame,
+        menu: pd.DataFrame,
+        sessions: pd.DataFrame
+    ):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.orders = orders
+        self.items = items
+        self.menu = menu
+        self.sessions = sessions
+
+    @property
+    def days(self) -> int:
+        return (self.end_date - self.start_date).days + 1
+
+
+def read_frame(db: Session, stmt, columns: List[str], chunk_rows: int = ANALYTICS_CHUNK_ROWS) -> pd.DataFrame:
+    """Run a select and build a DataFrame from the driver's rows, one chunk at a time
+
+    Rows are fetched straight from the DBAPI cursor, skipping SQLAlchemy's
+    Row objects and per-value type processing: money and timestamps are
+    converted a column at a time by pandas instead. (Not stream_results:
+    its fetch strategy pre-buffers rows that the raw cursor would miss.)
+    """
+    result = db.connection().execute(stmt)
+    try:
+        chunks = []
+        while True:
+            rows = result.cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            chunks.append(pd.DataFrame.from_records(rows, columns=columns))
+    finally:
+        result.close()
+
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_hot_and_archived(db: Session, build_stmt, columns: List[str], chunk_rows: int) -> pd.DataFrame:
+    """read_frame over the hot tables and then the archive tables, as one frame"""
+    frames = [
+        read_frame(db, build_stmt(*models), columns, chunk_rows)
+        for models in ((Order, OrderItem, OrderSession), (ArchivedOrder, ArchivedOrderItem, ArchivedOrderSession))
+    ]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def load_sales_frames(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    chunk_rows: int = ANALYTICS_CHUNK_ROWS
+) -> SalesFrames:
+    """Column-only queries for the range, over hot and archived orders; no ORM objects are built"""
+    start = datetime.combine(start_date, time.min)
+    end = datetime.combine(end_date + timedelta(days=1), time.min)
+
+    orders = read_hot_and_archived(db, lambda order, item, session: select(
+        order.id, order.session_id, order.table_number, order.created_at, order.total_price
+    ).where(
+        order.created_at >= start,
+        order.created_at < end,
+        order.status != OrderStatus.CANCELLED
+    ), ORDER_COLUMNS, chunk_rows)
+    orders["created_at"] = pd.to_datetime(orders["created_at"])
+    orders["total_price"] = orders["total_price"].astype("float64")
+
+    # Items by order id range rather than a join back to orders: a plain index
+    # range scan, with the few out-of-range ids dropped afterwards
+    order_ids = orders["order_id"].to_numpy()
+    if len(order_ids):
+        low, high = int(order_ids.min()), int(order_ids.max())
+        items = read_hot_and_archived(db, lambda order, item, session: select(
+            item.order_id, item.menu_item_id, item.quantity, item.subtotal
+        ).where(item.order_id.between(low, high)), ITEM_COLUMNS, chunk_rows)
+        items = items[items["order_id"].isin(order_ids)].reset_index(drop=True)
+    else:
+        items = pd.DataFrame(columns=ITEM_COLUMNS)
+    items = items.astype({"order_id": "int64", "menu_item_id": "int64", "quantity": "int64", "revenue": "float64"})
+
+    menu = read_frame(db, select(MenuItem.id, MenuItem.name, MenuItem.category), MENU_COLUMNS, chunk_rows)
+    menu["menu_item_id"] = menu["menu_item_id"].astype("int64")
+
+    sessions = read_hot_and_archived(db, lambda order, item, session: select(
+        session.session_id, session.table_number, session.created_at, session.closed_at
+    ).where(
+        session.created_at >= start,
+        session.created_at < end
+    ), SESSION_COLUMNS, chunk_rows)
+    sessions["created_at"] = pd.to_datetime(sessions["created_at"])
+    sessions["closed_at"] = pd.to_datetime(sessions["closed_at"])
+
+    return SalesFrames(start_date, end_date, orders, items, menu, sessions)
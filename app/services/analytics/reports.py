@@ -0,0 +1,126 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from app.services.analytics.frames import SalesFrames
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def records(frame: pd.DataFrame) -> List[dict]:
+    """JSON-ready rows: numpy scalars become Python numbers and NaN becomes None"""
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict(orient="records")
+
+
+def item_popularity(frames: SalesFrames, limit: int = 20) -> List[dict]:
+    """Best sellers by quantity, with order count and share of item revenue"""
+    items = frames.items
+    if items.empty:
+        return []
+
+    stats = items.groupby("menu_item_id").agg(
+        orders=("order_id", "nunique"),
+        quantity=("quantity", "sum"),
+        revenue=("revenue", "sum")
+    )
+    stats["revenue_share"] = stats["revenue"] / stats["revenue"].sum()
+    stats["order_rate"] = stats["orders"] / max(len(frames.orders), 1)
+
+    top = stats.nlargest(limit, "quantity").reset_index()
+    top = top.merge(frames.menu, on="menu_item_id", how="left")
+    top["name"] = top["name"].fillna("Unknown")
+    top[["revenue", "revenue_share", "order_rate"]] = top[["revenue", "revenue_share", "order_rate"]].round(4)
+    return records(top[["menu_item_id", "name", "category", "orders", "quantity", "revenue", "revenue_share", "order_rate"]])
+
+
+def basket_pairs(frames: SalesFrames, limit: int = 20, min_orders: int = 2) -> List[dict]:
+    """Items most often ordered together, with support, confidence and lift
+
+    Each order's distinct items are joined to themselves on order_id and
+    pairs are counted with one group-by.
+    """
+    baskets = frames.items[["order_id", "menu_item_id"]].drop_duplicates()
+    total_orders = baskets["order_id"].nunique()
+    if total_orders == 0:
+        return []
+
+    pairs = baskets.merge(baskets, on="order_id", suffixes=("_a", "_b"))
+    pairs = pairs[pairs["menu_item_id_a"] < pairs["menu_item_id_b"]]
+    counts = pairs.groupby(["menu_item_id_a", "menu_item_id_b"]).size().rename("orders").reset_index()
+    counts = counts[counts["orders"] >= min_orders]
+    if counts.empty:
+        return []
+
+    item_orders = baskets.groupby("menu_item_id").size()
+    orders_a = item_orders.reindex(counts["menu_item_id_a"]).to_numpy()
+    orders_b = item_orders.reindex(counts["menu_item_id_b"]).to_numpy()
+    together = counts["orders"].to_numpy()
+
+    counts["support"] = together / total_orders
+    # Confidence both ways; report the stronger direction
+    counts["confidence"] = np.maximum(together / orders_a, together / orders_b)
+    counts["lift"] = together * total_orders / (orders_a * orders_b)
+
+    top = counts.nlargest(limit, ["orders", "lift"])
+    names = frames.menu.set_index("menu_item_id")["name"]
+    top.insert(1, "item_a", names.reindex(top["menu_item_id_a"]).fillna("Unknown").to_numpy())
+    top.insert(3, "item_b", names.reindex(top["menu_item_id_b"]).fillna("Unknown").to_numpy())
+    top[["support", "confidence", "lift"]] = top[["support", "confidence", "lift"]].round(4)
+    return records(top)
+
+
+def hourly_heatmap(frames: SalesFrames) -> dict:
+    """Orders and revenue by weekday (rows, Monday first) and hour of day (columns)"""
+    orders = frames.orders
+    weekday = orders["created_at"].dt.weekday.to_numpy()
+    hour = orders["created_at"].dt.hour.to_numpy()
+
+    # np.add.at fills the 7x24 grid in one pass without a pivot
+    counts = np.zeros((7, 24), dtype=np.int64)
+    revenue = np.zeros((7, 24), dtype=np.float64)
+    np.add.at(counts, (weekday, hour), 1)
+    np.add.at(revenue, (weekday, hour), orders["total_price"].to_numpy())
+
+    return {
+        "weekdays": WEEKDAYS,
+        "hours": list(range(24)),
+        "orders": counts.tolist(),
+        "revenue": np.round(revenue, 2).tolist()
+    }
+
+
+def table_turnover(frames: SalesFrames) -> List[dict]:
+    """Seatings per table per day, time at the table and spend per seating
+
+    A seating is an order session. Its length runs from session start to
+    close, or to its last order when the session was billed without a close time.
+    """
+    orders = frames.orders
+    if orders.empty:
+        return []
+
+    by_session = orders.groupby("session_id").agg(
+        table_number=("table_number", "first"),
+        orders=("order_id", "size"),
+        revenue=("total_price", "sum"),
+        first_order=("created_at", "min"),
+        last_order=("created_at", "max")
+    )
+    sessions = frames.sessions.set_index("session_id")
+    started = sessions["created_at"].reindex(by_session.index).fillna(by_session["first_order"])
+    ended = sessions["closed_at"].reindex(by_session.index).fillna(by_session["last_order"])
+    by_session["minutes"] = (ended - started).dt.total_seconds() / 60
+
+    tables = by_session.groupby("table_number").agg(
+        seatings=("orders", "size"),
+        orders=("orders", "sum"),
+        revenue=("revenue", "sum"),
+        average_minutes=("minutes", "mean")
+    )
+    tables["seatings_per_day"] = tables["seatings"] / frames.days
+    tables["revenue_per_seating"] = tables["revenue"] / tables["seatings"]
+
+    tables = tables.sort_values("seatings", ascending=False).round(2).reset_index()
+    return records(tables)
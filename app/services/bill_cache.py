@@ -0,0 +1,175 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+import hashlib
+import json
+import os
+import threading
+
+# Bump whenever the bill or invoice layout in pdf_service.py changes so cached PDFs are re-rendered.
+# Kept here rather than in pdf_service so the API process never has to import ReportLab.
+TEMPLATE_VERSION = "1"
+
+BILL_CACHE_DIR = os.getenv("BILL_CACHE_DIR", os.path.join("temp_bills", "cache"))
+BILL_CACHE_MEMORY_BYTES = int(os.getenv("BILL_CACHE_MEMORY_MB", "32")) * 1024 * 1024
+BILL_CACHE_DISK_BYTES = int(os.getenv("BILL_CACHE_DISK_MB", "512")) * 1024 * 1024
+
+
+def content_key(kind: str, *content) -> str:
+    """Hash everything printed on a document plus the template version"""
+    canonical = json.dumps(
+        {"kind": kind, "template": TEMPLATE_VERSION, "content": content},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def bill_key(order_details: dict, customer_info: dict) -> str:
+    return content_key("bill", order_details, customer_info)
+
+
+class BillCache:
+    """Rendered PDFs keyed by a hash of their billable content
+
+    Two tiers, both LRU and bounded by size: recent PDFs in memory, and a
+    larger set on disk that survives restarts and is shared by every
+    worker on the host. Since the key covers items, prices, totals, customer
+    details and the template version, an edited order simply hashes to a new
+    key. The entry it replaces is dropped as soon as the new one is stored.
+    """
+
+    def __init__(
+        self,
+        directory: str = BILL_CACHE_DIR,
+        memory_bytes: int = BILL_CACHE_MEMORY_BYTES,
+        disk_bytes: int = BILL_CACHE_DISK_BYTES
+    ):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self.memory_size = 0
+        self.disk: Optional["OrderedDict[str, int]"] = None
+        self.disk_size = 0
+        # document id (e.g. bill:ORD000042) -> key of its current rendering
+        self.latest: Dict[str, str] = {}
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def load_disk_index(self):
+        """Index files already on disk, oldest first, the first time the cache is used"""
+        if self.disk is not None:
+            return
+
+        self.disk = OrderedDict()
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pdf"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self.disk[key] = size
+            self.disk_size += size
+
+    def contains(self, key: str) -> bool:
+        with self.lock:
+            self.load_disk_index()
+            return key in self.memory or key in self.disk
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            self.load_disk_index()
+
+            pdf = self.memory.get(key)
+            if pdf is not None:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return pdf
+
+            if key in self.disk:
+                try:
+                    with open(self.path(key), "rb") as f:
+                        pdf = f.read()
+                except OSError:
+                    # Evicted by another worker sharing the directory
+                    self.disk_size -= self.disk.pop(key)
+                else:
+                    self.disk.move_to_end(key)
+                    os.utime(self.path(key))
+                    self.remember(key, pdf)
+                    self.hits += 1
+                    return pdf
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, pdf: bytes, document_id: Optional[str] = None):
+        with self.lock:
+            self.load_disk_index()
+            self.remember(key, pdf)
+
+            if key not in self.disk:
+                # Write then rename so a concurrent reader never sees half a file
+                path = self.path(key)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(pdf)
+                os.replace(tmp_path, path)
+                self.disk[key] = len(pdf)
+                self.disk_size += len(pdf)
+                while self.disk_size > self.disk_bytes and len(self.disk) > 1:
+                    self.discard_file(next(iter(self.disk)))
+
+            if document_id is not None:
+                previous = self.latest.get(document_id)
+                if previous is not None and previous != key:
+                    self.discard(previous)
+                self.latest[document_id] = key
+
+    def remember(self, key: str, pdf: bytes):
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return
+
+        self.memory[key] = pdf
+        self.memory_size += len(pdf)
+        while self.memory_size > self.memory_bytes and len(self.memory) > 1:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_size -= len(evicted)
+
+    def discard_file(self, key: str):
+        self.disk_size -= self.disk.pop(key, 0)
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def discard(self, key: str):
+        """Drop a rendering that no longer matches its order"""
+        with self.lock:
+            pdf = self.memory.pop(key, None)
+            if pdf is not None:
+                self.memory_size -= len(pdf)
+            if self.disk is not None and key in self.disk:
+                self.discard_file(key)
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory_size,
+                "disk_entries": len(self.disk or ()),
+                "disk_bytes": self.disk_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+bill_cache = BillCache()
@@ -0,0 +1,112 @@
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Tuple
+
+from app.models.order import Order, OrderStatus
+from app.models.customer import Customer
+from app.services.order_archive import find_order, load_items
+from app.services.job_queue import job_queue, PermanentJobError
+from app.services.email_service import email_service
+from app.services.pdf_pool import pdf_renderer
+from app.services.bill_cache import bill_cache, bill_key
+from app.services.whatsapp_service import whatsapp_service
+
+# Job kinds
+BILL_PDF = "bill_pdf"
+BILL_EMAIL = "bill_email"
+WHATSAPP_BILL = "whatsapp_bill"
+
+
+def load_bill_details(db: Session, order_id: int) -> Tuple[Order, Dict[str, Any], Dict[str, Any]]:
+    """Load an order with its customer and items shaped for the PDF and e-mail templates"""
+    order = find_order(db, order_id)
+    if not order:
+        raise PermanentJobError(f"Order {order_id} not found")
+
+    customer = db.query(Customer).filter(Customer.id == order.customer_id).first()
+    if not customer:
+        raise PermanentJobError(f"Customer for order {order_id} not found")
+
+    items_list = [
+        {
+            "name": name,
+            "quantity": item.quantity,
+            "price": item.price
+        }
+        for item, name in load_items(db, [order]).get(order.id, [])
+    ]
+
+    order_details = {
+        "order_number": order.order_number,
+        "table_number": order.table_number,
+        "total_amount": order.total_price,
+        "payment_method": order.payment_method,
+        "created_at": order.created_at,
+        "items": items_list
+    }
+
+    customer_info = {
+        "name": customer.name,
+        "phone": customer.phone_number,
+        "email": customer.email
+    }
+    return order, order_details, customer_info
+
+
+def bill_document_id(order_details: dict) -> str:
+    return f"bill:{order_details['order_number']}"
+
+
+def cached_bill_pdf(order_details: dict, customer_info: dict) -> bytes:
+    """Serve the bill from the cache, rendering it once per distinct content"""
+    key = bill_key(order_details, customer_info)
+    pdf = bill_cache.get(key)
+    if pdf is None:
+        pdf = pdf_renderer.render("render_bill_pdf", order_details, customer_info)
+        bill_cache.put(key, pdf, bill_document_id(order_details))
+    return pdf
+
+
+@job_queue.handler(BILL_PDF)
+def render_bill_pdf(db: Session, payload: dict):
+    order, order_details, customer_info = load_bill_details(db, payload["order_id"])
+    cached_bill_pdf(order_details, customer_info)
+    return {
+        "download_url": f"/api/billing/pdf/{order.id}",
+        "filename": f"bill_{order.order_number}.pdf"
+    }
+
+
+@job_queue.handler(BILL_EMAIL)
+def send_bill_email(db: Session, payload: dict):
+    order, order_details, customer_info = load_bill_details(db, payload["order_id"])
+    if not customer_info["email"]:
+        raise PermanentJobError(f"Customer for order {order.id} has no e-mail address")
+
+    # Re-sends reuse the cached PDF instead of rendering it again
+    result = email_service.send_bill_email(
+        customer_info["email"],
+        customer_info["name"],
+        order_details,
+        pdf_bytes=cached_bill_pdf(order_details, customer_info)
+    )
+    if not result.get("success"):
+        # SMTP failures are usually transient; let the queue retry
+        raise RuntimeError(result.get("error", "E-mail send failed"))
+    return {"email": customer_info["email"], "order_number": order.order_number}
+
+
+@job_queue.handler(WHATSAPP_BILL)
+def send_whatsapp_bill(db: Session, payload: dict):
+    order, order_details, customer_info = load_bill_details(db, payload["order_id"])
+
+    body = whatsapp_service.format_bill_message(
+        customer_info["name"],
+        order.id,
+        order_details["items"],
+        order_details["total_amount"]
+    )
+    message_sid = whatsapp_service.send_message(customer_info["phone"], body)
+
+    order.status = OrderStatus.CONFIRMED
+    db.commit()
+    return {"message_sid": message_sid}
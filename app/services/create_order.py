@@ -1,15 +1,54 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from sqlalchemy import func
+from sqlalchemy import insert
+from typing import List, Tuple
 
 from app.models.order import Order, OrderItem
 from app.models.customer import Customer
-from app.models.menu import MenuItem
 from app.models.enums import OrderStatus
+from app.services.order_loader import load_menu_items
+
+
+def price_order_items(db: Session, items: list) -> Tuple[float, List[dict]]:
+    """Resolve prices for all line items with one query and validate them in memory"""
+    menu_items = load_menu_items(db, (item["menu_item_id"] for item in items))
+
+    total = 0
+    order_items_data = []
+
+    for item in items:
+        menu_item = menu_items.get(item["menu_item_id"])
+
+        if not menu_item or not menu_item.is_available:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Menu item {item['menu_item_id']} not available"
+            )
+
+        item_total = float(menu_item.price) * item["quantity"]
+        total += item_total
+        order_items_data.append({
+            "menu_item_id": menu_item.id,
+            "quantity": item["quantity"],
+            "price": menu_item.price,
+            "subtotal": item_total,
+            "special_instructions": item.get("special_instructions"),
+        })
+
+    return total, order_items_data
+
+
+def insert_order_items(db: Session, order_id: int, order_items_data: List[dict]):
+    """Write all rows for an order with a single executemany INSERT"""
+    if order_items_data:
+        db.execute(
+            insert(OrderItem),
+            [{"order_id": order_id, **item} for item in order_items_data]
+        )
 
 
 def create_order(db: Session, table_number: str, phone_number: str, items: list):
-    
+
     # sanitize phone number (VERY IMPORTANT)
     clean_phone = str(phone_number).strip()
 
@@ -29,48 +68,22 @@ def create_order(db: Session, table_number: str, phone_number: str, items: list)
         db.add(customer)
         db.flush()
 
+    # resolve all prices up front so nothing is written for an invalid cart
+    total, order_items_data = price_order_items(db, items)
+
     # create order - let database trigger handle order_number
     order = Order(
         table_number=table_number,  # Keep as string
         customer_id=customer.id,
-        status="PENDING",
-        total_price=0  # Will be updated later
+        status=OrderStatus.PENDING,
+        total_price=total,
+        subtotal=total
     )
 
     db.add(order)
     db.flush()  # get order ID
 
-    total = 0
-
-    # process items
-    for item in items:
-
-        menu_item = db.query(MenuItem).filter(
-            MenuItem.id == item["menu_item_id"],
-            MenuItem.is_available == True
-        ).first()
-
-        if not menu_item:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Menu item {item['menu_item_id']} not available"
-            )
-
-        price = menu_item.price * item["quantity"]
-
-        order_item = OrderItem(
-            order_id=order.id,
-            menu_item_id=menu_item.id,
-            quantity=item["quantity"],
-            price=price
-        )
-
-        db.add(order_item)
-
-        total += price
-
-    # Update total price
-    order.total_price = total
+    insert_order_items(db, order.id, order_items_data)
 
     db.commit()
     db.refresh(order)
@@ -3,79 +3,381 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
+from contextlib import contextmanager
+from typing import Dict, List, Optional
 import os
+import queue
+import threading
+import time
 from dotenv import load_dotenv
 
+from app.core.metrics import metrics
+
 load_dotenv()
 
+# Errors that mean the connection itself is unusable and should be replaced
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)
+
+
+def is_connection_error(error: Exception) -> bool:
+    """Transport failures (dropped socket, timeout, refused connect)
+
+    Every SMTPException subclasses OSError, so a plain OSError check would
+    also catch the server answering with an error (refused recipient, bad
+    login, rejected data). Those fail the message, not the connection.
+    """
+    if isinstance(error, CONNECTION_ERRORS):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+SMTP_SEND = metrics.histogram("smtp_send_seconds", "Time for one SMTP sendmail on a pooled connection")
+
+
+class PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.sent = 0
+
+
+class SMTPConnectionPool:
+    """Keeps authenticated SMTP sessions open and hands them out to senders
+
+    STARTTLS and LOGIN happen once per connection instead of once per bill.
+    A connection is quit and replaced after max_messages sends. One that has
+    sat idle longer than noop_after seconds is checked with NOOP first, and
+    any connection that fails mid-send is dropped and the send retried once
+    on a fresh one.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = True,
+        size: int = 4,
+        max_messages: int = 100,
+        noop_after: float = 30,
+        timeout: float = 30,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.max_messages = max_messages
+        self.noop_after = noop_after
+        self.timeout = timeout
+
+        self.idle: "queue.LifoQueue[PooledConnection]" = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+
+        self.lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.metrics = {
+            "messages_sent": 0,
+            "messages_failed": 0,
+            "connections_opened": 0,
+            "connections_reused": 0,
+            "reconnects": 0,
+            "send_seconds": 0.0,
+        }
+
+    def count(self, name: str, amount=1):
+        with self.lock:
+            self.metrics[name] += amount
+
+    def open(self) -> PooledConnection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self.count("connections_opened")
+        return PooledConnection(smtp)
+
+    def discard(self, connection: PooledConnection):
+        try:
+            connection.smtp.quit()
+        except Exception:
+            connection.smtp.close()
+
+    def checkout(self) -> PooledConnection:
+        while True:
+            try:
+                connection = self.idle.get_nowait()
+            except queue.Empty:
+                return self.open()
+
+            if time.monotonic() - connection.last_used > self.noop_after:
+                try:
+                    status, _ = connection.smtp.noop()
+                    if status != 250:
+                        raise smtplib.SMTPServerDisconnected("NOOP failed")
+                except Exception:
+                    self.discard(connection)
+                    continue
+
+            self.count("connections_reused")
+            return connection
+
+    def checkin(self, connection: PooledConnection):
+        connection.last_used = time.monotonic()
+        if connection.sent >= self.max_messages:
+            self.discard(connection)
+        else:
+            self.idle.put(connection)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a live connection; it is dropped instead of returned if the transport failed"""
+        self.slots.acquire()
+        try:
+            connection = self.checkout()
+            try:
+                yield connection
+            except Exception as e:
+                # An SMTP error reply leaves the session usable (smtplib sends RSET)
+                if isinstance(e, smtplib.SMTPException) and not is_connection_error(e):
+                    self.checkin(connection)
+                else:
+                    self.discard(connection)
+                raise
+            else:
+                self.checkin(connection)
+        finally:
+            self.slots.release()
+
+    def send_with(self, connection: PooledConnection, from_addr: str, to_addr: str, message: str):
+        start = time.perf_counter()
+        connection.smtp.sendmail(from_addr, to_addr, message)
+        connection.sent += 1
+        elapsed = time.perf_counter() - start
+        SMTP_SEND.observe(elapsed)
+        self.count("send_seconds", elapsed)
+        self.count("messages_sent")
+
+    def send(self, from_addr: str, to_addr: str, message: str):
+        """Send one message, retrying once on a fresh connection if the pooled one died"""
+        for attempt in range(2):
+            try:
+                with self.connection() as connection:
+                    self.send_with(connection, from_addr, to_addr, message)
+                return
+            except Exception as e:
+                if attempt == 0 and is_connection_error(e):
+                    self.count("reconnects")
+                    continue
+                self.count("messages_failed")
+                raise
+
+    def send_batch(self, from_addr: str, messages: List[tuple]) -> List[Optional[str]]:
+        """Send (to_addr, message) pairs over as few connections as possible
+
+        Returns one entry per message: None on success, otherwise the error.
+        """
+        errors: List[Optional[str]] = []
+        pending = list(messages)
+
+        while pending:
+            try:
+                with self.connection() as connection:
+                    while pending:
+                        to_addr, message = pending[0]
+                        try:
+                            self.send_with(connection, from_addr, to_addr, message)
+                            errors.append(None)
+                        except smtplib.SMTPException as e:
+                            if is_connection_error(e):
+                                raise
+                            # Refused by the server (bad address, rejected data): record it and keep going
+                            self.count("messages_failed")
+                            errors.append(str(e))
+                        pending.pop(0)
+
+                        if connection.sent >= self.max_messages:
+                            break
+            except Exception as e:
+                if not is_connection_error(e):
+                    # e.g. login refused: no message in the batch can go out
+                    self.count("messages_failed", len(pending))
+                    raise
+                # Connection died mid-batch; the current message gets one retry on a new one
+                self.count("reconnects")
+                to_addr, message = pending.pop(0)
+                try:
+                    self.send(from_addr, to_addr, message)
+                    errors.append(None)
+                except Exception as e:
+                    errors.append(str(e))
+
+        return errors
+
+    def close(self):
+        while True:
+            try:
+                self.discard(self.idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            stats = dict(self.metrics)
+        uptime = time.monotonic() - self.started_at
+        sent = stats["messages_sent"]
+        stats["idle_connections"] = self.idle.qsize()
+        stats["uptime_seconds"] = round(uptime, 1)
+        stats["messages_per_second"] = round(sent / uptime, 3) if uptime else 0.0
+        stats["avg_send_ms"] = round(stats["send_seconds"] / sent * 1000, 2) if sent else 0.0
+        stats["send_seconds"] = round(stats["send_seconds"], 3)
+        return stats
+
+
 class EmailService:
     def __init__(self):
         self.gmail_email = os.getenv("GMAIL_EMAIL")
         self.gmail_password = os.getenv("GMAIL_PASSWORD")
         self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
         self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
-    
-    def send_bill_email(self, to_email: str, customer_name: str, order_details: dict, pdf_path: str = None):
+        self.pool = SMTPConnectionPool(
+            self.smtp_server,
+            self.smtp_port,
+            self.gmail_email,
+            self.gmail_password,
+            use_tls=os.getenv("SMTP_USE_TLS", "true").lower() != "false",
+            size=int(os.getenv("SMTP_POOL_SIZE", "4")),
+            max_messages=int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100")),
+        )
+
+    def build_bill_message(
+        self,
+        to_email: str,
+        customer_name: str,
+        order_details: dict,
+        pdf_path: str = None,
+        pdf_bytes: bytes = None
+    ) -> str:
+        """Build the bill e-mail (with optional PDF attachment) as a wire-format string"""
+        msg = MIMEMultipart()
+        msg['From'] = self.gmail_email
+        msg['To'] = to_email
+        msg['Subject'] = f"Restaurant Bill - Order #{order_details.get('order_number', 'N/A')}"
+
+        # Email body
+        body = f"""
+        Dear {customer_name},
+
+        Thank you for dining with us!
+
+        Order Details:
+        Order Number: {order_details.get('order_number', 'N/A')}
+        Table Number: {order_details.get('table_number', 'N/A')}
+        Total Amount: ₹{order_details.get('total_amount', 0)}
+
+        Items Ordered:
+        """
+
+        for item in order_details.get('items', []):
+            body += f"- {item.get('name', 'Unknown')} x{item.get('quantity', 1)} = ₹{item.get('price', 0)}\n"
+
+        body += f"""
+
+        Payment Method: {order_details.get('payment_method', 'UPI')}
+
+        We hope to see you again soon!
+
+        Best regards,
+        Restaurant Team
+        """
+
+        msg.attach(MIMEText(body, 'plain'))
+
+        # Attach PDF if provided, either rendered in memory or from a file
+        if pdf_bytes is None and pdf_path and os.path.exists(pdf_path):
+            with open(pdf_path, "rb") as attachment:
+                pdf_bytes = attachment.read()
+
+        if pdf_bytes is not None:
+            part = MIMEBase('application', 'octet-stream')
+            part.set_payload(pdf_bytes)
+
+            encoders.encode_base64(part)
+            part.add_header(
+                'Content-Disposition',
+                f'attachment; filename= "bill_{order_details.get("order_number", "N/A")}.pdf"'
+            )
+            msg.attach(part)
+
+        return msg.as_string()
+
+    def send_bill_email(
+        self,
+        to_email: str,
+        customer_name: str,
+        order_details: dict,
+        pdf_path: str = None,
+        pdf_bytes: bytes = None
+    ):
         """Send bill email with PDF attachment"""
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.gmail_email
-            msg['To'] = to_email
-            msg['Subject'] = f"Restaurant Bill - Order #{order_details.get('order_number', 'N/A')}"
-            
-            # Email body
-            body = f"""
-            Dear {customer_name},
-            
-            Thank you for dining with us!
-            
-            Order Details:
-            Order Number: {order_details.get('order_number', 'N/A')}
-            Table Number: {order_details.get('table_number', 'N/A')}
-            Total Amount: ₹{order_details.get('total_amount', 0)}
-            
-            Items Ordered:
-            """
-            
-            for item in order_details.get('items', []):
-                body += f"- {item.get('name', 'Unknown')} x{item.get('quantity', 1)} = ₹{item.get('price', 0)}\n"
-            
-            body += f"""
-            
-            Payment Method: {order_details.get('payment_method', 'UPI')}
-            
-            We hope to see you again soon!
-            
-            Best regards,
-            Restaurant Team
-            """
-            
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Attach PDF if provided
-            if pdf_path and os.path.exists(pdf_path):
-                with open(pdf_path, "rb") as attachment:
-                    part = MIMEBase('application', 'octet-stream')
-                    part.set_payload(attachment.read())
-                
-                encoders.encode_base64(part)
-                part.add_header(
-                    'Content-Disposition',
-                    f'attachment; filename= "bill_{order_details.get("order_number", "N/A")}.pdf"'
-                )
-                msg.attach(part)
-            
-            # Send email
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.gmail_email, self.gmail_password)
-            text = msg.as_string()
-            server.sendmail(self.gmail_email, to_email, text)
-            server.quit()
-            
+            message = self.build_bill_message(to_email, customer_name, order_details, pdf_path, pdf_bytes)
+            self.pool.send(self.gmail_email, to_email, message)
+
             return {"success": True, "message": "Bill sent successfully"}
-            
+
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    def send_bill_emails(self, bills: List[dict]) -> List[dict]:
+        """Send many bills over pooled connections
+
+        Each entry has the send_bill_email arguments as keys (to_email,
+        customer_name, order_details, pdf_path or pdf_bytes). Results come
+        back in order.
+        """
+        messages = [
+            (bill["to_email"], self.build_bill_message(
+                bill["to_email"],
+                bill["customer_name"],
+                bill["order_details"],
+                bill.get("pdf_path"),
+                bill.get("pdf_bytes")
+            ))
+            for bill in bills
+        ]
+
+        try:
+            errors = self.pool.send_batch(self.gmail_email, messages)
+        except Exception as e:
+            return [{"success": False, "error": str(e)} for _ in bills]
+
+        return [
+            {"success": True, "message": "Bill sent successfully"} if error is None
+            else {"success": False, "error": error}
+            for error in errors
+        ]
+
+    def stats(self):
+        return self.pool.stats()
+
+    def close(self):
+        self.pool.close()
+
 email_service = EmailService()
+
+
+def email_metrics():
+    stats = email_service.stats()
+    for name in ("messages_sent", "messages_failed", "connections_opened", "reconnects"):
+        yield f"smtp_{name}_total", "counter", f"SMTP pool {name.replace('_', ' ')}", (), {(): stats[name]}
+    yield "smtp_idle_connections", "gauge", "Idle pooled SMTP connections", (), {(): stats["idle_connections"]}
+
+
+metrics.add_collector(email_metrics)
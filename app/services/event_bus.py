@@ -0,0 +1,139 @@
+from typing import Awaitable, Callable, List, Optional
+import asyncio
+import itertools
+import json
+import os
+
+# Leave unset for a single worker; set to redis://host:6379/0 when running several
+EVENT_BUS_URL = os.getenv("EVENT_BUS_URL")
+EVENT_BUS_CHANNEL = os.getenv("EVENT_BUS_CHANNEL", "restaurant:ws")
+
+# (sequence number, topics or None for every connection, pre-serialized message, coalesce key)
+DeliverHandler = Callable[[int, Optional[List[str]], str, Optional[str]], Awaitable[None]]
+
+
+class InProcessEventBus:
+    """Delivers straight to this worker's sockets - the single-worker default"""
+
+    def __init__(self, deliver: DeliverHandler):
+        self.deliver = deliver
+        self.sequence = itertools.count(1)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def next_sequence(self) -> int:
+        return next(self.sequence)
+
+    async def publish(self, seq: int, topics: Optional[List[str]], message: str, coalesce_key: Optional[str] = None):
+        await self.deliver(seq, topics, message, coalesce_key)
+
+
+class RedisEventBus:
+    """Fans broadcasts out to every worker through a Redis pub/sub channel
+
+    Works with any server speaking the Redis protocol (Redis, Valkey,
+    KeyDB, or fakeredis for local runs). Each worker, including the one
+    that published, receives the event from the channel and delivers it to
+    its own sockets, so nothing is sent twice. If the broker is
+    unreachable, events fall back to local delivery and the listener keeps
+    reconnecting in the background.
+
+    Sequence numbers come from an INCR on a shared key so every worker's
+    replay buffer numbers events the same way.
+    """
+
+    def __init__(self, deliver: DeliverHandler, url: str, channel: str = EVENT_BUS_CHANNEL, client=None):
+        self.deliver = deliver
+        self.url = url
+        self.channel = channel
+        self.client = client
+        self.listener: Optional[asyncio.Task] = None
+        self.local_sequence = itertools.count(1)
+
+    async def start(self):
+        if self.client is None:
+            import redis.asyncio as redis
+            self.client = redis.from_url(self.url)
+
+        self.listener = asyncio.create_task(self.listen())
+
+    async def stop(self):
+        if self.listener:
+            self.listener.cancel()
+            try:
+                await self.listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self.listener = None
+
+        if self.client is not None:
+            await self.client.aclose()
+
+    async def next_sequence(self) -> int:
+        if self.client is not None:
+            try:
+                return int(await self.client.incr(f"{self.channel}:seq"))
+            except Exception as e:
+                print(f"Event bus sequence failed, using local counter: {e}")
+        return next(self.local_sequence)
+
+    async def publish(self, seq: int, topics: Optional[List[str]], message: str, coalesce_key: Optional[str] = None):
+        if self.client is None or self.listener is None:
+            await self.deliver(seq, topics, message, coalesce_key)
+            return
+
+        envelope = json.dumps({
+            "seq": seq,
+            "topics": topics,
+            "message": message,
+            "coalesce_key": coalesce_key
+        })
+        try:
+            await self.client.publish(self.channel, envelope)
+        except Exception as e:
+            print(f"Event bus publish failed, delivering locally only: {e}")
+            await self.deliver(seq, topics, message, coalesce_key)
+
+    async def listen(self):
+        retry_delay = 1
+
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                retry_delay = 1
+
+                async for event in pubsub.listen():
+                    if event.get("type") != "message":
+                        continue
+                    envelope = json.loads(event["data"])
+                    await self.deliver(
+                        envelope["seq"],
+                        envelope["topics"],
+                        envelope["message"],
+                        envelope.get("coalesce_key")
+                    )
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Event bus listener error: {e}")
+                print(f"   Reconnecting in {retry_delay} seconds...")
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 30)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+def create_event_bus(deliver: DeliverHandler, url: Optional[str] = EVENT_BUS_URL):
+    """Pick the event bus backend from EVENT_BUS_URL"""
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisEventBus(deliver, url)
+    return InProcessEventBus(deliver)
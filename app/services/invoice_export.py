@@ -0,0 +1,206 @@
+from sqlalchemy.orm import Session
+from collections import deque
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterator, List, Tuple
+import os
+import zipfile
+
+from app.db import database
+from app.models.order import Order, OrderStatus
+from app.models.order_session import OrderSession, SessionStatus
+from app.services.order_archive import ARCHIVE_MODELS, HOT_MODELS
+from app.services.order_loader import load_order_items
+from app.services.pdf_pool import pdf_renderer
+
+# Sessions loaded per round of queries
+INVOICE_EXPORT_BATCH = int(os.getenv("INVOICE_EXPORT_BATCH", "100"))
+# Most invoices the API merges into one PDF; larger ranges must use the ZIP export
+INVOICE_PDF_MAX_INVOICES = int(os.getenv("INVOICE_PDF_MAX_INVOICES", "500"))
+# GST percentage on session bills, as charged by /billing/generate-session-bill
+INVOICE_TAX_RATE = 5
+
+
+def date_bounds(start_date: date, end_date: date) -> Tuple[datetime, datetime]:
+    """[start of start_date, start of the day after end_date)"""
+    return datetime.combine(start_date, time.min), datetime.combine(end_date + timedelta(days=1), time.min)
+
+
+def closed_sessions_query(db: Session, start_date: date, end_date: date, session_model=OrderSession):
+    """session_model=ArchivedOrderSession reads sessions already moved to the archive"""
+    start, end = date_bounds(start_date, end_date)
+    return db.query(session_model).filter(
+        session_model.status == SessionStatus.CLOSED,
+        session_model.created_at >= start,
+        session_model.created_at < end
+    )
+
+
+def count_invoices(db: Session, start_date: date, end_date: date) -> int:
+    return sum(
+        closed_sessions_query(db, start_date, end_date, session_model).count()
+        for session_model, _, _ in (ARCHIVE_MODELS, HOT_MODELS)
+    )
+
+
+def build_invoice_data(session: OrderSession, orders: List[Order], items_by_order: Dict[int, list]) -> dict:
+    """Shape one closed session for PDFService.render_session_invoice_pdf"""
+    lines: Dict[Tuple[str, float], dict] = {}
+    for order in orders:
+        for item, name in items_by_order.get(order.id, []):
+            price = float(item.price)
+            line = lines.setdefault((name, price), {"name": name, "quantity": 0, "price": price, "subtotal": 0.0})
+            line["quantity"] += item.quantity
+            line["subtotal"] += float(item.subtotal)
+
+    subtotal = sum(line["subtotal"] for line in lines.values())
+    tax_amount = round(subtotal * INVOICE_TAX_RATE / 100, 2)
+
+    return {
+        "invoice_number": f"INV-{session.session_id}",
+        "session_id": session.session_id,
+        "table_number": session.table_number,
+        "created_at": session.created_at,
+        "orders": [
+            {
+                "order_number": order.order_number or f"#{order.id}",
+                "status": order.status.value,
+                "total_price": float(order.total_price or 0)
+            }
+            for order in orders
+        ],
+        "items": list(lines.values()),
+        "subtotal": subtotal,
+        "tax_rate": INVOICE_TAX_RATE,
+        "tax_amount": tax_amount,
+        "grand_total": subtotal + tax_amount
+    }
+
+
+def iter_session_invoices(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    batch_size: int = INVOICE_EXPORT_BATCH
+) -> Iterator[dict]:
+    """Yield invoice data for closed sessions in the range, three queries per batch
+
+    Archived sessions come first (they are the older ones), then the hot
+    tables. A session is archived together with its orders and items, so
+    each side is read on its own. Batches are keyset-paginated on the
+    session id and the identity map is cleared after each one, so memory
+    does not grow with the size of the range.
+    """
+    for models in (ARCHIVE_MODELS, HOT_MODELS):
+        yield from iter_side_invoices(db, start_date, end_date, models, batch_size)
+
+
+def iter_side_invoices(db: Session, start_date: date, end_date: date, models: tuple, batch_size: int) -> Iterator[dict]:
+    session_model, order_model, item_model = models
+    last_id = 0
+    while True:
+        sessions = (
+            closed_sessions_query(db, start_date, end_date, session_model)
+            .filter(session_model.id > last_id)
+            .order_by(session_model.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not sessions:
+            return
+        last_id = sessions[-1].id
+
+        orders = (
+            db.query(order_model)
+            .filter(
+                order_model.session_id.in_([session.session_id for session in sessions]),
+                order_model.status != OrderStatus.CANCELLED
+            )
+            .order_by(order_model.created_at, order_model.id)
+            .all()
+        )
+        items_by_order = load_order_items(db, (order.id for order in orders), item_model)
+
+        orders_by_session: Dict[str, List[Order]] = {}
+        for order in orders:
+            orders_by_session.setdefault(order.session_id, []).append(order)
+
+        for session in sessions:
+            session_orders = orders_by_session.get(session.session_id)
+            if session_orders:
+                yield build_invoice_data(session, session_orders, items_by_order)
+
+        db.expunge_all()
+
+
+def render_in_order(invoices: Iterator[dict], window: int = None) -> Iterator[Tuple[dict, bytes]]:
+    """Render invoices in the PDF process pool, keeping a bounded number in flight"""
+    window = window or max(2, pdf_renderer.workers * 2)
+    in_flight = deque()
+
+    for invoice in invoices:
+        in_flight.append((invoice, pdf_renderer.submit_when_free("render_session_invoice_pdf", invoice)))
+        if len(in_flight) >= window:
+            invoice, future = in_flight.popleft()
+            yield invoice, future.result()
+
+    while in_flight:
+        invoice, future = in_flight.popleft()
+        yield invoice, future.result()
+
+
+class ZipStream:
+    """Write-only file object that hands zipfile's output back in chunks
+
+    It has tell() but no seek(), so zipfile writes data descriptors and
+    never goes back to patch headers.
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def export_invoices_zip(start_date: date, end_date: date) -> Iterator[bytes]:
+    """Stream a ZIP with one PDF per closed session, one archive entry at a time"""
+    db = database.SessionLocal()
+    try:
+        stream = ZipStream()
+        # PDFs are already compressed; deflating them again only costs CPU
+        with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_STORED) as archive:
+            for invoice, pdf in render_in_order(iter_session_invoices(db, start_date, end_date)):
+                archive.writestr(f"{invoice['invoice_number']}.pdf", pdf)
+                yield stream.drain()
+        yield stream.drain()
+    finally:
+        db.close()
+
+
+def export_invoices_pdf(start_date: date, end_date: date) -> bytes:
+    """One multi-page PDF with every invoice in the range
+
+    ReportLab keeps a document's pages in memory until it is saved, so
+    unlike the ZIP export this grows with the number of invoices; the API
+    refuses ranges over INVOICE_PDF_MAX_INVOICES.
+    """
+    db = database.SessionLocal()
+    try:
+        invoices = list(iter_session_invoices(db, start_date, end_date))
+    finally:
+        db.close()
+    return pdf_renderer.render("render_session_invoices_pdf", invoices)
@@ -0,0 +1,225 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+import json
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+
+from app.core.metrics import metrics
+from app.db import database
+from app.models.job import Job, JobStatus
+
+# Worker pool and retry settings
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE = float(os.getenv("JOB_RETRY_BASE", "5"))
+JOB_RETRY_MAX = float(os.getenv("JOB_RETRY_MAX", "300"))
+# A RUNNING job whose worker died is picked up again after this many seconds
+JOB_LOCK_TIMEOUT = int(os.getenv("JOB_LOCK_TIMEOUT", "300"))
+
+# kind -> handler(db, payload) returning a JSON-serializable result
+JobHandler = Callable[[Session, dict], Any]
+
+JOB_DURATION = metrics.histogram(
+    "job_duration_seconds", "Time spent running job handlers by outcome", ("kind", "outcome"),
+    (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+)
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler for failures a retry cannot fix; the job is dead-lettered at once"""
+    pass
+
+
+class JobQueue:
+    """Durable job queue stored in the jobs table with a thread worker pool
+
+    Jobs survive restarts because they live in MySQL. Several API workers
+    can run pools against the same table: claiming uses
+    SELECT ... FOR UPDATE SKIP LOCKED, so each job runs once at a time.
+    Failures are retried with exponential backoff plus jitter. After
+    max_attempts the job is marked DEAD (dead-lettered) with its last error.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS):
+        self.workers = workers
+        self.handlers: Dict[str, JobHandler] = {}
+        self.threads = []
+        self.stop_event = threading.Event()
+        self.wakeup = threading.Event()
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def handler(self, kind: str):
+        """Decorator registering the function that runs jobs of this kind"""
+        def register(func: JobHandler) -> JobHandler:
+            self.handlers[kind] = func
+            return func
+        return register
+
+    def enqueue(self, db: Session, kind: str, payload: dict, max_attempts: Optional[int] = None) -> Job:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = Job(
+            kind=kind,
+            payload=json.dumps(payload, default=str),
+            status=JobStatus.QUEUED,
+            attempts=0,
+            max_attempts=max_attempts or JOB_MAX_ATTEMPTS,
+            run_after=datetime.now(),
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        self.wakeup.set()
+        return job
+
+    def start(self):
+        if database.SessionLocal is None:
+            print("Job queue not started - database session not available")
+            return
+        if self.threads:
+            return
+
+        self.stop_event.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self.run_worker,
+                args=(f"{self.worker_prefix}:{index}",),
+                name=f"job-worker-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self.threads.append(thread)
+        print(f"Job queue started with {self.workers} workers")
+
+    def stop(self, timeout: float = 10):
+        self.stop_event.set()
+        self.wakeup.set()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+
+    def run_worker(self, worker_id: str):
+        while not self.stop_event.is_set():
+            try:
+                ran = self.run_next(worker_id)
+            except Exception as e:
+                print(f"Job worker {worker_id} error: {e}")
+                ran = False
+
+            if not ran:
+                self.wakeup.wait(JOB_POLL_INTERVAL)
+                self.wakeup.clear()
+
+    def claim(self, db: Session, worker_id: str) -> Optional[Job]:
+        now = datetime.now()
+        stale = now - timedelta(seconds=JOB_LOCK_TIMEOUT)
+
+        job = db.query(Job).filter(
+            or_(
+                and_(Job.status == JobStatus.QUEUED, Job.run_after <= now),
+                and_(Job.status == JobStatus.RUNNING, Job.locked_at < stale),
+            )
+        ).order_by(Job.run_after, Job.id).with_for_update(skip_locked=True).first()
+
+        if not job:
+            db.rollback()
+            return None
+
+        # Conditional update so two workers can never both claim it, even
+        # on databases without row locks (SQLite)
+        claimed = db.query(Job).filter(
+            Job.id == job.id,
+            Job.status == job.status,
+            Job.attempts == job.attempts,
+        ).update({
+            Job.status: JobStatus.RUNNING,
+            Job.locked_by: worker_id,
+            Job.locked_at: now,
+            Job.attempts: Job.attempts + 1,
+        })
+        db.commit()
+
+        if not claimed:
+            return None
+        return job
+
+    def run_next(self, worker_id: str) -> bool:
+        """Claim and run one due job; False when there was nothing to do"""
+        db = database.SessionLocal()
+        try:
+            job = self.claim(db, worker_id)
+            if not job:
+                return False
+
+            handler = self.handlers.get(job.kind)
+            start = time.perf_counter()
+            try:
+                if handler is None:
+                    raise ValueError(f"No handler registered for job kind: {job.kind}")
+                result = handler(db, json.loads(job.payload))
+            except Exception as e:
+                elapsed = time.perf_counter() - start
+                db.rollback()
+                self.fail(db, job, e)
+                outcome = "dead" if job.status == JobStatus.DEAD else "failed"
+            else:
+                elapsed = time.perf_counter() - start
+                job.status = JobStatus.SUCCEEDED
+                job.result = json.dumps(result, default=str)
+                job.last_error = None
+                job.locked_by = None
+                db.commit()
+                outcome = "succeeded"
+            JOB_DURATION.observe(elapsed, kind=job.kind, outcome=outcome)
+            return True
+        finally:
+            db.close()
+
+    def fail(self, db: Session, job: Job, error: Exception):
+        job.last_error = "".join(traceback.format_exception_only(type(error), error)).strip()
+        job.locked_by = None
+
+        if job.attempts >= job.max_attempts or isinstance(error, PermanentJobError):
+            job.status = JobStatus.DEAD
+            print(f"Job {job.id} ({job.kind}) dead-lettered after {job.attempts} attempts: {job.last_error}")
+        else:
+            delay = min(JOB_RETRY_BASE * (2 ** (job.attempts - 1)), JOB_RETRY_MAX)
+            delay *= random.uniform(0.8, 1.2)
+            job.status = JobStatus.QUEUED
+            job.run_after = datetime.now() + timedelta(seconds=delay)
+            print(f"Job {job.id} ({job.kind}) failed, retrying in {delay:.0f}s: {job.last_error}")
+        db.commit()
+
+    def retry(self, db: Session, job: Job) -> Job:
+        """Put a dead-lettered job back on the queue with a fresh attempt budget"""
+        job.status = JobStatus.QUEUED
+        job.attempts = 0
+        job.run_after = datetime.now()
+        db.commit()
+        self.wakeup.set()
+        return job
+
+
+def job_to_dict(job: Job) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status.value,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_after": job.run_after.isoformat() if job.run_after else None,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.last_error,
+    }
+
+
+job_queue = JobQueue()
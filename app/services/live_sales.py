@@ -0,0 +1,420 @@
+from sqlalchemy.orm import Session
+from collections import Counter, deque
+from datetime import date, datetime, time, timedelta
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import json
+import os
+
+from app.db import database
+from app.models.order import Order
+from app.models.enums import OrderStatus
+from app.models.sales_rollup import LiveSalesCheckpoint
+from app.services.order_loader import load_order_items
+from app.services.websocket_service import websocket_manager, DASHBOARD_TOPIC
+
+# Seconds between checkpoints of today's counters
+SALES_CHECKPOINT_INTERVAL = float(os.getenv("SALES_CHECKPOINT_INTERVAL", "60"))
+SALES_TOP_ITEMS = int(os.getenv("SALES_TOP_ITEMS", "5"))
+
+# Sliding windows in seconds; "today" runs from midnight
+SALES_WINDOWS = [("15m", 15 * 60), ("1h", 60 * 60)]
+
+
+class OrderEntry:
+    """What the counters need to know about one order"""
+    __slots__ = ("order_id", "placed_at", "total", "session_key", "items")
+
+    def __init__(
+        self,
+        order_id: int,
+        placed_at: datetime,
+        total: float,
+        session_id: Optional[str],
+        items: List[Tuple[int, str, int, float]]
+    ):
+        self.order_id = order_id
+        self.placed_at = placed_at
+        self.total = total
+        # A cover is one table visit; orders outside a session count on their own
+        self.session_key = session_id or f"order:{order_id}"
+        # (menu_item_id, name, quantity, revenue)
+        self.items = items
+
+
+def entry_from_event(order: dict) -> Optional[OrderEntry]:
+    """Build an entry from a new_order event; events without sales fields are ignored"""
+    if order.get("total_price") is None or not order.get("placed_at"):
+        return None
+    return OrderEntry(
+        order["id"],
+        datetime.fromisoformat(order["placed_at"]),
+        float(order["total_price"]),
+        order.get("session_id"),
+        [
+            (item["menu_item_id"], item["name"], item["quantity"], float(item["subtotal"]))
+            for item in order.get("items", [])
+        ]
+    )
+
+
+def load_entries(db: Session, order_ids: Iterable[int]) -> Dict[int, OrderEntry]:
+    """Entries for a set of orders with two queries"""
+    ids = set(order_ids)
+    if not ids:
+        return {}
+
+    orders = db.query(Order).filter(Order.id.in_(ids)).all()
+    items_by_order = load_order_items(db, ids)
+    return {
+        order.id: OrderEntry(
+            order.id,
+            order.created_at,
+            float(order.total_price or 0),
+            order.session_id,
+            [
+                (item.menu_item_id, name or "Unknown", item.quantity, float(item.subtotal))
+                for item, name in items_by_order.get(order.id, [])
+            ]
+        )
+        for order in orders
+    }
+
+
+class SalesWindow:
+    """Running totals over the orders placed inside one window
+
+    Totals are adjusted as orders enter, expire or are cancelled, so a
+    snapshot never rescans orders. The "today" window keeps no entries:
+    it only resets at midnight, and can be seeded from a checkpoint.
+    """
+
+    def __init__(self, name: str, seconds: Optional[int] = None):
+        self.name = name
+        self.seconds = seconds
+        self.entries: Deque[OrderEntry] = deque()
+        self.counted: Set[int] = set()
+        self.cutoff = datetime.min
+        self.orders = 0
+        self.revenue = 0.0
+        self.sessions: Counter = Counter()
+        self.item_quantity: Counter = Counter()
+        self.item_revenue: Counter = Counter()
+
+    def apply(self, entry: OrderEntry, sign: int):
+        self.orders += sign
+        self.revenue += sign * entry.total
+        self.sessions[entry.session_key] += sign
+        if self.sessions[entry.session_key] <= 0:
+            del self.sessions[entry.session_key]
+        for menu_item_id, _, quantity, revenue in entry.items:
+            self.item_quantity[menu_item_id] += sign * quantity
+            self.item_revenue[menu_item_id] += sign * revenue
+            if self.item_quantity[menu_item_id] <= 0:
+                del self.item_quantity[menu_item_id]
+                del self.item_revenue[menu_item_id]
+
+    def add(self, entry: OrderEntry) -> bool:
+        if entry.order_id in self.counted or entry.placed_at < self.cutoff:
+            return False
+        self.counted.add(entry.order_id)
+        if self.seconds is not None:
+            self.entries.append(entry)
+        self.apply(entry, 1)
+        return True
+
+    def remove(self, entry: OrderEntry) -> bool:
+        if entry.order_id not in self.counted:
+            return False
+        self.counted.discard(entry.order_id)
+        self.apply(entry, -1)
+        return True
+
+    def expire(self, now: datetime):
+        if self.seconds is None:
+            return
+        # Entries arrive roughly in time order; a late one simply expires with its neighbours
+        self.cutoff = now - timedelta(seconds=self.seconds)
+        while self.entries and self.entries[0].placed_at < self.cutoff:
+            self.remove(self.entries.popleft())
+
+    def summary(self, item_names: Dict[int, str], top: int = SALES_TOP_ITEMS) -> dict:
+        return {
+            "orders": self.orders,
+            "revenue": round(self.revenue, 2),
+            "covers": len(self.sessions),
+            "average_ticket": round(self.revenue / self.orders, 2) if self.orders else 0.0,
+            "top_items": [
+                {
+                    "menu_item_id": menu_item_id,
+                    "item_name": item_names.get(menu_item_id, "Unknown"),
+                    "quantity": quantity,
+                    "revenue": round(self.item_revenue[menu_item_id], 2)
+                }
+                for menu_item_id, quantity in self.item_quantity.most_common(top)
+            ]
+        }
+
+    def seed(self, checkpoint: LiveSalesCheckpoint, item_names: Dict[int, str]):
+        """Restore today's totals from a checkpoint without the individual orders"""
+        self.counted = set(json.loads(checkpoint.order_ids))
+        self.orders = checkpoint.orders_count
+        self.revenue = float(checkpoint.revenue)
+        self.sessions = Counter(json.loads(checkpoint.sessions))
+        for menu_item_id, (name, quantity, revenue) in json.loads(checkpoint.items).items():
+            item_names[int(menu_item_id)] = name
+            self.item_quantity[int(menu_item_id)] = quantity
+            self.item_revenue[int(menu_item_id)] = revenue
+
+
+class LiveSales:
+    """In-memory "today so far" sales counters for the admin dashboard
+
+    Fed by the new_order and order_status_update events each worker
+    receives from the WebSocket event bus, so every worker holds the same
+    numbers without querying orders. Changes are pushed to the dashboard
+    topic on this worker's sockets. Today's totals are checkpointed to the
+    database; after a restart they are restored from the checkpoint and
+    the day's orders are replayed to pick up anything placed or cancelled
+    since.
+
+    Revenue here is the value of orders placed and not cancelled; paid
+    revenue per day lives in the sales rollup tables.
+    """
+
+    def __init__(self, checkpoint_interval: float = SALES_CHECKPOINT_INTERVAL):
+        self.checkpoint_interval = checkpoint_interval
+        self.day = date.today()
+        self.windows = [SalesWindow(name, seconds) for name, seconds in SALES_WINDOWS]
+        self.today = SalesWindow("today")
+        self.entries: Dict[int, OrderEntry] = {}
+        self.item_names: Dict[int, str] = {}
+        self.dirty = False
+        self.checkpoint_task: Optional[asyncio.Task] = None
+        self.lookups: Set[asyncio.Task] = set()
+        self.recovery_task: Optional[asyncio.Task] = None
+        # Events received while recovery runs; replayed on top of the recovered state
+        self.held_events: Optional[List[dict]] = None
+
+    def all_windows(self) -> List[SalesWindow]:
+        return self.windows + [self.today]
+
+    def advance(self, now: datetime):
+        """Expire the sliding windows and start a new day at midnight"""
+        if now.date() != self.day:
+            self.day = now.date()
+            self.today = SalesWindow("today")
+            self.entries = {
+                order_id: entry for order_id, entry in self.entries.items()
+                if entry.placed_at.date() == self.day
+            }
+            self.dirty = True
+        for window in self.windows:
+            window.expire(now)
+
+    def add(self, entry: OrderEntry, now: Optional[datetime] = None) -> bool:
+        self.advance(now or datetime.now())
+        if entry.placed_at.date() != self.day:
+            return False
+
+        self.entries[entry.order_id] = entry
+        for menu_item_id, name, _, _ in entry.items:
+            self.item_names[menu_item_id] = name
+
+        added = [window.add(entry) for window in self.all_windows()]
+        if added[-1]:
+            self.dirty = True
+        return any(added)
+
+    def cancel(self, entry: OrderEntry) -> bool:
+        removed = [window.remove(entry) for window in self.all_windows()]
+        if removed[-1]:
+            self.dirty = True
+        return any(removed)
+
+    def snapshot(self) -> dict:
+        now = datetime.now()
+        self.advance(now)
+        return {
+            "date": self.day.isoformat(),
+            "as_of": now.isoformat(),
+            "windows": {window.name: window.summary(self.item_names) for window in self.all_windows()}
+        }
+
+    async def push(self, delta: dict):
+        """Send the change plus fresh totals to dashboard sockets on this worker"""
+        recipients = set(websocket_manager.topics.get(DASHBOARD_TOPIC, ()))
+        if not recipients:
+            return
+        message = json.dumps({"type": "sales_update", "delta": delta, **self.snapshot()})
+        # Totals make a stale update worthless, so a lagging dashboard only gets the latest
+        await websocket_manager.send_to(recipients, message, coalesce_key=DASHBOARD_TOPIC)
+
+    async def on_event(self, event: dict):
+        if self.held_events is not None:
+            self.held_events.append(event)
+            return
+
+        if event.get("type") == "new_order":
+            entry = entry_from_event(event.get("order") or {})
+            if entry and self.add(entry):
+                await self.push({"order_id": entry.order_id, "orders": 1, "revenue": entry.total})
+
+        elif event.get("type") == "order_status_update" and event.get("status") == OrderStatus.CANCELLED.value:
+            order_id = event.get("order_id")
+            entry = self.entries.get(order_id)
+            if entry is not None:
+                if self.cancel(entry):
+                    await self.push({"order_id": order_id, "orders": -1, "revenue": -entry.total})
+            elif order_id in self.today.counted:
+                # Restored from the checkpoint without its details; look them up off the loop
+                task = asyncio.create_task(self.cancel_restored(order_id))
+                self.lookups.add(task)
+                task.add_done_callback(self.lookups.discard)
+
+    async def cancel_restored(self, order_id: int):
+        entries = await asyncio.to_thread(self.load, [order_id])
+        entry = entries.get(order_id)
+        if entry is not None and self.cancel(entry):
+            await self.push({"order_id": order_id, "orders": -1, "revenue": -entry.total})
+
+    @staticmethod
+    def load(order_ids: List[int]) -> Dict[int, OrderEntry]:
+        db = database.SessionLocal()
+        try:
+            return load_entries(db, order_ids)
+        finally:
+            db.close()
+
+    # -------------------- Checkpoint and recovery --------------------
+
+    def checkpoint_state(self) -> dict:
+        today = self.today
+        return {
+            "sales_date": self.day,
+            "orders_count": today.orders,
+            "revenue": round(today.revenue, 2),
+            "order_ids": json.dumps(sorted(today.counted)),
+            "sessions": json.dumps(dict(today.sessions)),
+            "items": json.dumps({
+                menu_item_id: [self.item_names.get(menu_item_id, "Unknown"), quantity, round(today.item_revenue[menu_item_id], 2)]
+                for menu_item_id, quantity in today.item_quantity.items()
+            })
+        }
+
+    @staticmethod
+    def write_checkpoint(state: dict):
+        db = database.SessionLocal()
+        try:
+            db.merge(LiveSalesCheckpoint(**state))
+            db.commit()
+        finally:
+            db.close()
+
+    async def checkpoint(self):
+        if not self.dirty:
+            return
+        state = self.checkpoint_state()
+        self.dirty = False
+        try:
+            await asyncio.to_thread(self.write_checkpoint, state)
+        except Exception as e:
+            self.dirty = True
+            print(f"Live sales checkpoint failed: {e}")
+
+    async def checkpoint_loop(self):
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            await self.checkpoint()
+
+    @staticmethod
+    def load_recovery(day: date, now: datetime) -> Tuple[Optional[LiveSalesCheckpoint], Dict[int, OrderEntry], Set[int]]:
+        """Read today's checkpoint and the orders it does not account for
+
+        Returns the checkpoint, entries for orders placed since it (plus the
+        last hour's orders, which the sliding windows need individually),
+        and the checkpointed ids that have since been cancelled.
+        """
+        db = database.SessionLocal()
+        try:
+            checkpoint = db.get(LiveSalesCheckpoint, day)
+            counted = set(json.loads(checkpoint.order_ids)) if checkpoint else set()
+
+            start = datetime.combine(day, time.min)
+            rows = db.query(Order.id, Order.status, Order.created_at).filter(
+                Order.created_at >= start,
+                Order.created_at < start + timedelta(days=1)
+            ).all()
+
+            live = {order_id for order_id, status, _ in rows if status != OrderStatus.CANCELLED}
+            recent_cutoff = now - timedelta(seconds=max(seconds for _, seconds in SALES_WINDOWS))
+            recent = {order_id for order_id, _, created_at in rows if order_id in live and created_at >= recent_cutoff}
+            gone = counted - live
+
+            entries = load_entries(db, (live - counted) | recent | gone)
+            return checkpoint, entries, gone
+        finally:
+            db.close()
+
+    async def recover(self):
+        now = datetime.now()
+        checkpoint, entries, gone = await asyncio.to_thread(self.load_recovery, now.date(), now)
+
+        self.day = now.date()
+        if checkpoint is not None:
+            self.today.seed(checkpoint, self.item_names)
+
+        for order_id in gone:
+            if order_id in entries:
+                self.today.remove(entries.pop(order_id))
+            else:
+                self.today.counted.discard(order_id)
+
+        for entry in sorted(entries.values(), key=lambda entry: entry.placed_at):
+            self.add(entry, now)
+
+        self.dirty = True
+        print(f"📈 Live sales restored: {self.today.orders} orders today "
+              f"({len(entries)} replayed{', from checkpoint' if checkpoint else ''})")
+
+    async def restore(self):
+        """Recover, then apply the events held meanwhile and start checkpointing"""
+        try:
+            await self.recover()
+        except Exception as e:
+            print(f"Live sales recovery failed, counting from now: {e}")
+
+        held, self.held_events = self.held_events, None
+        for event in held or ():
+            await self.on_event(event)
+        # Only now: an earlier checkpoint would overwrite the stored one with partial totals
+        self.checkpoint_task = asyncio.create_task(self.checkpoint_loop())
+
+    async def start(self):
+        websocket_manager.add_listener(self.on_event)
+
+        if database.SessionLocal is not None:
+            # Recovery waits on the database, so it runs in the background rather than holding up startup
+            self.held_events = []
+            self.recovery_task = asyncio.create_task(self.restore())
+
+    async def stop(self):
+        if self.recovery_task and not self.recovery_task.done():
+            self.recovery_task.cancel()
+            try:
+                await self.recovery_task
+            except asyncio.CancelledError:
+                pass
+        self.recovery_task = None
+        if self.checkpoint_task:
+            self.checkpoint_task.cancel()
+            try:
+                await self.checkpoint_task
+            except asyncio.CancelledError:
+                pass
+            self.checkpoint_task = None
+            await self.checkpoint()
+
+
+# Global live sales counters
+live_sales = LiveSales()
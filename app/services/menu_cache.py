@@ -0,0 +1,111 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from pydantic import TypeAdapter
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import os
+import threading
+import time
+
+from app.models.menu import MenuItem
+from app.models.cache_version import CacheVersion
+from app.schemas.menu import MenuResponse
+
+# How often (seconds) a worker re-reads the shared version to notice other workers' writes
+MENU_CACHE_CHECK_INTERVAL = float(os.getenv("MENU_CACHE_CHECK_INTERVAL", "1"))
+MENU_CACHE_NAME = "menu"
+
+menu_list_adapter = TypeAdapter(List[MenuResponse])
+
+
+class MenuCache:
+    """Process-local cache of the customer menu as ready-to-send JSON bytes
+
+    Entries are keyed by category (None = whole menu) and tagged with the
+    version in the shared cache_versions row. Menu writes bump that row in
+    their own transaction; each worker re-reads it at most once per
+    MENU_CACHE_CHECK_INTERVAL, so between checks the menu is served from
+    memory without touching MySQL.
+    """
+
+    def __init__(self, check_interval: float = MENU_CACHE_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self.entries: Dict[Optional[str], Tuple[int, str, bytes]] = {}
+        self.version = 0
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def current_version(self, db: Session) -> int:
+        now = time.monotonic()
+        if now - self.checked_at < self.check_interval:
+            return self.version
+
+        try:
+            shared = db.query(CacheVersion.version).filter(
+                CacheVersion.name == MENU_CACHE_NAME
+            ).scalar() or 0
+        except SQLAlchemyError as e:
+            db.rollback()
+            print(f"Menu cache version check failed: {e}")
+            return self.version
+
+        with self.lock:
+            if shared != self.version:
+                self.entries.clear()
+                self.version = shared
+            self.checked_at = now
+        return self.version
+
+    def get(self, db: Session, category: Optional[str] = None) -> Tuple[str, bytes]:
+        """Return (etag, json bytes) for the available menu, building it on a miss"""
+        version = self.current_version(db)
+
+        entry = self.entries.get(category)
+        if entry and entry[0] == version:
+            return entry[1], entry[2]
+
+        query = db.query(MenuItem).filter(MenuItem.is_available == True)
+        if category:
+            query = query.filter(MenuItem.category == category)
+        items = query.order_by(MenuItem.category, MenuItem.name).all()
+
+        body = menu_list_adapter.dump_json(
+            menu_list_adapter.validate_python(items, from_attributes=True)
+        )
+        etag = f'"menu-{version}-{hashlib.sha1(body).hexdigest()[:16]}"'
+
+        with self.lock:
+            if version == self.version:
+                self.entries[category] = (version, etag, body)
+        return etag, body
+
+    def invalidate(self, db: Session):
+        """Bump the shared version inside the caller's transaction and drop local entries"""
+        try:
+            # Savepoint so a missing cache_versions table never breaks the menu write
+            with db.begin_nested():
+                updated = db.query(CacheVersion).filter(
+                    CacheVersion.name == MENU_CACHE_NAME
+                ).update({CacheVersion.version: CacheVersion.version + 1}, synchronize_session=False)
+
+                if not updated:
+                    db.add(CacheVersion(name=MENU_CACHE_NAME, version=1))
+        except SQLAlchemyError as e:
+            print(f"Menu cache invalidation failed: {e}")
+
+        with self.lock:
+            self.entries.clear()
+            self.checked_at = 0.0
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compare an If-None-Match header (possibly a list or weak tags) against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag == etag or tag == f"W/{etag}" for tag in candidates)
+
+
+menu_cache = MenuCache()
@@ -0,0 +1,137 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import Table, and_, delete, insert, or_, select
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import os
+import time
+
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.order_session import OrderSession, SessionStatus
+from app.models.order_archive import ArchivedOrder, ArchivedOrderItem, ArchivedOrderSession
+from app.services.order_loader import load_order_items
+
+# Closed sessions older than this many days are moved to the archive tables
+ORDER_ARCHIVE_AFTER_DAYS = int(os.getenv("ORDER_ARCHIVE_AFTER_DAYS", "90"))
+# Sessions (and session-less orders) moved per transaction
+ORDER_ARCHIVE_BATCH_SIZE = int(os.getenv("ORDER_ARCHIVE_BATCH_SIZE", "200"))
+# Seconds between batches, so a long run never holds the hot tables for long
+ORDER_ARCHIVE_PAUSE = float(os.getenv("ORDER_ARCHIVE_PAUSE", "0.2"))
+
+# Orders placed without a session are archived once they reach one of these
+FINAL_STATUSES = (OrderStatus.COMPLETED, OrderStatus.SERVED, OrderStatus.CANCELLED)
+
+# (session, order, item) models of each side, for readers that must cover both
+HOT_MODELS = (OrderSession, Order, OrderItem)
+ARCHIVE_MODELS = (ArchivedOrderSession, ArchivedOrder, ArchivedOrderItem)
+
+
+def archive_cutoff(days: int = ORDER_ARCHIVE_AFTER_DAYS) -> datetime:
+    return datetime.now() - timedelta(days=days)
+
+
+def move_rows(db: Session, source: Table, archive: Table, condition) -> int:
+    """Copy the matching rows into the archive table, then delete them from the hot one"""
+    columns = [column.name for column in source.columns]
+    db.execute(insert(archive).from_select(columns, select(*source.columns).where(condition)))
+    return db.execute(delete(source).where(condition)).rowcount
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int = ORDER_ARCHIVE_BATCH_SIZE) -> Tuple[int, int]:
+    """Move one batch of closed sessions with their orders and items; returns (sessions, orders)
+
+    The whole batch is one transaction, so an interrupted run leaves every
+    session either fully hot or fully archived and the next run carries on
+    from whatever is still in the hot tables. Orders keep their own status.
+    """
+    session_ids = db.execute(
+        select(OrderSession.session_id).where(
+            OrderSession.status == SessionStatus.CLOSED,
+            or_(
+                OrderSession.closed_at < cutoff,
+                and_(OrderSession.closed_at.is_(None), OrderSession.created_at < cutoff)
+            )
+        ).order_by(OrderSession.id).limit(batch_size)
+    ).scalars().all()
+
+    order_ids: List[int] = []
+    if session_ids:
+        order_ids = db.execute(select(Order.id).where(Order.session_id.in_(session_ids))).scalars().all()
+    order_ids += db.execute(
+        select(Order.id).where(
+            Order.session_id.is_(None),
+            Order.status.in_(FINAL_STATUSES),
+            Order.created_at < cutoff
+        ).order_by(Order.id).limit(batch_size)
+    ).scalars().all()
+
+    if not session_ids and not order_ids:
+        return 0, 0
+
+    try:
+        if order_ids:
+            # Children first: order_items and orders still carry their foreign keys
+            move_rows(db, OrderItem.__table__, ArchivedOrderItem.__table__, OrderItem.order_id.in_(order_ids))
+            move_rows(db, Order.__table__, ArchivedOrder.__table__, Order.id.in_(order_ids))
+        if session_ids:
+            move_rows(db, OrderSession.__table__, ArchivedOrderSession.__table__, OrderSession.session_id.in_(session_ids))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(session_ids), len(order_ids)
+
+
+def archive_orders(
+    db: Session,
+    days: int = ORDER_ARCHIVE_AFTER_DAYS,
+    batch_size: int = ORDER_ARCHIVE_BATCH_SIZE,
+    max_batches: Optional[int] = None,
+    pause: float = ORDER_ARCHIVE_PAUSE
+) -> Dict[str, int]:
+    """Archive batch after batch until nothing older than the cutoff is left (or max_batches)"""
+    cutoff = archive_cutoff(days)
+    totals = {"batches": 0, "sessions": 0, "orders": 0}
+    while max_batches is None or totals["batches"] < max_batches:
+        sessions, orders = archive_batch(db, cutoff, batch_size)
+        if not sessions and not orders:
+            break
+        totals["batches"] += 1
+        totals["sessions"] += sessions
+        totals["orders"] += orders
+        db.expunge_all()
+        if pause:
+            time.sleep(pause)
+    return totals
+
+
+def is_archived(row) -> bool:
+    return isinstance(row, (ArchivedOrder, ArchivedOrderItem, ArchivedOrderSession))
+
+
+def find_order(db: Session, order_id: int):
+    """The order from the hot table, or from the archive once it has been moved"""
+    return db.get(Order, order_id) or db.get(ArchivedOrder, order_id)
+
+
+def find_session(db: Session, session_id: str):
+    """The session from the hot table, or from the archive once it has been moved"""
+    for model in (OrderSession, ArchivedOrderSession):
+        session = db.query(model).filter(model.session_id == session_id).first()
+        if session:
+            return session
+    return None
+
+
+def session_orders(db: Session, session) -> list:
+    """A session's orders, read from the same side (hot or archive) as the session"""
+    model = ArchivedOrder if is_archived(session) else Order
+    return db.query(model).filter(model.session_id == session.session_id).order_by(model.created_at).all()
+
+
+def load_items(db: Session, orders: list) -> Dict[int, list]:
+    """load_order_items for a mix of hot and archived orders"""
+    items_by_order = load_order_items(db, (order.id for order in orders if not is_archived(order)))
+    items_by_order.update(load_order_items(
+        db, (order.id for order in orders if is_archived(order)), ArchivedOrderItem
+    ))
+    return items_by_order
@@ -0,0 +1,164 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, List, Optional, Tuple
+import base64
+import json
+import os
+
+from app.db import database
+from app.models.order import Order
+from app.models.enums import OrderStatus
+from app.models.order_archive import ArchivedOrder
+from app.services.order_archive import is_archived, load_items
+from app.services.order_loader import load_customers
+
+ORDER_HISTORY_PAGE_SIZE = int(os.getenv("ORDER_HISTORY_PAGE_SIZE", "50"))
+ORDER_HISTORY_MAX_PAGE_SIZE = 500
+
+
+class OrderHistoryFilters:
+    def __init__(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[OrderStatus] = None,
+        table_number: Optional[str] = None
+    ):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.status = status
+        self.table_number = table_number
+
+    def apply(self, query, model=Order):
+        """model=ArchivedOrder filters a query over the archive table"""
+        if self.start_date:
+            query = query.filter(model.created_at >= datetime.combine(self.start_date, time.min))
+        if self.end_date:
+            query = query.filter(model.created_at < datetime.combine(self.end_date + timedelta(days=1), time.min))
+        if self.status:
+            query = query.filter(model.status == self.status)
+        if self.table_number:
+            query = query.filter(model.table_number == self.table_number)
+        return query
+
+
+def encode_cursor(order: Order) -> str:
+    """Opaque resume token for the position just after this order"""
+    raw = json.dumps([order.created_at.isoformat(), order.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError for anything that is not a cursor we issued"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, order_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(order_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def serialize_orders(db: Session, orders: List[Order]) -> List[dict]:
+    """Order history rows with customers and items loaded in two queries"""
+    customers = load_customers(db, (order.customer_id for order in orders))
+    items_by_order = load_items(db, orders)
+
+    result = []
+    for order in orders:
+        customer = customers.get(order.customer_id)
+        result.append({
+            "id": order.id,
+            "order_number": order.order_number,
+            "customer_name": customer.name if customer else "Guest",
+            "customer_phone": customer.phone_number if customer else "",
+            "table_number": order.table_number,
+            "order_date": order.order_date.isoformat() if order.order_date else "",
+            "order_time": str(order.order_time) if order.order_time else "",
+            "created_at": order.created_at.isoformat() if order.created_at else "",
+            "status": order.status.value,
+            "total_price": float(order.total_price or 0),
+            "archived": is_archived(order),
+            "items": [
+                {
+                    "item_name": name,
+                    "quantity": item.quantity,
+                    "price": float(item.price)
+                }
+                for item, name in items_by_order.get(order.id, [])
+            ]
+        })
+    return result
+
+
+def fetch_orders(db: Session, filters: OrderHistoryFilters, limit: int, cursor: Optional[str] = None) -> List[Order]:
+    """Newest first, seeking past the cursor on (created_at, id) instead of using OFFSET
+
+    Hot and archived orders are read with the same seek and merged, so a
+    page (and the cursor after it) can span both tables.
+    """
+    position = decode_cursor(cursor) if cursor else None
+
+    orders = []
+    for model in (Order, ArchivedOrder):
+        query = filters.apply(db.query(model), model)
+        if position:
+            created_at, order_id = position
+            query = query.filter(or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < order_id)
+            ))
+        orders.extend(query.order_by(model.created_at.desc(), model.id.desc()).limit(limit).all())
+
+    orders.sort(key=lambda order: (order.created_at, order.id), reverse=True)
+    return orders[:limit]
+
+
+def order_history_page(
+    db: Session,
+    filters: OrderHistoryFilters,
+    limit: int = ORDER_HISTORY_PAGE_SIZE,
+    cursor: Optional[str] = None
+) -> dict:
+    limit = max(1, min(limit, ORDER_HISTORY_MAX_PAGE_SIZE))
+
+    # One extra row tells us whether another page exists
+    orders = fetch_orders(db, filters, limit + 1, cursor)
+    has_more = len(orders) > limit
+    orders = orders[:limit]
+
+    return {
+        "orders": serialize_orders(db, orders),
+        "next_cursor": encode_cursor(orders[-1]) if has_more else None
+    }
+
+
+def iter_order_history(
+    db: Session,
+    filters: OrderHistoryFilters,
+    batch_size: int = ORDER_HISTORY_MAX_PAGE_SIZE
+) -> Iterator[dict]:
+    """Every matching order, page by page, with the session cleared between pages"""
+    cursor = None
+    while True:
+        orders = fetch_orders(db, filters, batch_size, cursor)
+        if not orders:
+            return
+
+        for row in serialize_orders(db, orders):
+            yield row
+
+        if len(orders) < batch_size:
+            return
+        cursor = encode_cursor(orders[-1])
+        db.expunge_all()
+
+
+def stream_order_history_ndjson(filters: OrderHistoryFilters) -> Iterator[bytes]:
+    """NDJSON export using its own session, since the response outlives the request scope"""
+    db = database.SessionLocal()
+    try:
+        for row in iter_order_history(db, filters):
+            yield (json.dumps(row) + "\n").encode()
+    finally:
+        db.close()
@@ -0,0 +1,72 @@
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Tuple
+
+from app.models.order import Order, OrderItem
+from app.models.customer import Customer
+from app.models.menu import MenuItem
+
+
+def load_customers(db: Session, customer_ids: Iterable[int]) -> Dict[int, Customer]:
+    """Fetch all customers for a set of ids in one query"""
+    ids = {cid for cid in customer_ids if cid is not None}
+    if not ids:
+        return {}
+
+    customers = db.query(Customer).filter(Customer.id.in_(ids)).all()
+    return {customer.id: customer for customer in customers}
+
+
+def load_menu_items(db: Session, menu_item_ids: Iterable[int]) -> Dict[int, MenuItem]:
+    """Fetch all menu items for a set of ids in one query"""
+    ids = set(menu_item_ids)
+    if not ids:
+        return {}
+
+    menu_items = db.query(MenuItem).filter(MenuItem.id.in_(ids)).all()
+    return {menu_item.id: menu_item for menu_item in menu_items}
+
+
+def load_order_items(db: Session, order_ids: Iterable[int], item_model=OrderItem) -> Dict[int, List[Tuple[OrderItem, str]]]:
+    """Fetch items and menu names for a set of orders in one query (item_model selects the archive)"""
+    ids = set(order_ids)
+    if not ids:
+        return {}
+
+    rows = (
+        db.query(item_model, MenuItem.name)
+        .outerjoin(MenuItem, item_model.menu_item_id == MenuItem.id)
+        .filter(item_model.order_id.in_(ids))
+        .order_by(item_model.order_id, item_model.id)
+        .all()
+    )
+
+    items_by_order: Dict[int, List[Tuple[OrderItem, str]]] = {}
+    for item, menu_name in rows:
+        items_by_order.setdefault(item.order_id, []).append((item, menu_name or "Unknown"))
+    return items_by_order
+
+
+def build_kitchen_board(db: Session, orders: List[Order]) -> List[dict]:
+    """Assemble the kitchen board payload with a fixed number of queries"""
+    customers = load_customers(db, (order.customer_id for order in orders))
+    items_by_order = load_order_items(db, (order.id for order in orders))
+
+    result = []
+    for order in orders:
+        customer = customers.get(order.customer_id)
+        result.append({
+            "id": order.id,
+            "order_number": order.order_number,
+            "table_number": order.table_number,
+            "customer_name": customer.name if customer else "Guest",
+            "status": order.status.value,
+            "total_price": float(order.total_price),
+            "created_at": order.created_at.isoformat(),
+            "items": [
+                {
+                    "name": name,
+                    "quantity": item.quantity,
+                } for item, name in items_by_order.get(order.id, [])
+            ],
+        })
+    return result
@@ -5,8 +5,10 @@ from typing import Optional, List, Dict, Any
 import random
 
 from app.models.order_session import OrderSession, SessionStatus
-from app.models.order import Order, OrderStatus
+from app.models.order import Order, OrderStatus, PaymentStatus
 from app.models.customer import Customer
+from app.services.sales_rollup import record_paid_orders
+from app.services.order_archive import find_session, session_orders
 
 
 class OrderSessionService:
@@ -15,7 +17,7 @@ class OrderSessionService:
     def generate_session_id():
         """Generate unique session ID"""
         now = datetime.now().strftime("%Y%m%d%H%M%S")
-        random_part = random.randint(100, 999)
+        random_part = random.randint(100000, 999999)
         return f"SES{now}{random_part}"
     
     @staticmethod
@@ -51,10 +53,8 @@ class OrderSessionService:
     
     @staticmethod
     def get_session_by_id(db: Session, session_id: str) -> Optional[OrderSession]:
-        """Get session by ID"""
-        return db.query(OrderSession).filter(
-            OrderSession.session_id == session_id
-        ).first()
+        """Get session by ID, falling back to the archive for old closed sessions"""
+        return find_session(db, session_id)
     
     @staticmethod
     def get_active_session_for_table(db: Session, table_number: str) -> Optional[OrderSession]:
@@ -66,10 +66,9 @@ class OrderSessionService:
     
     @staticmethod
     def get_session_orders(db: Session, session_id: str) -> List[Order]:
-        """Get all orders for a session"""
-        return db.query(Order).filter(
-            Order.session_id == session_id
-        ).order_by(Order.created_at).all()
+        """Get all orders for a session, from the archive if the session was archived"""
+        session = find_session(db, session_id)
+        return session_orders(db, session) if session else []
     
     @staticmethod
     def finish_meal_session(db: Session, session_id: str) -> Dict[str, Any]:
@@ -101,10 +100,13 @@ class OrderSessionService:
         session.status = SessionStatus.CLOSED
         session.closed_at = datetime.now()
         
-        # Update all orders to COMPLETED
+        # Mark every order that was not cancelled as paid
         for order in orders:
-            order.status = OrderStatus.PAID  # or COMPLETED based on your enum
+            if order.status != OrderStatus.CANCELLED:
+                order.status = OrderStatus.COMPLETED
+                order.payment_status = PaymentStatus.PAID
         
+        record_paid_orders(db, orders)
         db.commit()
         
         return {
@@ -0,0 +1,263 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import Boolean, Date, DateTime, Enum, Float, Integer, Numeric, Time, select
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+import enum
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.db import database
+from app.models.order import Order, OrderItem
+from app.models.order_session import OrderSession
+from app.models.customer import Customer
+
+# Rows held in memory before they are written out as part files
+PARQUET_EXPORT_CHUNK_ROWS = int(os.getenv("PARQUET_EXPORT_CHUNK_ROWS", "50000"))
+WATERMARK_FILE = "_watermarks.json"
+
+
+def arrow_type(column) -> pa.DataType:
+    """Fixed Arrow type per column, so every part file of a dataset has the same schema"""
+    sql_type = column.type
+    # Order matters: Enum is a String, Float is a Numeric
+    if isinstance(sql_type, Enum):
+        return pa.string()
+    if isinstance(sql_type, Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, Integer):
+        return pa.int64()
+    if isinstance(sql_type, Float):
+        return pa.float64()
+    if isinstance(sql_type, Numeric):
+        return pa.decimal128(sql_type.precision or 18, sql_type.scale or 2)
+    if isinstance(sql_type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(sql_type, Date):
+        return pa.date32()
+    if isinstance(sql_type, Time):
+        return pa.time64("us")
+    return pa.string()
+
+
+def arrow_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, timedelta):
+        # MySQL drivers return TIME columns as a timedelta since midnight
+        return (datetime.min + value).time()
+    return value
+
+
+class ExportDataset:
+    """One exported table: its query, partition column and change-tracking column"""
+
+    def __init__(
+        self,
+        name: str,
+        columns: list,
+        changed_column,
+        build_query: Callable[[list, Optional[datetime]], object],
+        changed_key: Optional[str] = None,
+        partition_column: Optional[str] = None,
+        partition_name: Optional[str] = None,
+        partition_value: Callable = None
+    ):
+        self.name = name
+        self.columns = columns
+        self.changed_column = changed_column
+        self.build_query = build_query
+        # Result column holding changed_column, when it is selected under another name
+        self.changed_key = changed_key or changed_column.name
+        self.partition_column = partition_column
+        self.partition_name = partition_name or partition_column
+        self.partition_value = partition_value or (lambda value: value)
+        self.schema = pa.schema([(column.name, arrow_type(column)) for column in columns])
+        # A column used as the partition directory (order_date=...) is not repeated inside the files
+        self.file_schema = self.schema
+        if self.partition_name in self.schema.names:
+            self.file_schema = self.schema.remove(self.schema.get_field_index(self.partition_name))
+
+    def query(self, since: Optional[datetime]):
+        return self.build_query(self.columns, since)
+
+
+def changed_since(stmt, column, since: Optional[datetime]):
+    # >= rather than >: rows updated in the watermark's own second are exported again, not lost
+    return stmt.where(column >= since) if since is not None else stmt
+
+
+DATASETS = [
+    ExportDataset(
+        "orders",
+        list(Order.__table__.c),
+        Order.updated_at,
+        # created_at order follows idx_orders_created_id and keeps partitions mostly contiguous
+        lambda columns, since: changed_since(select(*columns), Order.updated_at, since).order_by(Order.created_at, Order.id),
+        partition_column="order_date"
+    ),
+    ExportDataset(
+        "order_items",
+        # Items have no updated_at of their own; they are re-exported whenever their order changes
+        list(OrderItem.__table__.c) + [Order.order_date, Order.updated_at.label("order_updated_at")],
+        Order.updated_at,
+        lambda columns, since: changed_since(
+            select(*columns).join(Order, Order.id == OrderItem.order_id), Order.updated_at, since
+        ).order_by(Order.created_at, OrderItem.id),
+        changed_key="order_updated_at",
+        partition_column="order_date"
+    ),
+    ExportDataset(
+        "order_sessions",
+        list(OrderSession.__table__.c),
+        OrderSession.updated_at,
+        lambda columns, since: changed_since(select(*columns), OrderSession.updated_at, since).order_by(OrderSession.id),
+        partition_column="created_at",
+        partition_name="session_date",
+        partition_value=lambda created_at: created_at.date() if created_at else None
+    ),
+    ExportDataset(
+        "customers",
+        list(Customer.__table__.c),
+        Customer.updated_at,
+        lambda columns, since: changed_since(select(*columns), Customer.updated_at, since).order_by(Customer.id)
+    ),
+]
+
+
+class PartitionedWriter:
+    """Buffers rows per partition and writes each buffer as a new Parquet part file
+
+    Everything buffered is flushed once chunk_rows rows are held, so memory
+    stays bounded however large the table is. Files are written under a
+    temporary name and renamed, so readers never see a half-written part.
+    """
+
+    def __init__(self, root: str, dataset: ExportDataset, run_id: str, chunk_rows: int = PARQUET_EXPORT_CHUNK_ROWS):
+        self.root = os.path.join(root, dataset.name)
+        self.dataset = dataset
+        self.run_id = run_id
+        self.chunk_rows = chunk_rows
+        self.buffers: Dict[object, List[tuple]] = {}
+        self.buffered = 0
+        self.part = 0
+        self.files = 0
+        self.rows = 0
+
+    def partition_key(self, row) -> object:
+        if self.dataset.partition_column is None:
+            return None
+        return self.dataset.partition_value(row._mapping[self.dataset.partition_column])
+
+    def add(self, rows):
+        for row in rows:
+            self.buffers.setdefault(self.partition_key(row), []).append(tuple(row))
+        self.buffered += len(rows)
+        if self.buffered >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        for key, rows in self.buffers.items():
+            self.write(key, rows)
+        self.buffers = {}
+        self.buffered = 0
+
+    def write(self, key, rows: List[tuple]):
+        directory = self.root
+        if self.dataset.partition_column is not None:
+            value = key.isoformat() if key else "unknown"
+            directory = os.path.join(directory, f"{self.dataset.partition_name}={value}")
+        os.makedirs(directory, exist_ok=True)
+
+        columns = dict(zip(self.dataset.schema.names, zip(*rows)))
+        table = pa.Table.from_arrays(
+            [
+                pa.array([arrow_value(value) for value in columns[field.name]], type=field.type)
+                for field in self.dataset.file_schema
+            ],
+            schema=self.dataset.file_schema
+        )
+
+        self.part += 1
+        path = os.path.join(directory, f"part-{self.run_id}-{self.part:05d}.parquet")
+        pq.write_table(table, path + ".tmp", compression="snappy")
+        os.replace(path + ".tmp", path)
+        self.files += 1
+        self.rows += len(rows)
+
+
+def load_watermarks(root: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(root, WATERMARK_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_watermarks(root: str, watermarks: Dict[str, str]):
+    path = os.path.join(root, WATERMARK_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(watermarks, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def export_dataset(
+    db: Session,
+    root: str,
+    dataset: ExportDataset,
+    since: Optional[datetime],
+    run_id: str,
+    chunk_rows: int = PARQUET_EXPORT_CHUNK_ROWS
+) -> Tuple[int, int, Optional[datetime]]:
+    """Stream one dataset through a server-side cursor; returns (rows, files, new watermark)"""
+    writer = PartitionedWriter(root, dataset, run_id, chunk_rows)
+    watermark = since
+
+    result = db.connection().execution_options(stream_results=True, yield_per=chunk_rows).execute(dataset.query(since))
+    try:
+        for rows in result.partitions():
+            changed = [row._mapping[dataset.changed_key] for row in rows if row._mapping[dataset.changed_key] is not None]
+            if changed:
+                watermark = max([watermark, *changed]) if watermark else max(changed)
+            writer.add(rows)
+    finally:
+        result.close()
+
+    writer.flush()
+    return writer.rows, writer.files, watermark
+
+
+def export_parquet(
+    root: str,
+    tables: Optional[List[str]] = None,
+    full: bool = False,
+    chunk_rows: int = PARQUET_EXPORT_CHUNK_ROWS
+) -> Dict[str, dict]:
+    """Append everything changed since the last run (or everything, with full) under root
+
+    Watermarks are only saved once every table has been exported, so a
+    failed run is simply repeated by the next one; readers keep the latest
+    row per id, which also absorbs the overlap at each watermark.
+    """
+    os.makedirs(root, exist_ok=True)
+    watermarks = load_watermarks(root)
+    run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+    summary = {}
+
+    db = database.SessionLocal()
+    try:
+        for dataset in DATASETS:
+            if tables and dataset.name not in tables:
+                continue
+            since = None if full or dataset.name not in watermarks else datetime.fromisoformat(watermarks[dataset.name])
+            rows, files, watermark = export_dataset(db, root, dataset, since, run_id, chunk_rows)
+            if watermark is not None:
+                watermarks[dataset.name] = watermark.isoformat()
+            summary[dataset.name] = {"rows": rows, "files": files, "since": since.isoformat() if since else None}
+    finally:
+        db.close()
+
+    save_watermarks(root, watermarks)
+    return summary
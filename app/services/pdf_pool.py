@@ -0,0 +1,187 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+
+from app.core.metrics import metrics
+
+# Render processes; 0 renders on the calling thread (handy for scripts and debugging)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+# Renders queued or running before new requests are turned away
+PDF_MAX_PENDING = int(os.getenv("PDF_MAX_PENDING", "64"))
+# How long a job worker thread waits for a free slot before giving up (seconds)
+PDF_QUEUE_TIMEOUT = float(os.getenv("PDF_QUEUE_TIMEOUT", "30"))
+
+PDF_RENDER = metrics.histogram("pdf_render_seconds", "Time from dispatch to finished PDF, including queueing for a worker", ("method",))
+
+# Each render process keeps its own PDFService with fonts and styles loaded
+worker_service = None
+
+
+def init_worker():
+    global worker_service
+    from app.services.pdf_service import PDFService
+
+    worker_service = PDFService()
+    # One throwaway render loads the font metrics and the paragraph parser up front
+    worker_service.render_bill_pdf({"items": [{"name": "warm-up"}]}, {})
+
+
+def render_in_worker(method: str, *args) -> bytes:
+    return getattr(worker_service, method)(*args)
+
+
+class PDFRenderBusy(Exception):
+    """Raised when PDF_MAX_PENDING renders are already queued"""
+    pass
+
+
+class PDFRenderPool:
+    """Runs ReportLab renders in warm worker processes instead of the API process
+
+    Rendering is CPU-bound pure Python, so on a thread it holds the GIL and
+    stalls every request. Here the processes start with the app, load their
+    styles once, and a burst of bills spreads across every core. The number
+    of renders in flight is capped: async callers get PDFRenderBusy at once
+    so the route can answer 503, while job worker threads wait for a slot.
+    """
+
+    def __init__(self, workers: int = PDF_WORKERS, max_pending: int = PDF_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+        self.pending = 0
+
+    def start(self, wait: bool = False):
+        """Launch the render processes; they warm up in the background unless wait is set"""
+        if self.workers <= 0 or self.executor is not None:
+            return
+
+        # spawn, not fork: the API process already runs threads and an event loop
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker
+        )
+        self.executor = executor
+        # Start every process now so the first bills don't pay for it; renders
+        # submitted before they are warm simply queue
+        warm_ups = [executor.submit(os.getpid) for _ in range(self.workers)]
+        if wait:
+            self.check_started(executor, warm_ups)
+        else:
+            threading.Thread(target=self.check_started, args=(executor, warm_ups), name="pdf-pool-start", daemon=True).start()
+
+    def check_started(self, executor: ProcessPoolExecutor, warm_ups: list):
+        try:
+            for future in warm_ups:
+                future.result()
+        except Exception as e:
+            print(f"❌ PDF render pool failed to start, rendering in-process: {e}")
+            with self.lock:
+                if self.executor is executor:
+                    self.executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            return
+        print(f"✅ PDF render pool started with {self.workers} processes")
+
+    def stop(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def restart(self):
+        """Replace a pool whose process died mid-render"""
+        with self.lock:
+            broken, self.executor = self.executor, None
+        if broken is not None:
+            broken.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+    def release(self, future: Future = None):
+        with self.lock:
+            self.pending -= 1
+        self.slots.release()
+
+    def submit(self, method: str, *args) -> Future:
+        """Dispatch a render once a slot is held; the slot is freed when it finishes"""
+        with self.lock:
+            self.pending += 1
+        start = time.perf_counter()
+
+        if self.executor is None:
+            # No pool (PDF_WORKERS=0 or not started): render here
+            future: Future = Future()
+            try:
+                from app.services.pdf_service import pdf_service
+                future.set_result(getattr(pdf_service, method)(*args))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self.release()
+                PDF_RENDER.observe(time.perf_counter() - start, method=method)
+            return future
+
+        try:
+            try:
+                future = self.executor.submit(render_in_worker, method, *args)
+            except BrokenProcessPool:
+                self.restart()
+                future = self.executor.submit(render_in_worker, method, *args)
+        except Exception:
+            self.release()
+            raise
+
+        future.add_done_callback(self.release)
+        future.add_done_callback(lambda done: PDF_RENDER.observe(time.perf_counter() - start, method=method))
+        return future
+
+    def submit_when_free(self, method: str, *args, timeout: float = PDF_QUEUE_TIMEOUT) -> Future:
+        """Wait up to timeout for a free slot, then dispatch; for threads that may block"""
+        if not self.slots.acquire(timeout=timeout):
+            raise PDFRenderBusy(f"PDF render queue is full ({self.max_pending} pending)")
+        return self.submit(method, *args)
+
+    def render(self, method: str, *args, timeout: float = PDF_QUEUE_TIMEOUT) -> bytes:
+        """Blocking render for job workers"""
+        return self.submit_when_free(method, *args, timeout=timeout).result()
+
+    async def render_async(self, method: str, *args) -> bytes:
+        """Awaitable render for async routes; raises PDFRenderBusy instead of queueing unbounded"""
+        if not self.slots.acquire(blocking=False):
+            raise PDFRenderBusy(f"PDF render queue is full ({self.max_pending} pending)")
+        if self.executor is None:
+            # Without a pool submit() renders in the calling thread; keep that off the event loop
+            future = await asyncio.to_thread(self.submit, method, *args)
+            return future.result()
+        return await asyncio.wrap_future(self.submit(method, *args))
+
+    async def render_bill_pdf(self, order_details: dict, customer_info: dict) -> bytes:
+        return await self.render_async("render_bill_pdf", order_details, customer_info)
+
+    async def render_session_invoice_pdf(self, invoice_data: dict) -> bytes:
+        return await self.render_async("render_session_invoice_pdf", invoice_data)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers if self.executor is not None else 0,
+            "pending": self.pending,
+            "max_pending": self.max_pending
+        }
+
+pdf_renderer = PDFRenderPool()
+
+
+def pdf_metrics():
+    stats = pdf_renderer.stats()
+    yield "pdf_renders_pending", "gauge", "PDF renders queued or running", (), {(): stats["pending"]}
+    yield "pdf_render_workers", "gauge", "Running PDF render processes", (), {(): stats["workers"]}
+
+
+metrics.add_collector(pdf_metrics)
@@ -1,13 +1,14 @@
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT
-import os
 from datetime import datetime
 from io import BytesIO
-from typing import Dict, Any
+from typing import Dict, Any, List
+
+# Layout changes: bump TEMPLATE_VERSION in bill_cache.py so cached PDFs are re-rendered
 
 class PDFService:
     def __init__(self):
@@ -39,16 +40,90 @@ class PDFService:
             fontSize=10,
             alignment=TA_RIGHT
         )
-    
-    def generate_bill_pdf(self, order_details: dict, customer_info: dict, save_path: str = None):
-        """Generate PDF bill for single order"""
-        if not save_path:
-            save_path = f"temp_bills/bill_{order_details.get('order_number', datetime.now().strftime('%Y%m%d_%H%M%S'))}.pdf"
         
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        # Table styles are never mutated by a render, so every bill shares them
+        self.bill_customer_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+            ('BACKGROUND', (0, 0), (0, -1), colors.grey),
+            ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+        ])
+        self.bill_items_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+        self.bill_total_table_style = TableStyle([
+            ('BACKGROUND', (2, 0), (3, 0), colors.grey),
+            ('TEXTCOLOR', (2, 0), (3, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (2, 0), (3, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ])
+        self.invoice_info_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+            ('BACKGROUND', (0, 0), (0, -1), colors.beige),
+        ])
+        # Orders summary and item details use the same grid
+        self.invoice_grid_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+        self.invoice_total_table_style = TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('BACKGROUND', (0, 2), (-1, 2), colors.lightgreen),
+            ('FONTNAME', (0, 2), (-1, 2), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 2), (-1, 2), 14),
+            ('TEXTCOLOR', (0, 2), (-1, 2), colors.darkgreen),
+        ])
+        
+        # Page layouts and column widths for each template
+        self.bill_layout = {"pagesize": A4}
+        self.invoice_layout = {"pagesize": A4, "rightMargin": 72, "leftMargin": 72, "topMargin": 72, "bottomMargin": 18}
+        self.bill_customer_widths = [2*inch, 4*inch]
+        self.bill_item_widths = [3*inch, 1*inch, 1*inch, 1*inch]
+        self.invoice_info_widths = [2*inch, 3*inch]
+        self.invoice_order_widths = [2*inch, 2*inch, 1.5*inch]
+        self.invoice_item_widths = [3*inch, 1*inch, 1*inch, 1.5*inch]
+        self.invoice_total_widths = [3*inch, 1.5*inch]
+
+    def build(self, story: list, layout: Dict[str, Any]) -> bytes:
+        """Lay out a story into an in-memory PDF"""
+        buffer = BytesIO()
+        SimpleDocTemplate(buffer, **layout).build(story)
+        return buffer.getvalue()
+
+    def render_bill_pdf(self, order_details: dict, customer_info: dict) -> bytes:
+        """Render PDF bill for single order straight into memory"""
+        # Print the order time, not the render time, so identical orders render identically
+        billed_at = order_details.get('created_at') or datetime.now()
+        if isinstance(billed_at, str):
+            billed_at = datetime.fromisoformat(billed_at)
         
-        doc = SimpleDocTemplate(save_path, pagesize=A4)
         story = []
         
         # Restaurant Header
@@ -69,20 +144,11 @@ class PDFService:
             ["Email:", customer_info.get('email', 'N/A')],
             ["Order Number:", order_details.get('order_number', 'N/A')],
             ["Table Number:", order_details.get('table_number', 'N/A')],
-            ["Date & Time:", datetime.now().strftime("%d/%m/%Y %H:%M:%S")],
+            ["Date & Time:", billed_at.strftime("%d/%m/%Y %H:%M:%S")],
         ]
         
-        customer_table = Table(customer_data, colWidths=[2*inch, 4*inch])
-        customer_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('BACKGROUND', (0, 0), (0, -1), colors.grey),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-        ]))
+        customer_table = Table(customer_data, colWidths=self.bill_customer_widths)
+        customer_table.setStyle(self.bill_customer_table_style)
         
         story.append(customer_table)
         story.append(Spacer(1, 20))
@@ -101,17 +167,8 @@ class PDFService:
                 f"₹{item.get('price', 0) * item.get('quantity', 1)}"
             ])
         
-        items_table = Table(items_data, colWidths=[3*inch, 1*inch, 1*inch, 1*inch])
-        items_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        items_table = Table(items_data, colWidths=self.bill_item_widths)
+        items_table.setStyle(self.bill_items_table_style)
         
         story.append(items_table)
         story.append(Spacer(1, 20))
@@ -120,15 +177,8 @@ class PDFService:
         total_amount = order_details.get('total_amount', 0)
         total_data = [["", "", "Total Amount:", f"₹{total_amount}"]]
         
-        total_table = Table(total_data, colWidths=[3*inch, 1*inch, 1*inch, 1*inch])
-        total_table.setStyle(TableStyle([
-            ('BACKGROUND', (2, 0), (3, 0), colors.grey),
-            ('TEXTCOLOR', (2, 0), (3, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (2, 0), (3, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ]))
+        total_table = Table(total_data, colWidths=self.bill_item_widths)
+        total_table.setStyle(self.bill_total_table_style)
         
         story.append(total_table)
         story.append(Spacer(1, 30))
@@ -137,20 +187,27 @@ class PDFService:
         story.append(Paragraph("Thank you for dining with us!", self.styles['Normal']))
         story.append(Paragraph("Please visit again", self.styles['Normal']))
         
-        # Build PDF
-        doc.build(story)
-        
-        return save_path
+        return self.build(story, self.bill_layout)
 
-    def generate_session_invoice_pdf(self, invoice_data: Dict[str, Any], save_path: str = None) -> str:
-        """Generate PDF invoice for complete session"""
-        if not save_path:
-            save_path = f"temp_bills/invoice_{invoice_data['invoice_number']}.pdf"
-        
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    def render_session_invoice_pdf(self, invoice_data: Dict[str, Any]) -> bytes:
+        """Render PDF invoice for complete session straight into memory"""
+        return self.build(self.session_invoice_story(invoice_data), self.invoice_layout)
+
+    def render_session_invoices_pdf(self, invoices: List[Dict[str, Any]]) -> bytes:
+        """Render several session invoices into one document, one invoice per page"""
+        story = []
+        for invoice_data in invoices:
+            if story:
+                story.append(PageBreak())
+            story.extend(self.session_invoice_story(invoice_data))
+        return self.build(story, self.invoice_layout)
+
+    def session_invoice_story(self, invoice_data: Dict[str, Any]) -> list:
+        """Flowables for one session invoice"""
+        created_at = invoice_data['created_at']
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
         
-        doc = SimpleDocTemplate(save_path, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
         story = []
         
         # Restaurant Header
@@ -161,19 +218,11 @@ class PDFService:
         invoice_info = [
             ['Invoice Number:', invoice_data['invoice_number']],
             ['Table Number:', invoice_data['table_number']],
-            ['Date:', datetime.datetime.fromisoformat(invoice_data['created_at']).strftime('%d-%m-%Y %H:%M:%S')],
+            ['Date:', created_at.strftime('%d-%m-%Y %H:%M:%S')],
         ]
         
-        invoice_table = Table(invoice_info, colWidths=[2*inch, 3*inch])
-        invoice_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('BACKGROUND', (0, 0), (0, -1), colors.beige),
-        ]))
+        invoice_table = Table(invoice_info, colWidths=self.invoice_info_widths)
+        invoice_table.setStyle(self.invoice_info_table_style)
         
         story.append(invoice_table)
         story.append(Spacer(1, 20))
@@ -189,17 +238,8 @@ class PDFService:
                 f"₹{order['total_price']:.2f}"
             ])
         
-        orders_table = Table(orders_data, colWidths=[2*inch, 2*inch, 1.5*inch])
-        orders_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        orders_table = Table(orders_data, colWidths=self.invoice_order_widths)
+        orders_table.setStyle(self.invoice_grid_table_style)
         
         story.append(orders_table)
         story.append(Spacer(1, 20))
@@ -216,17 +256,8 @@ class PDFService:
                 f"₹{item['subtotal']:.2f}"
             ])
         
-        items_table = Table(items_data, colWidths=[3*inch, 1*inch, 1*inch, 1.5*inch])
-        items_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        items_table = Table(items_data, colWidths=self.invoice_item_widths)
+        items_table.setStyle(self.invoice_grid_table_style)
         
         story.append(items_table)
         story.append(Spacer(1, 20))
@@ -238,17 +269,8 @@ class PDFService:
             ['Grand Total:', f"₹{invoice_data['grand_total']:.2f}"]
         ]
         
-        total_table = Table(total_data, colWidths=[3*inch, 1.5*inch])
-        total_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('BACKGROUND', (0, 2), (-1, 2), colors.lightgreen),
-            ('FONTNAME', (0, 2), (-1, 2), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 2), (-1, 2), 14),
-            ('TEXTCOLOR', (0, 2), (-1, 2), colors.darkgreen),
-        ]))
+        total_table = Table(total_data, colWidths=self.invoice_total_widths)
+        total_table.setStyle(self.invoice_total_table_style)
         
         story.append(total_table)
         story.append(Spacer(1, 30))
@@ -257,24 +279,10 @@ class PDFService:
         story.append(Paragraph("Thank you for dining with us!", self.normal_style))
         story.append(Paragraph("Please visit again soon", self.normal_style))
         
-        # Build PDF
-        doc.build(story)
-        
-        return save_path
+        return story
 
     def generate_session_invoice_pdf_bytes(self, invoice_data: Dict[str, Any]) -> BytesIO:
         """Generate PDF invoice for complete session and return as bytes"""
-        buffer = BytesIO()
-        save_path = f"temp_bills/invoice_{invoice_data['invoice_number']}.pdf"
-        
-        # Generate the PDF file first
-        self.generate_session_invoice_pdf(invoice_data, save_path)
-        
-        # Read the generated PDF and return as bytes
-        with open(save_path, 'rb') as f:
-            buffer.write(f.read())
-        
-        buffer.seek(0)
-        return buffer
+        return BytesIO(self.render_session_invoice_pdf(invoice_data))
 
 pdf_service = PDFService()
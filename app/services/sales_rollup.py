@@ -0,0 +1,260 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+
+from app.models.order import Order, OrderItem
+from app.models.enums import OrderStatus
+from app.models.menu import MenuItem
+from app.models.order_archive import ArchivedOrderItem
+from app.models.sales_rollup import CategorySales, DailySales, HourlySales, ItemSales, RolledUpOrder
+from app.services.order_archive import is_archived
+
+UNCATEGORIZED = "Uncategorized"
+
+
+def upsert_increments(
+    db: Session,
+    model,
+    key_columns: List[str],
+    rows: List[dict],
+    replace_columns: List[str] = (),
+    extra_updates: dict = None
+):
+    """Insert rollup rows, adding the counters onto an existing row with the same key"""
+    if not rows:
+        return
+
+    table = model.__table__
+    value_columns = [column for column in rows[0] if column not in key_columns and column not in replace_columns]
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(rows)
+        updates = {column: table.c[column] + stmt.inserted[column] for column in value_columns}
+        updates.update({column: stmt.inserted[column] for column in replace_columns})
+        updates.update(extra_updates or {})
+        stmt = stmt.on_duplicate_key_update(**updates)
+    else:
+        # SQLite (local runs) speaks the same ON CONFLICT dialect as PostgreSQL
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(rows)
+        updates = {column: table.c[column] + stmt.excluded[column] for column in value_columns}
+        updates.update({column: stmt.excluded[column] for column in replace_columns})
+        updates.update(extra_updates or {})
+        stmt = stmt.on_conflict_do_update(index_elements=key_columns, set_=updates)
+
+    db.execute(stmt)
+
+
+def claim_orders(db: Session, orders: Iterable[Order]) -> List[Order]:
+    """Insert a RolledUpOrder row per order, skipping existing ones; returns the orders claimed
+
+    Two requests billing the same order at once both get past the
+    "already rolled up" read. The primary key lets exactly one of them
+    insert the row (the other waits on the row lock, then skips it), so
+    only the claimed orders are added to the totals.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        claim = insert(RolledUpOrder.__table__).prefix_with("IGNORE")
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+        claim = insert(RolledUpOrder.__table__).on_conflict_do_nothing(index_elements=["order_id"])
+
+    claimed = []
+    for order in orders:
+        result = db.execute(claim.values(order_id=order.id, sales_date=sales_slot(order)[0]))
+        if result.rowcount == 1:
+            claimed.append(order)
+    return claimed
+
+
+def sales_slot(order: Order) -> Tuple[date, int]:
+    placed_at = order.created_at or datetime.now()
+    return placed_at.date(), placed_at.hour
+
+
+def order_lines(db: Session, orders: Iterable[Order]) -> list:
+    """(order_id, menu_item_id, quantity, subtotal, name, category) for hot and archived orders"""
+    ids_by_model: Dict[type, list] = defaultdict(list)
+    for order in orders:
+        ids_by_model[ArchivedOrderItem if is_archived(order) else OrderItem].append(order.id)
+
+    lines = []
+    for item_model, ids in ids_by_model.items():
+        lines.extend(
+            db.query(
+                item_model.order_id,
+                item_model.menu_item_id,
+                item_model.quantity,
+                item_model.subtotal,
+                MenuItem.name,
+                MenuItem.category
+            )
+            .outerjoin(MenuItem, item_model.menu_item_id == MenuItem.id)
+            .filter(item_model.order_id.in_(ids))
+            .all()
+        )
+    return lines
+
+
+def record_paid_orders(db: Session, orders: Iterable[Order]) -> int:
+    """Add newly paid orders to the rollup tables inside the caller's transaction
+
+    Cancelled orders and orders already rolled up are skipped, so calling
+    this again for the same session (or from the backfill) is harmless.
+    Returns the number of orders added.
+    """
+    orders = [order for order in orders if order.status != OrderStatus.CANCELLED]
+    if not orders:
+        return 0
+
+    already = {
+        order_id for (order_id,) in db.query(RolledUpOrder.order_id).filter(
+            RolledUpOrder.order_id.in_([order.id for order in orders])
+        )
+    }
+    fresh = {
+        order.id: order
+        for order in claim_orders(db, (order for order in orders if order.id not in already))
+    }
+    if not fresh:
+        return 0
+
+    daily: Dict[date, dict] = defaultdict(lambda: {"orders_count": 0, "items_sold": 0, "revenue": Decimal(0)})
+    hourly: Dict[Tuple[date, int], dict] = defaultdict(lambda: {"orders_count": 0, "revenue": Decimal(0)})
+    categories: Dict[Tuple[date, str], dict] = defaultdict(lambda: {"quantity": 0, "revenue": Decimal(0)})
+    items: Dict[Tuple[date, int], dict] = {}
+
+    for order in fresh.values():
+        day, hour = sales_slot(order)
+        revenue = Decimal(order.total_price or 0)
+        daily[day]["orders_count"] += 1
+        daily[day]["revenue"] += revenue
+        hourly[(day, hour)]["orders_count"] += 1
+        hourly[(day, hour)]["revenue"] += revenue
+
+    for order_id, menu_item_id, quantity, subtotal, name, category in order_lines(db, fresh.values()):
+        day, _ = sales_slot(fresh[order_id])
+        subtotal = Decimal(subtotal or 0)
+        daily[day]["items_sold"] += quantity
+
+        category_totals = categories[(day, category or UNCATEGORIZED)]
+        category_totals["quantity"] += quantity
+        category_totals["revenue"] += subtotal
+
+        item_totals = items.setdefault(
+            (day, menu_item_id),
+            {"item_name": name or "Unknown", "quantity": 0, "revenue": Decimal(0)}
+        )
+        item_totals["quantity"] += quantity
+        item_totals["revenue"] += subtotal
+
+    upsert_increments(
+        db, DailySales, ["sales_date"],
+        [{"sales_date": day, **totals} for day, totals in daily.items()],
+        extra_updates={"updated_at": func.now()}
+    )
+    upsert_increments(
+        db, HourlySales, ["sales_date", "hour"],
+        [{"sales_date": day, "hour": hour, **totals} for (day, hour), totals in hourly.items()]
+    )
+    upsert_increments(
+        db, CategorySales, ["sales_date", "category"],
+        [{"sales_date": day, "category": category, **totals} for (day, category), totals in categories.items()]
+    )
+    # item_name is not additive; the latest name wins
+    upsert_increments(
+        db, ItemSales, ["sales_date", "menu_item_id"],
+        [{"sales_date": day, "menu_item_id": menu_item_id, **totals} for (day, menu_item_id), totals in items.items()],
+        replace_columns=["item_name"]
+    )
+    return len(fresh)
+
+
+def clear_rollups(db: Session, start_date: date, end_date: date):
+    """Drop the rolled-up figures for a date range so the backfill can rebuild them"""
+    for model in (DailySales, HourlySales, CategorySales, ItemSales, RolledUpOrder):
+        db.query(model).filter(
+            model.sales_date >= start_date,
+            model.sales_date <= end_date
+        ).delete(synchronize_session=False)
+
+
+def daily_sales(db: Session, start_date: date, end_date: date) -> List[dict]:
+    rows = db.query(DailySales).filter(
+        DailySales.sales_date >= start_date,
+        DailySales.sales_date <= end_date
+    ).order_by(DailySales.sales_date).all()
+    return [
+        {
+            "date": row.sales_date.isoformat(),
+            "orders_count": row.orders_count,
+            "items_sold": row.items_sold,
+            "revenue": float(row.revenue)
+        }
+        for row in rows
+    ]
+
+
+def hourly_sales(db: Session, day: date) -> List[dict]:
+    rows = db.query(HourlySales).filter(HourlySales.sales_date == day).order_by(HourlySales.hour).all()
+    return [
+        {"hour": row.hour, "orders_count": row.orders_count, "revenue": float(row.revenue)}
+        for row in rows
+    ]
+
+
+def category_sales(db: Session, start_date: date, end_date: date) -> List[dict]:
+    revenue = func.sum(CategorySales.revenue)
+    rows = db.query(
+        CategorySales.category,
+        func.sum(CategorySales.quantity),
+        revenue
+    ).filter(
+        CategorySales.sales_date >= start_date,
+        CategorySales.sales_date <= end_date
+    ).group_by(CategorySales.category).order_by(revenue.desc()).all()
+    return [
+        {"category": category, "quantity": int(quantity), "revenue": float(total)}
+        for category, quantity, total in rows
+    ]
+
+
+def top_items(db: Session, start_date: date, end_date: date, limit: int = 10) -> List[dict]:
+    quantity = func.sum(ItemSales.quantity)
+    rows = db.query(
+        ItemSales.menu_item_id,
+        func.max(ItemSales.item_name),
+        quantity,
+        func.sum(ItemSales.revenue)
+    ).filter(
+        ItemSales.sales_date >= start_date,
+        ItemSales.sales_date <= end_date
+    ).group_by(ItemSales.menu_item_id).order_by(quantity.desc()).limit(limit).all()
+    return [
+        {"menu_item_id": menu_item_id, "item_name": name, "quantity": int(total_quantity), "revenue": float(total)}
+        for menu_item_id, name, total_quantity, total in rows
+    ]
+
+
+def today_sales(db: Session) -> dict:
+    """Shape of TodaySalesResponse; revenue comes from the rollup, not a scan of today's orders"""
+    today = date.today()
+    rollup = db.query(DailySales).filter(DailySales.sales_date == today).first()
+    start = datetime.combine(today, time.min)
+    total_orders = db.query(func.count(Order.id)).filter(
+        Order.created_at >= start,
+        Order.created_at < start + timedelta(days=1)
+    ).scalar()
+    return {
+        "date": today.isoformat(),
+        "today_revenue": float(rollup.revenue) if rollup else 0.0,
+        "total_orders": total_orders or 0,
+        "paid_orders": rollup.orders_count if rollup else 0
+    }
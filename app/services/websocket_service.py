@@ -1,51 +1,342 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import List
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
 import json
 import asyncio
+import os
+import time
+
+from app.core.metrics import metrics
+from app.services.event_bus import create_event_bus
+
+# Topic names clients can subscribe to
+KITCHEN_TOPIC = "kitchen"
+DASHBOARD_TOPIC = "dashboard"  # live sales counters, pushed per worker rather than through the bus
+ALL_TOPIC = "*"  # legacy clients that connect without topics receive everything
+
+# Outbound back-pressure: per-client queue bound and per-send timeout (seconds)
+WS_MAX_QUEUE = int(os.getenv("WS_MAX_QUEUE", "100"))
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "5"))
+
+# Number of recent events kept for clients resuming with ?last_seq=
+WS_REPLAY_BUFFER = int(os.getenv("WS_REPLAY_BUFFER", "1000"))
+
+# Called with every decoded event this worker receives from the bus
+EventListener = Callable[[dict], Awaitable[None]]
+
+WS_FANOUT = metrics.histogram("websocket_fanout_seconds", "Time to queue one event for this worker's sockets and run its listeners")
+WS_MESSAGES = metrics.counter("websocket_messages_queued_total", "Messages queued for WebSocket clients")
+WS_DROPPED = metrics.counter("websocket_messages_dropped_total", "Coalescable messages dropped from full client queues")
+WS_SLOW_CONSUMERS = metrics.counter("websocket_slow_consumers_total", "WebSocket clients disconnected for falling behind")
+
+
+def order_topic(order_id) -> str:
+    return f"order:{order_id}"
+
+
+def session_topic(session_id) -> str:
+    return f"session:{session_id}"
+
+
+def table_topic(table_number) -> str:
+    return f"table:{table_number}"
+
+
+def parse_topics(raw: Optional[str]) -> List[str]:
+    """Parse a comma separated ?topics= query value"""
+    if not raw:
+        return []
+    return [topic.strip() for topic in raw.split(",") if topic.strip()]
+
+
+def parse_last_seq(raw: Optional[str]) -> Optional[int]:
+    """Parse the ?last_seq= resume token; anything invalid means a fresh connection"""
+    try:
+        return int(raw) if raw is not None else None
+    except ValueError:
+        return None
+
+
+class ClientConnection:
+    """Bounded outbound queue plus a sender task for one socket
+
+    Messages carrying a coalesce key (status updates for one order) replace
+    an older queued message with the same key, so a lagging screen only
+    ever receives the latest status. When the queue is full the oldest
+    coalescable message is dropped; if nothing can be dropped the client
+    is treated as a slow consumer.
+    """
+
+    def __init__(self, websocket: WebSocket, max_queue: int = WS_MAX_QUEUE):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.queue: Deque[Tuple[Optional[str], str]] = deque()
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    def enqueue(self, message: str, coalesce_key: Optional[str] = None) -> bool:
+        """Queue a message without blocking; False means the client is too slow"""
+        if coalesce_key is not None:
+            for index, (key, _) in enumerate(self.queue):
+                if key == coalesce_key:
+                    self.queue[index] = (coalesce_key, message)
+                    return True
+
+        if len(self.queue) >= self.max_queue:
+            for index, (key, _) in enumerate(self.queue):
+                if key is not None:
+                    del self.queue[index]
+                    self.dropped += 1
+                    WS_DROPPED.inc()
+                    break
+            else:
+                return False
+
+        self.queue.append((coalesce_key, message))
+        self.ready.set()
+        return True
+
+    async def run(self, manager: "WebSocketManager"):
+        try:
+            while True:
+                while not self.queue:
+                    self.ready.clear()
+                    await self.ready.wait()
+
+                _, message = self.queue.popleft()
+                await asyncio.wait_for(self.websocket.send_text(message), WS_SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            print("🐢 Slow WebSocket client timed out, disconnecting")
+            await manager.close_slow_consumer(self.websocket)
+        except Exception:
+            manager.disconnect(self.websocket)
 
-# Store active WebSocket connections
-active_connections: List[WebSocket] = []
 
 class WebSocketManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        # topic -> sockets, and socket -> topics for O(topics) disconnects
+        self.topics: Dict[str, Set[WebSocket]] = {}
+        self.subscriptions: Dict[WebSocket, Set[str]] = {}
+        self.pending_closes: Set[asyncio.Task] = set()
+        # Ring buffer of (seq, topics, message, coalesce_key) for reconnecting clients
+        self.history: Deque[Tuple[int, Optional[List[str]], str, Optional[str]]] = deque(maxlen=WS_REPLAY_BUFFER)
+        self.last_seq = 0
+        self.listeners: List[EventListener] = []
+        # In-process by default; a shared broker when EVENT_BUS_URL is set
+        self.bus = create_event_bus(self.deliver)
+
+    async def start(self):
+        await self.bus.start()
+
+    def add_listener(self, listener: EventListener):
+        """Observe every event delivered to this worker, e.g. to keep live counters"""
+        self.listeners.append(listener)
 
-    async def connect(self, websocket: WebSocket):
+    async def stop(self):
+        await self.bus.stop()
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        topics: Optional[Iterable[str]] = None,
+        last_seq: Optional[int] = None
+    ):
         await websocket.accept()
         self.active_connections.append(websocket)
+
+        client = ClientConnection(websocket)
+        client.task = asyncio.create_task(client.run(self))
+        self.clients[websocket] = client
+
+        self.subscribe(websocket, topics or [ALL_TOPIC])
         print(f"✅ Client connected. Total connections: {len(self.active_connections)}")
 
+        if last_seq is None:
+            client.enqueue(json.dumps({"type": "connected", "seq": self.last_seq}))
+        else:
+            await self.resume(websocket, last_seq)
+
+    async def resume(self, websocket: WebSocket, last_seq: int):
+        """Replay buffered events after last_seq, or ask for a resync if they are gone"""
+        resync = json.dumps({"type": "resync_required", "seq": self.last_seq})
+        oldest_seq = self.history[0][0] if self.history else self.last_seq + 1
+        if last_seq > self.last_seq or last_seq + 1 < oldest_seq:
+            # Gap is larger than the buffer (or the sequence was reset): refetch everything
+            await self.send_to([websocket], resync)
+            return
+
+        joined = self.subscriptions.get(websocket, set())
+        missed = [
+            (message, coalesce_key)
+            for seq, topics, message, coalesce_key in self.history
+            if seq > last_seq and (topics is None or ALL_TOPIC in joined or joined.intersection(topics))
+        ]
+
+        # More than the client queue holds would cut the client off as a slow
+        # consumer on every reconnect; a snapshot refetch is cheaper anyway
+        client = self.clients.get(websocket)
+        if client is not None and len(missed) > client.max_queue - len(client.queue):
+            await self.send_to([websocket], resync)
+            return
+
+        for message, coalesce_key in missed:
+            await self.send_to([websocket], message, coalesce_key)
+
+    async def close_slow_consumer(self, websocket: WebSocket):
+        WS_SLOW_CONSUMERS.inc()
+        self.disconnect(websocket)
+        try:
+            await asyncio.wait_for(websocket.close(code=1013), WS_SEND_TIMEOUT)
+        except Exception:
+            pass
+
     def disconnect(self, websocket: WebSocket):
+        client = self.clients.pop(websocket, None)
+        if client and client.task and client.task is not asyncio.current_task():
+            client.task.cancel()
+
+        for topic in self.subscriptions.pop(websocket, set()):
+            subscribers = self.topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(websocket)
+                if not subscribers:
+                    del self.topics[topic]
+
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
             print(f"❌ Client disconnected. Total connections: {len(self.active_connections)}")
 
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]):
+        joined = self.subscriptions.setdefault(websocket, set())
+        for topic in topics:
+            self.topics.setdefault(topic, set()).add(websocket)
+            joined.add(topic)
+
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]):
+        joined = self.subscriptions.get(websocket, set())
+        for topic in topics:
+            subscribers = self.topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(websocket)
+                if not subscribers:
+                    del self.topics[topic]
+            joined.discard(topic)
+
+    async def handle_message(self, websocket: WebSocket, data: str):
+        """Handle subscribe / unsubscribe ({"topics": [...]}) and resume ({"last_seq": n}) messages"""
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+
+        if not isinstance(message, dict):
+            return
+
+        topics = message.get("topics") or []
+        if isinstance(topics, str):
+            topics = parse_topics(topics)
+
+        if message.get("action") == "subscribe":
+            self.subscribe(websocket, topics)
+        elif message.get("action") == "unsubscribe":
+            self.unsubscribe(websocket, topics)
+        elif message.get("action") == "resume" and isinstance(message.get("last_seq"), int):
+            await self.resume(websocket, message["last_seq"])
+
+    def subscribers(self, topics: Iterable[str]) -> Set[WebSocket]:
+        """Every socket subscribed to at least one of the topics"""
+        recipients = set(self.topics.get(ALL_TOPIC, ()))
+        for topic in topics:
+            recipients.update(self.topics.get(topic, ()))
+        return recipients
+
     async def send_personal_message(self, message: str, websocket: WebSocket):
         try:
             await websocket.send_text(message)
         except:
             pass
 
-    async def broadcast(self, message: str):
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except:
-                disconnected.append(connection)
-        
-        # Remove disconnected connections
-        for connection in disconnected:
+    async def send_to(self, connections: Iterable[WebSocket], message: str, coalesce_key: Optional[str] = None):
+        """Queue one pre-serialized message for every connection and return immediately"""
+        slow = []
+        queued = 0
+        for connection in connections:
+            client = self.clients.get(connection)
+            if client is None:
+                continue
+            if client.enqueue(message, coalesce_key):
+                queued += 1
+            else:
+                slow.append(connection)
+        WS_MESSAGES.inc(queued)
+
+        # Clients whose queue is full of undroppable messages are cut off
+        for connection in slow:
+            print("🐢 WebSocket client queue full, disconnecting")
             self.disconnect(connection)
+            task = asyncio.create_task(self.close_slow_consumer(connection))
+            self.pending_closes.add(task)
+            task.add_done_callback(self.pending_closes.discard)
+
+    async def deliver(
+        self,
+        seq: int,
+        topics: Optional[List[str]],
+        message: str,
+        coalesce_key: Optional[str] = None
+    ):
+        """Record an event from the bus and send it to this worker's sockets (None = every socket)"""
+        start = time.perf_counter()
+        self.history.append((seq, topics, message, coalesce_key))
+        self.last_seq = max(self.last_seq, seq)
+
+        if topics is None:
+            await self.send_to(list(self.active_connections), message, coalesce_key)
+        else:
+            await self.send_to(self.subscribers(topics), message, coalesce_key)
+
+        if self.listeners:
+            event = json.loads(message)
+            for listener in self.listeners:
+                try:
+                    await listener(event)
+                except Exception as e:
+                    print(f"WebSocket event listener failed: {e}")
+        WS_FANOUT.observe(time.perf_counter() - start)
+
+    async def publish(self, topics: Optional[Iterable[str]], event: dict, coalesce_key: Optional[str] = None):
+        """Number an event, serialize it once and send it to subscribers on every worker"""
+        seq = await self.bus.next_sequence()
+        message = json.dumps({**event, "seq": seq})
+        await self.bus.publish(seq, list(topics) if topics is not None else None, message, coalesce_key)
 
-    async def broadcast_order_update(self, order_id: int, status: str):
+    async def broadcast(self, event: dict):
+        await self.publish(None, event)
+
+    async def broadcast_order_update(
+        self,
+        order_id: int,
+        status: str,
+        table_number: Optional[str] = None,
+        session_id: Optional[str] = None
+    ):
         message = {
             "type": "order_status_update",
             "order_id": order_id,
             "status": status,
             "timestamp": asyncio.get_event_loop().time()
         }
-        await self.broadcast(json.dumps(message))
+        topics = [KITCHEN_TOPIC, order_topic(order_id)]
+        if table_number:
+            topics.append(table_topic(table_number))
+        if session_id:
+            topics.append(session_topic(session_id))
+        await self.publish(topics, message, coalesce_key=order_topic(order_id))
 
     async def broadcast_new_order(self, order_data: dict):
         message = {
@@ -53,7 +344,32 @@ class WebSocketManager:
             "order": order_data,
             "timestamp": asyncio.get_event_loop().time()
         }
-        await self.broadcast(json.dumps(message))
+        topics = [KITCHEN_TOPIC, order_topic(order_data.get("id"))]
+        if order_data.get("table_number"):
+            topics.append(table_topic(order_data["table_number"]))
+        if order_data.get("session_id"):
+            topics.append(session_topic(order_data["session_id"]))
+        await self.publish(topics, message)
 
 # Global WebSocket manager
 websocket_manager = WebSocketManager()
+
+
+def websocket_metrics():
+    yield "websocket_connections", "gauge", "Open WebSocket connections", (), {(): len(websocket_manager.active_connections)}
+    yield (
+        "websocket_topic_subscribers", "gauge", "Sockets subscribed per topic kind", ("topic",),
+        topic_subscriber_counts(websocket_manager.topics)
+    )
+
+
+def topic_subscriber_counts(topics: Dict[str, Set[WebSocket]]) -> Dict[tuple, int]:
+    # order:42 and session:SES... are grouped by kind so the series count stays fixed
+    counts: Dict[tuple, int] = {}
+    for topic, sockets in list(topics.items()):
+        kind = (topic.split(":", 1)[0],)
+        counts[kind] = counts.get(kind, 0) + len(sockets)
+    return counts
+
+
+metrics.add_collector(websocket_metrics)
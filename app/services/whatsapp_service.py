@@ -0,0 +1,66 @@
+import os
+from datetime import datetime
+from dotenv import load_dotenv
+
+from app.services.job_queue import PermanentJobError
+
+load_dotenv()
+
+
+class WhatsAppService:
+    def __init__(self):
+        self.twilio_sid = os.getenv("TWILIO_SID")
+        self.twilio_auth_token = os.getenv("TWILIO_AUTH_TOKEN")
+        self.whatsapp_number = os.getenv("TWILIO_WHATSAPP_NUMBER")
+        self.client = None
+
+    def get_client(self):
+        if not self.twilio_sid or not self.twilio_auth_token:
+            # Retrying cannot fix missing credentials; dead-letter the job at once
+            raise PermanentJobError("Twilio not configured")
+        if self.client is None:
+            # Imported on first send: twilio is slow to import and most workers never send
+            from twilio.rest import Client
+
+            self.client = Client(self.twilio_sid, self.twilio_auth_token)
+        return self.client
+
+    @staticmethod
+    def format_phone_number(phone_number) -> str:
+        """Normalize a local number to E.164 with the +91 country code"""
+        phone_number = str(phone_number).strip()
+
+        if phone_number.startswith("0"):
+            phone_number = "+91" + phone_number[1:]
+        elif not phone_number.startswith("+"):
+            phone_number = "+91" + phone_number
+        return phone_number
+
+    @staticmethod
+    def format_bill_message(customer_name, order_id, items, total_amount):
+        message = (
+            f"🍽️ *RESTAURANT BILL*\n\n"
+            f"👤 Customer: {customer_name}\n"
+            f"🧾 Order ID: #{order_id}\n"
+            f"📅 Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n"
+            f"📋 *Items:*\n"
+        )
+
+        for item in items:
+            name = item.get("item_name") or item.get("name")
+            line_total = float(item["price"]) * int(item["quantity"])
+            message += f"• {name} x{item['quantity']} - ₹{line_total:.2f}\n"
+
+        message += f"\n💰 *Total Amount: ₹{total_amount:.2f}*\n\nThank you for dining with us! 🙏"
+        return message
+
+    def send_message(self, phone_number, body: str) -> str:
+        """Send a WhatsApp message and return the Twilio message SID"""
+        message = self.get_client().messages.create(
+            body=body,
+            from_=self.whatsapp_number,
+            to=f"whatsapp:{self.format_phone_number(phone_number)}"
+        )
+        return message.sid
+
+whatsapp_service = WhatsAppService()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Order archival
+Moves closed sessions older than --days, with their orders and items, into
+the *_archive tables in small batches. Each batch is its own transaction, so
+the run can be stopped at any point and simply started again later.
+
+Usage:
+  python archive_orders.py
+  python archive_orders.py --days 180 --batch-size 500 --max-batches 20
+"""
+
+import argparse
+import sys
+
+
+def parse_args():
+    from app.services.order_archive import ORDER_ARCHIVE_AFTER_DAYS, ORDER_ARCHIVE_BATCH_SIZE, ORDER_ARCHIVE_PAUSE
+
+    parser = argparse.ArgumentParser(description="Move old closed sessions to the archive tables")
+    parser.add_argument("--days", type=int, default=ORDER_ARCHIVE_AFTER_DAYS, help="archive sessions closed more than this many days ago")
+    parser.add_argument("--batch-size", type=int, default=ORDER_ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, help="stop after this many batches")
+    parser.add_argument("--pause", type=float, default=ORDER_ARCHIVE_PAUSE, help="seconds to wait between batches")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.days < 1:
+        print("❌ --days must be at least 1")
+        return 1
+
+    from app.db.database import SessionLocal
+    from app.services.order_archive import archive_cutoff, archive_orders
+
+    if SessionLocal is None:
+        print("❌ Database is not available")
+        return 1
+
+    print(f"📦 Archiving sessions closed before {archive_cutoff(args.days):%Y-%m-%d %H:%M}")
+    db = SessionLocal()
+    try:
+        totals = archive_orders(
+            db,
+            days=args.days,
+            batch_size=args.batch_size,
+            max_batches=args.max_batches,
+            pause=args.pause
+        )
+        print(f"✅ Archived {totals['sessions']} sessions and {totals['orders']} orders in {totals['batches']} batches")
+        return 0
+    except Exception as e:
+        print(f"❌ Archival failed: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Sales rollup backfill
+Rolls paid orders, hot and archived, into the sales_* tables. Orders
+already rolled up are skipped, so it is safe to re-run; --rebuild clears
+the range first.
+
+Usage:
+  python backfill_sales_rollups.py 2026-01-01
+  python backfill_sales_rollups.py 2026-10-01 --end 2026-10-31 --rebuild
+"""
+
+import argparse
+import sys
+from datetime import date, datetime, time, timedelta
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill the sales rollup tables")
+    parser.add_argument("start", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="last day, defaults to today")
+    parser.add_argument("--rebuild", action="store_true", help="clear the range before rolling up")
+    parser.add_argument("--batch-size", type=int, default=500)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    end = args.end or date.today()
+    if end < args.start:
+        print("❌ --end is before start")
+        return 1
+
+    from sqlalchemy import or_
+    from app.db.database import SessionLocal
+    from app.models.order import Order, OrderStatus, PaymentStatus
+    from app.models.order_archive import ArchivedOrder
+    from app.services.sales_rollup import clear_rollups, record_paid_orders
+
+    if SessionLocal is None:
+        print("❌ Database is not available")
+        return 1
+
+    start_at = datetime.combine(args.start, time.min)
+    end_at = datetime.combine(end + timedelta(days=1), time.min)
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            clear_rollups(db, args.start, end)
+            db.commit()
+            print(f"🧹 Cleared rollups from {args.start} to {end}")
+
+        added = 0
+        # Archived orders too, or --rebuild would empty the days already archived
+        for model in (ArchivedOrder, Order):
+            last_id = 0
+            while True:
+                orders = db.query(model).filter(
+                    model.id > last_id,
+                    model.created_at >= start_at,
+                    model.created_at < end_at,
+                    or_(model.payment_status == PaymentStatus.PAID, model.status == OrderStatus.COMPLETED)
+                ).order_by(model.id).limit(args.batch_size).all()
+                if not orders:
+                    break
+                last_id = orders[-1].id
+
+                added += record_paid_orders(db, orders)
+                db.commit()
+                db.expunge_all()
+
+        print(f"✅ Rolled up {added} orders from {args.start} to {end}")
+        return 0
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Backfill failed: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
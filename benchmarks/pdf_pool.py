@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+PDF process pool benchmark
+Renders a burst of session invoices from an async "route" two ways - on the
+event loop thread and through PDFRenderPool - while a 10 ms ticker measures
+how long the loop is stalled
+
+Usage: python -m benchmarks.pdf_pool [invoices] [workers]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from app.services.pdf_pool import PDFRenderPool
+from app.services.pdf_service import pdf_service
+from benchmarks.pdf_render import INVOICE
+
+INVOICES = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+WORKERS = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+TICK = 0.01
+
+
+async def ticker(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def burst(render):
+    stop = asyncio.Event()
+    lags = []
+    tick_task = asyncio.create_task(ticker(stop, lags))
+    await asyncio.sleep(TICK * 2)
+
+    start = time.perf_counter()
+    pdfs = await asyncio.gather(*(render() for _ in range(INVOICES)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await tick_task
+    assert all(pdf.startswith(b"%PDF") for pdf in pdfs)
+    return INVOICES / elapsed, max(lags) * 1000
+
+
+async def render_inline():
+    return pdf_service.render_session_invoice_pdf(INVOICE)
+
+
+def main():
+    pool = PDFRenderPool(workers=WORKERS, max_pending=INVOICES)
+    start = time.perf_counter()
+    pool.start(wait=True)
+    warm_up = time.perf_counter() - start
+
+    print(f"PDF pool benchmark ({INVOICES} invoices, {WORKERS} processes, warm-up {warm_up:.2f}s)")
+    print("=" * 56)
+    print(f"{'mode':>12} {'invoices/s':>14} {'max loop stall (ms)':>22}")
+
+    try:
+        inline_rate, inline_lag = asyncio.run(burst(render_inline))
+        pool_rate, pool_lag = asyncio.run(burst(lambda: pool.render_session_invoice_pdf(INVOICE)))
+    finally:
+        pool.stop()
+
+    print(f"{'event loop':>12} {inline_rate:>14.1f} {inline_lag:>22.1f}")
+    print(f"{'pool':>12} {pool_rate:>14.1f} {pool_lag:>22.1f}")
+    print("=" * 56)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Bill PDF rendering benchmark
+Compares the old render path (fresh styles per bill, written to temp_bills/
+and read back) with in-memory rendering on a shared PDFService
+
+Usage: python -m benchmarks.pdf_render [bills]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from app.services.pdf_service import PDFService
+
+BILLS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+ORDER = {
+    "order_number": "ORD000042",
+    "table_number": "T4",
+    "total_amount": 1180,
+    "items": [
+        {"name": f"Dish {i}", "quantity": 1 + i % 3, "price": 120 + 10 * i}
+        for i in range(8)
+    ],
+}
+CUSTOMER = {"name": "Guest", "phone": "9000000000", "email": "guest@example.com"}
+INVOICE = {
+    "invoice_number": "INV-000042",
+    "table_number": "T4",
+    "created_at": datetime.now().isoformat(),
+    "orders": [
+        {"order_number": f"ORD{i:06d}", "status": "served", "total_price": 590.0}
+        for i in range(3)
+    ],
+    "items": [
+        {"name": f"Dish {i}", "quantity": 2, "price": 150.0, "subtotal": 300.0}
+        for i in range(10)
+    ],
+    "subtotal": 3000.0,
+    "tax_rate": 18,
+    "tax_amount": 540.0,
+    "grand_total": 3540.0,
+}
+
+
+def round_trip(pdf, path):
+    """What the old path did with every render: write it to disk and read it back"""
+    with open(path, "wb") as f:
+        f.write(pdf)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def old_bill(directory, i):
+    pdf = PDFService().render_bill_pdf(ORDER, CUSTOMER)
+    return round_trip(pdf, os.path.join(directory, f"bill_{i}.pdf"))
+
+
+def old_invoice(directory, i):
+    pdf = PDFService().render_session_invoice_pdf(INVOICE)
+    return round_trip(pdf, os.path.join(directory, f"invoice_{i}.pdf"))
+
+
+def bills_per_second(render):
+    render(0)  # warm up imports and font metrics
+    start = time.perf_counter()
+    for i in range(BILLS):
+        pdf = render(i)
+    elapsed = time.perf_counter() - start
+    assert pdf.startswith(b"%PDF")
+    return BILLS / elapsed
+
+
+def main():
+    service = PDFService()
+
+    print(f"PDF rendering benchmark ({BILLS} documents each)")
+    print("=" * 56)
+    print(f"{'document':>16} {'disk (bills/s)':>18} {'memory (bills/s)':>18}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        rows = [
+            ("order bill",
+             bills_per_second(lambda i: old_bill(directory, i)),
+             bills_per_second(lambda i: service.render_bill_pdf(ORDER, CUSTOMER))),
+            ("session invoice",
+             bills_per_second(lambda i: old_invoice(directory, i)),
+             bills_per_second(lambda i: service.render_session_invoice_pdf(INVOICE))),
+        ]
+
+    for label, disk, memory in rows:
+        print(f"{label:>16} {disk:>18.1f} {memory:>18.1f}   ({memory / disk:.2f}x)")
+    print("=" * 56)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Bill e-mail throughput benchmark
+Sends the same bills through a local aiosmtpd stand-in three ways - a fresh
+connection per message (the old behaviour), the pooled sender, and a batch -
+then kills the server mid-run to check that the pool reconnects
+
+Uses aiosmtpd (in requirements.txt); TLS and login are skipped locally,
+so HANDSHAKE_DELAY stands in for the STARTTLS + AUTH round trips
+
+Usage: python -m benchmarks.smtp_throughput
+"""
+
+import asyncio
+import os
+import smtplib
+import socket
+import sys
+import time
+
+os.environ.setdefault("GMAIL_EMAIL", "bills@restaurant.test")
+
+from aiosmtpd.controller import Controller
+
+from app.services.email_service import EmailService, SMTPConnectionPool
+
+MESSAGES = 200
+HANDSHAKE_DELAY = float(os.getenv("HANDSHAKE_DELAY", "0.02"))
+
+ORDER = {
+    "order_number": "ORD000042",
+    "table_number": "T4",
+    "total_amount": 640,
+    "payment_method": "UPI",
+    "items": [
+        {"name": "Paneer Tikka", "quantity": 2, "price": 440},
+        {"name": "Masala Dosa", "quantity": 1, "price": 200},
+    ],
+}
+
+
+class CountingHandler:
+    def __init__(self):
+        self.connections = 0
+        self.messages = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        await asyncio.sleep(HANDSHAKE_DELAY)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages += 1
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port):
+    handler = CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    return controller, handler
+
+
+def make_service(port):
+    service = EmailService()
+    service.pool = SMTPConnectionPool("127.0.0.1", port, use_tls=False, size=1)
+    return service
+
+
+def bills(count):
+    return [
+        {
+            "to_email": f"guest{i}@example.com",
+            "customer_name": f"Guest {i}",
+            "order_details": ORDER,
+        }
+        for i in range(count)
+    ]
+
+
+def send_unpooled(service, port, count):
+    for bill in bills(count):
+        message = service.build_bill_message(bill["to_email"], bill["customer_name"], bill["order_details"])
+        server = smtplib.SMTP("127.0.0.1", port)
+        server.sendmail(service.gmail_email, bill["to_email"], message)
+        server.quit()
+
+
+def send_pooled(service, count):
+    for bill in bills(count):
+        result = service.send_bill_email(bill["to_email"], bill["customer_name"], bill["order_details"])
+        assert result["success"], result
+
+
+def send_batched(service, count):
+    results = service.send_bill_emails(bills(count))
+    assert all(result["success"] for result in results), results
+
+
+def run(label, send):
+    port = free_port()
+    controller, handler = start_server(port)
+    service = make_service(port)
+    try:
+        start = time.perf_counter()
+        send(service, port)
+        elapsed = time.perf_counter() - start
+    finally:
+        service.close()
+        controller.stop()
+
+    print(f"{label:>12} {handler.messages:>10} {handler.connections:>12} {MESSAGES / elapsed:>12.1f}")
+    return handler
+
+
+def check_reconnect():
+    port = free_port()
+    controller, handler = start_server(port)
+    service = make_service(port)
+
+    send_pooled(service, 5)
+    controller.stop()
+
+    # Same port, new server: the pooled connection is now dead
+    controller, handler = start_server(port)
+    try:
+        send_pooled(service, 5)
+        stats = service.stats()
+    finally:
+        service.close()
+        controller.stop()
+
+    return handler.messages == 5 and stats["reconnects"] >= 1, stats
+
+
+def main():
+    print("Bill e-mail throughput benchmark")
+    print("=" * 50)
+    print(f"{'mode':>12} {'messages':>10} {'connections':>12} {'msgs/sec':>12}")
+
+    run("per-message", lambda service, port: send_unpooled(service, port, MESSAGES))
+    pooled = run("pooled", lambda service, port: send_pooled(service, MESSAGES))
+    batched = run("batched", lambda service, port: send_batched(service, MESSAGES))
+
+    reconnected, stats = check_reconnect()
+    print("=" * 50)
+    print(f"Reconnect after server restart: {'ok' if reconnected else 'FAILED'} ({stats['reconnects']} reconnects)")
+
+    expected = -(-MESSAGES // 100)  # default max_messages per connection
+    if pooled.connections != expected or batched.connections != expected or not reconnected:
+        print("❌ Pooled sender did not reuse connections as expected")
+        return 1
+
+    print(f"✅ {MESSAGES} messages over {expected} connections")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+-- Restaurant QR Ordering System - Background Jobs Migration
+-- Version: 2.3 (Durable job queue)
+-- Description: Table-backed queue for bill PDFs, e-mails and WhatsApp messages
+
+USE restaurant_db;
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL,
+    payload TEXT NOT NULL,
+    status ENUM('QUEUED', 'RUNNING', 'SUCCEEDED', 'DEAD') NOT NULL DEFAULT 'QUEUED',
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 5,
+    run_after DATETIME NOT NULL,
+    locked_by VARCHAR(100) NULL,
+    locked_at DATETIME NULL,
+    result TEXT NULL,
+    last_error TEXT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_kind (kind),
+    INDEX idx_status_run_after (status, run_after)
+);
+
+COMMIT;
+
+-- Migration complete
+SELECT 'Jobs migration completed successfully!' as message;
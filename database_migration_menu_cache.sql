@@ -0,0 +1,19 @@
+-- Restaurant QR Ordering System - Menu Cache Migration
+-- Version: 2.2 (Shared cache versions)
+-- Description: Version counters that let every API worker know when its in-memory menu cache is stale
+
+USE restaurant_db;
+
+-- One row per cache; bumped in the same transaction as the write it invalidates
+CREATE TABLE IF NOT EXISTS cache_versions (
+    name VARCHAR(50) PRIMARY KEY,
+    version INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+INSERT IGNORE INTO cache_versions (name, version) VALUES ('menu', 0);
+
+COMMIT;
+
+-- Migration complete
+SELECT 'Menu cache migration completed successfully!' as message;
@@ -0,0 +1,68 @@
+-- Restaurant QR Ordering System - Order Archive Migration
+-- Version: 2.7 (Hot/cold order archive)
+-- Description: Archive tables for closed sessions, their orders and items, moved out of the hot tables by archive_orders.py
+
+USE restaurant_db;
+
+-- Same columns as the hot tables, without foreign keys, AUTO_INCREMENT or ON UPDATE:
+-- rows are copied in unchanged. Enum columns are VARCHAR so any stored value copies across.
+CREATE TABLE IF NOT EXISTS order_sessions_archive (
+    id INT PRIMARY KEY,
+    session_id VARCHAR(50) NOT NULL,
+    table_number VARCHAR(20) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    customer_id INT NULL,
+    created_at TIMESTAMP NULL DEFAULT NULL,
+    updated_at TIMESTAMP NULL DEFAULT NULL,
+    closed_at TIMESTAMP NULL DEFAULT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE INDEX idx_sessions_archive_session (session_id)
+);
+
+CREATE TABLE IF NOT EXISTS orders_archive (
+    id INT PRIMARY KEY,
+    order_number VARCHAR(50) NULL,
+    session_id VARCHAR(50) NULL,
+    customer_id INT NULL,
+    table_number VARCHAR(20) NULL,
+    order_type VARCHAR(20) NULL,
+    status VARCHAR(20) NOT NULL,
+    total_price DECIMAL(10, 2),
+    subtotal DECIMAL(10, 2),
+    tax_amount DECIMAL(10, 2),
+    discount_amount DECIMAL(10, 2),
+    payment_method VARCHAR(20) NULL,
+    payment_status VARCHAR(20) NOT NULL,
+    special_instructions TEXT,
+    order_date DATE NOT NULL,
+    order_time TIME NOT NULL,
+    created_at TIMESTAMP NULL DEFAULT NULL,
+    updated_at TIMESTAMP NULL DEFAULT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_orders_archive_session (session_id),
+    INDEX idx_orders_archive_created (created_at, id)
+);
+
+CREATE TABLE IF NOT EXISTS order_items_archive (
+    id INT PRIMARY KEY,
+    order_id INT NOT NULL,
+    menu_item_id INT NOT NULL,
+    quantity INT NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    subtotal DECIMAL(10, 2) NOT NULL,
+    special_instructions TEXT,
+    created_at TIMESTAMP NULL DEFAULT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_order_items_archive_order (order_id)
+);
+
+-- Rolled-up order ids must outlive the orders they point at
+ALTER TABLE sales_rollup_orders DROP FOREIGN KEY IF EXISTS sales_rollup_orders_ibfk_1;
+
+-- Finds closed sessions due for archiving without scanning every session
+CREATE INDEX IF NOT EXISTS idx_sessions_status_closed ON order_sessions (status, closed_at);
+
+COMMIT;
+
+-- Migration complete
+SELECT 'Order archive migration completed successfully!' as message;
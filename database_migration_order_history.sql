@@ -0,0 +1,14 @@
+-- Restaurant QR Ordering System - Order History Migration
+-- Version: 2.4 (Keyset pagination indexes)
+-- Description: Composite indexes that let GET /api/orders seek on (created_at, id), optionally filtered by status or table
+
+USE restaurant_db;
+
+CREATE INDEX idx_orders_created_id ON orders (created_at, id);
+CREATE INDEX idx_orders_status_created ON orders (status, created_at, id);
+CREATE INDEX idx_orders_table_created ON orders (table_number, created_at, id);
+
+COMMIT;
+
+-- Migration complete
+SELECT 'Order history migration completed successfully!' as message;
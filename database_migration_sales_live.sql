@@ -0,0 +1,20 @@
+-- Restaurant QR Ordering System - Live Sales Migration
+-- Version: 2.6 (Live dashboard counters)
+-- Description: Checkpoints of the in-memory "today so far" sales counters, used to recover them after a restart
+
+USE restaurant_db;
+
+CREATE TABLE IF NOT EXISTS sales_live_checkpoints (
+    sales_date DATE PRIMARY KEY,
+    orders_count INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    order_ids MEDIUMTEXT NOT NULL,
+    sessions MEDIUMTEXT NOT NULL,
+    items TEXT NOT NULL,
+    checkpointed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+COMMIT;
+
+-- Migration complete
+SELECT 'Live sales migration completed successfully!' as message;
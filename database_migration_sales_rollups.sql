@@ -0,0 +1,52 @@
+-- Restaurant QR Ordering System - Sales Rollups Migration
+-- Version: 2.5 (Incremental daily sales rollups)
+-- Description: Per-day, per-hour, per-category and per-item sales maintained when a session is billed.
+-- Run `python backfill_sales_rollups.py <first day>` afterwards to roll up existing paid orders.
+
+USE restaurant_db;
+
+CREATE TABLE IF NOT EXISTS sales_daily (
+    sales_date DATE PRIMARY KEY,
+    orders_count INT NOT NULL DEFAULT 0,
+    items_sold INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS sales_hourly (
+    sales_date DATE NOT NULL,
+    hour INT NOT NULL,
+    orders_count INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (sales_date, hour)
+);
+
+CREATE TABLE IF NOT EXISTS sales_category_daily (
+    sales_date DATE NOT NULL,
+    category VARCHAR(100) NOT NULL,
+    quantity INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (sales_date, category)
+);
+
+CREATE TABLE IF NOT EXISTS sales_item_daily (
+    sales_date DATE NOT NULL,
+    menu_item_id INT NOT NULL,
+    item_name VARCHAR(255) NOT NULL,
+    quantity INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (sales_date, menu_item_id)
+);
+
+CREATE TABLE IF NOT EXISTS sales_rollup_orders (
+    order_id INT PRIMARY KEY,
+    sales_date DATE NOT NULL,
+    rolled_up_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_sales_date (sales_date),
+    FOREIGN KEY (order_id) REFERENCES orders(id)
+);
+
+COMMIT;
+
+-- Migration complete
+SELECT 'Sales rollups migration completed successfully!' as message;
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Bulk invoice export for accountants
+Writes every closed session invoice in a date range to a ZIP (one PDF per
+session) or a single merged PDF, rendering in the PDF process pool
+
+Usage:
+  python export_invoices.py 2026-10-17
+  python export_invoices.py 2026-10-01 --end 2026-10-31 --output october.zip
+  python export_invoices.py 2026-10-17 --format pdf
+"""
+
+import argparse
+import sys
+import time
+from datetime import date
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export session invoices for a date range")
+    parser.add_argument("start", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="last day, defaults to start")
+    parser.add_argument("--format", choices=["zip", "pdf"], default="zip")
+    parser.add_argument("--output", help="output file, defaults to invoices_<start>_<end>.<format>")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    end = args.end or args.start
+    if end < args.start:
+        print("❌ --end is before start")
+        return 1
+
+    from app.db.database import SessionLocal
+    from app.services.invoice_export import count_invoices, export_invoices_pdf, export_invoices_zip
+    from app.services.pdf_pool import pdf_renderer
+
+    if SessionLocal is None:
+        print("❌ Database is not available")
+        return 1
+
+    db = SessionLocal()
+    try:
+        total = count_invoices(db, args.start, end)
+    finally:
+        db.close()
+
+    if not total:
+        print(f"No closed sessions between {args.start} and {end}")
+        return 0
+
+    output = args.output or f"invoices_{args.start.isoformat()}_{end.isoformat()}.{args.format}"
+    print(f"📄 Exporting {total} invoices to {output}")
+
+    pdf_renderer.start(wait=True)
+    start = time.perf_counter()
+    try:
+        with open(output, "wb") as f:
+            if args.format == "pdf":
+                f.write(export_invoices_pdf(args.start, end))
+            else:
+                for chunk in export_invoices_zip(args.start, end):
+                    f.write(chunk)
+    finally:
+        pdf_renderer.stop()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Done in {elapsed:.1f}s ({total / elapsed:.1f} invoices/sec)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
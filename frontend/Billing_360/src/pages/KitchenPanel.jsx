@@ -1,5 +1,6 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { FaSync, FaClock, FaTrashAlt } from 'react-icons/fa';
+import websocketService from '../services/websocket';
 import '../styles/KitchenPanel.css';
 
 const KitchenPanel = () => {
@@ -34,6 +35,22 @@ const KitchenPanel = () => {
     return () => clearInterval(interval);
   }, [fetchOrders]);
 
+  // Kitchen events refresh the board right away; 'resync' means events were
+  // missed (long disconnect), so the full list is reloaded the same way
+  useEffect(() => {
+    const refresh = () => fetchOrders(false);
+    websocketService.connect(['kitchen']);
+    websocketService.on('newOrder', refresh);
+    websocketService.on('orderStatusUpdate', refresh);
+    websocketService.on('resync', refresh);
+    return () => {
+      websocketService.off('newOrder', refresh);
+      websocketService.off('orderStatusUpdate', refresh);
+      websocketService.off('resync', refresh);
+      websocketService.disconnect();
+    };
+  }, [fetchOrders]);
+
   const updateOrderStatus = async (orderId, newStatus) => {
     try {
       const response = await fetch(`http://127.0.0.1:8000/api/kitchen/orders/${orderId}`, {
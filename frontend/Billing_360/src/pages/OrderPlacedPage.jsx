@@ -66,7 +66,8 @@ const OrderPlacedPage = () => {
   useEffect(() => {
     if (orderDetails?.orderId && !socketConnected.current) {
       try {
-        websocketService.connect();
+        // Only this table's session traffic, not every other table's
+        websocketService.connect([`session:${orderDetails.sessionId}`]);
         socketConnected.current = true;
 
         const handleStatusUpdate = ({ order_id, status }) => {
@@ -85,10 +86,15 @@ const OrderPlacedPage = () => {
           }
         };
 
+        // Missed events (long disconnect): reload the whole session snapshot
+        const handleResync = () => loadSession(orderDetails.sessionId);
+
         websocketService.on("orderStatusUpdate", handleStatusUpdate);
+        websocketService.on("resync", handleResync);
 
         return () => {
           websocketService.off("orderStatusUpdate", handleStatusUpdate);
+          websocketService.off("resync", handleResync);
           websocketService.disconnect();
           socketConnected.current = false;
         };
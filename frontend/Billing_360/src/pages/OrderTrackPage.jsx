@@ -52,7 +52,7 @@ const OrderTrackPage = () => {
       });
 
       if (response.ok) {
-        alert("Bill sent successfully to your WhatsApp! ✅");
+        alert("Your bill is on its way to WhatsApp! ✅");
         navigate(`/checkout/${sessionData.session_id || orderId}`);
       } else {
         const error = await response.json();
@@ -5,6 +5,8 @@ import "../styles/OrdersPage.css";
 
 const OrdersPage = () => {
   const [orders, setOrders] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
   const [successMessage, setSuccessMessage] = useState('')
@@ -17,7 +19,8 @@ const OrdersPage = () => {
     try {
       setLoading(true)
       const response = await axios.get('http://localhost:8000/api/orders')
-      setOrders(response.data || [])
+      setOrders(response.data?.orders || [])
+      setNextCursor(response.data?.next_cursor || null)
       setError('')
     } catch (err) {
       setError('Failed to fetch orders.')
@@ -27,6 +30,23 @@ const OrdersPage = () => {
     }
   }
 
+  const fetchMoreOrders = async () => {
+    if (!nextCursor) return
+    try {
+      setLoadingMore(true)
+      const response = await axios.get('http://localhost:8000/api/orders', {
+        params: { cursor: nextCursor }
+      })
+      setOrders((current) => [...current, ...(response.data?.orders || [])])
+      setNextCursor(response.data?.next_cursor || null)
+    } catch (err) {
+      setError('Failed to fetch more orders.')
+      console.error(err)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const generateBill = async (orderId) => {
     try {
       setError('')
@@ -36,8 +56,8 @@ const OrdersPage = () => {
         `http://localhost:8000/api/generate-bill/${orderId}`
       )
 
-      if (response.data.status === 'success') {
-        setSuccessMessage(`Bill sent for Order #${orderId}`)
+      if (response.data.status === 'queued' || response.data.status === 'success') {
+        setSuccessMessage(`Bill queued for Order #${orderId}`)
         fetchOrders()
       }
     } catch (err) {
@@ -138,6 +158,16 @@ const OrdersPage = () => {
           </div>
         ))
       )}
+
+      {nextCursor && (
+        <button
+          onClick={fetchMoreOrders}
+          disabled={loadingMore}
+          style={{ marginTop: '16px', padding: '8px 16px', cursor: 'pointer' }}
+        >
+          {loadingMore ? 'Loading...' : 'Load more orders'}
+        </button>
+      )}
     </div>
   )
 }
@@ -5,11 +5,21 @@ class WebSocketService {
     this.maxReconnectAttempts = 5;
     this.reconnectInterval = 5000;
     this.listeners = {};
+    this.topics = [];
+    this.lastSeq = null;
   }
 
-  connect() {
+  // topics: e.g. ['kitchen'] or [`session:${sessionId}`]; none receives every event
+  connect(topics = this.topics) {
+    this.topics = topics;
+    const params = new URLSearchParams();
+    if (topics.length) params.set('topics', topics.join(','));
+    // Resume from the last event seen so only missed events are replayed
+    if (this.lastSeq !== null) params.set('last_seq', this.lastSeq);
+    const query = params.toString() ? `?${params.toString()}` : '';
+
     try {
-      this.ws = new WebSocket('ws://localhost:8000/ws');
+      this.ws = new WebSocket(`ws://localhost:8000/ws${query}`);
       
       this.ws.onopen = () => {
         console.log('✅ WebSocket connected');
@@ -41,15 +51,27 @@ class WebSocketService {
       console.log(`🔄 Attempting to reconnect... (${this.reconnectAttempts}/${this.maxReconnectAttempts})`);
       
       setTimeout(() => {
-        this.connect();
+        this.connect(this.topics);
       }, this.reconnectInterval);
     }
   }
 
   handleMessage(data) {
-    const { type, order_id, status, order } = data;
+    const { type, order_id, status, order, seq } = data;
+
+    if (typeof seq === 'number') {
+      this.lastSeq = seq;
+    }
 
     switch (type) {
+      case 'connected':
+        break;
+
+      // Missed more events than the server keeps: refetch the full list
+      case 'resync_required':
+        this.emit('resync', { seq });
+        break;
+
       case 'order_status_update':
         this.emit('orderStatusUpdate', { order_id, status });
         break;
@@ -84,9 +106,11 @@ class WebSocketService {
 
   disconnect() {
     if (this.ws) {
+      this.ws.onclose = null;
       this.ws.close();
       this.ws = null;
     }
+    this.lastSeq = null;
   }
 }
 
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Database migration step
+Waits for MySQL, creates any tables the SQLAlchemy models define that are
+missing, and prints a short schema report. Run it once per deploy, before
+starting the workers; the app itself no longer touches the schema at startup.
+Indexes, views and procedures still come from the database_migration_*.sql files.
+
+Usage:
+  python migrate.py
+  python migrate.py --retries 10
+"""
+
+import argparse
+import importlib
+import pkgutil
+import sys
+
+
+def import_models():
+    """Import every module in app.models so all tables are registered on Base.metadata"""
+    import app.models
+
+    for module in pkgutil.iter_modules(app.models.__path__):
+        importlib.import_module(f"app.models.{module.name}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Create missing tables and verify the database schema")
+    parser.add_argument("--retries", type=int, default=3, help="connection attempts before giving up")
+    parser.add_argument("--retry-delay", type=float, default=2, help="seconds before the first retry, doubled each time")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    from sqlalchemy import inspect
+    from app.db.database import Base, engine, wait_for_database
+
+    if not wait_for_database(args.retries, args.retry_delay):
+        print("❌ Database is not available")
+        return 1
+
+    import_models()
+    existing = set(inspect(engine).get_table_names())
+    missing = [table.name for table in Base.metadata.sorted_tables if table.name not in existing]
+    print(f"🔌 Connected to {engine.dialect.name}: {len(existing)} tables found")
+
+    try:
+        Base.metadata.create_all(bind=engine)
+    except Exception as e:
+        print(f"❌ Creating tables failed: {e}")
+        return 1
+
+    for name in missing:
+        print(f"🆕 Created table {name}")
+    print(f"✅ Schema verified: {len(Base.metadata.tables)} model tables present")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -156,10 +156,11 @@ def test_database_import():
         from app.core.config import DATABASE_URL
         print(f"✅ Config module loaded successfully")
         
-        from app.db.database import engine
+        from app.db.database import engine, wait_for_database
         print(f"✅ Database module loaded successfully")
         
-        return True
+        # Importing no longer connects, so check the connection explicitly
+        return wait_for_database()
         
     except Exception as e:
         print(f"❌ Error importing database modules: {e}")
@@ -194,7 +195,8 @@ def main():
     
     if all_passed:
         print("✅ All checks passed! Ready to start the application.")
-        print("\nStart the server with:")
+        print("\nCreate any missing tables, then start the server:")
+        print("  python migrate.py")
         print("  uvicorn app.main:app --reload --host 0.0.0.0 --port 8000")
         return 0
     else:
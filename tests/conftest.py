@@ -0,0 +1,59 @@
+"""
+Test fixtures
+The app runs against a throwaway SQLite file, with the tables created the
+way migrate.py creates them. Run from the repository root:
+
+  python -m pytest tests
+"""
+
+import os
+import tempfile
+
+# Set before anything imports app.core.config, which reads them at import time
+TEST_DIR = tempfile.mkdtemp(prefix="restaurant-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DIR}/test.db"
+os.environ.setdefault("METRICS_DIR", os.path.join(TEST_DIR, "metrics"))
+os.environ.setdefault("PDF_WORKERS", "0")
+os.environ.setdefault("BILL_CACHE_DIR", os.path.join(TEST_DIR, "bills"))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.query_profiler import profile_queries
+from app.db.database import Base, SessionLocal, engine
+from app.main import app
+from app.services.menu_cache import menu_cache
+from migrate import import_models
+
+import_models()
+
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables, dropped again after the test"""
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+        menu_cache.entries.clear()
+
+
+@pytest.fixture
+def client(db):
+    # Not entered as a context manager: the lifespan (job workers, PDF pool) stays off
+    return TestClient(app)
+
+
+@pytest.fixture
+def query_budget(client):
+    """Send one request and fail the test if it runs more than max_queries SQL statements
+
+    response = query_budget(3, "GET", "/api/kitchen/orders")
+    """
+    def request(max_queries: int, method: str, url: str, **kwargs):
+        with profile_queries(max_queries=max_queries, label=f"{method} {url}"):
+            return client.request(method, url, **kwargs)
+    return request
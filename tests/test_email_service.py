@@ -0,0 +1,119 @@
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.services.email_service import SMTPConnectionPool
+
+FROM = "bills@restaurant.test"
+
+
+class CountingHandler:
+    def __init__(self):
+        self.connections = 0
+        self.recipients = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("unknown"):
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.recipients.extend(envelope.rcpt_tos)
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class SMTPServer:
+    """Local aiosmtpd server that can be stopped and started again on the same port"""
+
+    def __init__(self):
+        self.port = free_port()
+        self.controller = None
+        self.handler = None
+
+    def start(self) -> CountingHandler:
+        self.handler = CountingHandler()
+        self.controller = Controller(self.handler, hostname="127.0.0.1", port=self.port)
+        self.controller.start()
+        return self.handler
+
+    def stop(self):
+        self.controller.stop()
+
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def pool(smtp_server):
+    pool = SMTPConnectionPool("127.0.0.1", smtp_server.port, use_tls=False, size=1, max_messages=4)
+    yield pool
+    pool.close()
+
+
+def messages(count: int, prefix: str = "guest"):
+    return [(f"{prefix}{i}@example.com", f"Subject: Bill {i}\r\n\r\nThank you") for i in range(count)]
+
+
+def test_batch_reuses_connections_up_to_max_messages(smtp_server, pool):
+    errors = pool.send_batch(FROM, messages(10))
+
+    assert errors == [None] * 10
+    assert len(smtp_server.handler.recipients) == 10
+    # 4 + 4 + 2 messages
+    assert smtp_server.handler.connections == 3
+    assert pool.stats()["connections_opened"] == 3
+
+
+def test_single_sends_share_one_connection(smtp_server, pool):
+    for to_addr, message in messages(3):
+        pool.send(FROM, to_addr, message)
+
+    assert smtp_server.handler.connections == 1
+    assert pool.stats()["connections_reused"] == 2
+
+
+def test_rejected_recipient_keeps_the_connection(smtp_server, pool):
+    batch = messages(1) + messages(1, prefix="unknown") + messages(1, prefix="other")
+
+    errors = pool.send_batch(FROM, batch)
+
+    assert errors[0] is None and errors[2] is None
+    assert "No such user" in errors[1]
+    assert smtp_server.handler.connections == 1
+    assert pool.stats()["reconnects"] == 0
+
+
+def test_reconnects_after_the_server_drops_the_connection(smtp_server, pool):
+    pool.send(FROM, *messages(1)[0])
+
+    # Same port, new server: the pooled connection is now dead
+    smtp_server.stop()
+    handler = smtp_server.start()
+
+    pool.send(FROM, *messages(1)[0])
+    assert pool.stats()["reconnects"] == 1
+
+    smtp_server.stop()
+    handler = smtp_server.start()
+
+    assert pool.send_batch(FROM, messages(3)) == [None, None, None]
+    assert len(handler.recipients) == 3
+    assert pool.stats()["reconnects"] == 2
@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import fakeredis
+
+from app.services.event_bus import RedisEventBus
+
+
+class Worker:
+    """One worker's bus, recording what it delivers to its sockets"""
+
+    def __init__(self, server: fakeredis.FakeServer):
+        self.delivered = []
+        self.bus = RedisEventBus(self.deliver, "redis://fake", client=fakeredis.FakeAsyncRedis(server=server))
+
+    async def deliver(self, seq, topics, message, coalesce_key=None):
+        self.delivered.append((seq, topics, json.loads(message), coalesce_key))
+
+    async def publish(self, event: dict, topics=None, coalesce_key=None):
+        seq = await self.bus.next_sequence()
+        await self.bus.publish(seq, topics, json.dumps({**event, "seq": seq}), coalesce_key)
+
+
+async def wait_for(condition, timeout: float = 2):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def wait_for_subscribers(bus: RedisEventBus, count: int, timeout: float = 2):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        [(_, subscribers)] = await bus.client.pubsub_numsub(bus.channel)
+        if subscribers >= count:
+            return
+        assert asyncio.get_running_loop().time() < deadline, "listeners never subscribed"
+        await asyncio.sleep(0.01)
+
+
+async def publish_across_workers():
+    server = fakeredis.FakeServer()
+    publisher, receiver = Worker(server), Worker(server)
+    await publisher.bus.start()
+    await receiver.bus.start()
+    try:
+        # Both listeners subscribed before anything is published
+        await wait_for_subscribers(publisher.bus, 2)
+
+        await publisher.publish({"type": "new_order"}, topics=["kitchen"])
+        await receiver.publish({"type": "order_status_update"}, topics=["order:1"], coalesce_key="order:1")
+        await publisher.publish({"type": "new_order"})
+
+        await wait_for(lambda: len(publisher.delivered) == 3 and len(receiver.delivered) == 3)
+        return publisher.delivered, receiver.delivered
+    finally:
+        await publisher.bus.stop()
+        await receiver.bus.stop()
+
+
+def test_events_reach_every_worker_in_sequence_order():
+    published, received = asyncio.run(publish_across_workers())
+
+    # The shared INCR numbers events the same way on every worker
+    assert [seq for seq, _, _, _ in received] == [1, 2, 3]
+    assert received == published
+    assert received[0][1] == ["kitchen"]
+    assert received[1][2] == {"type": "order_status_update", "seq": 2}
+    assert received[1][3] == "order:1"
+    assert received[2][1] is None
@@ -0,0 +1,9 @@
+def test_metrics_label_requests_with_the_prefixed_route_template(db, client):
+    assert client.get("/api/menu").status_code == 200
+    assert client.get("/api/menu/999").status_code == 404
+
+    body = client.get("/metrics").text
+
+    assert 'route="/api/menu"' in body
+    assert 'route="/api/menu/{item_id}"' in body
+    assert 'route="/menu"' not in body
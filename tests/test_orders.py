@@ -0,0 +1,80 @@
+from app.models.menu import MenuItem
+
+
+def add_menu(db):
+    db.add_all([
+        MenuItem(id=1, name="Dosa", price=60, category="Main"),
+        MenuItem(id=2, name="Coffee", price=30, category="Drinks"),
+    ])
+    db.commit()
+
+
+def place_order(client, **overrides):
+    payload = {
+        "table_number": "T4",
+        "customer_name": "Asha",
+        "phone_number": "9876543210",
+        "items": [{"menu_item_id": 1, "quantity": 2}, {"menu_item_id": 2, "quantity": 1}],
+        **overrides
+    }
+    return client.post("/api/orders", json=payload)
+
+
+def test_place_order_then_update_and_read_it_back(db, client):
+    add_menu(db)
+
+    placed = place_order(client)
+    assert placed.status_code == 200
+    order_id = placed.json()["id"]
+    session_id = placed.json()["session_id"]
+
+    updated = client.put(f"/api/kitchen/orders/{order_id}", json={"status": "kitchen"})
+    assert updated.json() == {"order_id": order_id, "status": "KITCHEN"}
+
+    order = client.get(f"/api/orders/{order_id}").json()
+    assert order["status"] == "KITCHEN"
+    assert order["total_price"] == 150.0
+    assert order["session_id"] == session_id
+    assert order["archived"] is False
+
+    session = client.get(f"/api/sessions/{session_id}").json()
+    assert session["status"] == "ACTIVE"
+    assert [(item["name"], item["quantity"]) for item in session["orders"][0]["items"]] == [("Dosa", 2), ("Coffee", 1)]
+
+
+def test_second_order_joins_the_table_session(db, client):
+    add_menu(db)
+
+    first = place_order(client).json()
+    second = place_order(client, items=[{"menu_item_id": 2, "quantity": 3}]).json()
+
+    assert second["session_id"] == first["session_id"]
+    session = client.get(f"/api/sessions/{first['session_id']}").json()
+    assert [order["id"] for order in session["orders"]] == [first["id"], second["id"]]
+
+
+def test_invalid_requests(db, client):
+    add_menu(db)
+
+    assert place_order(client, items=[{"menu_item_id": 99, "quantity": 1}]).status_code in (400, 404)
+    assert client.put("/api/kitchen/orders/999", json={"status": "ready"}).status_code == 404
+    assert client.get("/api/orders/999").status_code == 404
+    assert client.get("/api/sessions/SES404").status_code == 404
+
+    order_id = place_order(client).json()["id"]
+    assert client.put(f"/api/kitchen/orders/{order_id}", json={"status": "eaten"}).status_code == 400
+
+
+def test_finish_session_closes_it_and_marks_orders_paid(db, client):
+    add_menu(db)
+    placed = place_order(client).json()
+
+    finished = client.post(f"/api/sessions/{placed['session_id']}/finish")
+    assert finished.status_code == 200
+    assert finished.json()["orders"] == [
+        {"id": placed["id"], "order_number": placed["order_number"], "total_price": 150.0, "status": "COMPLETED"}
+    ]
+
+    assert client.get(f"/api/sessions/{placed['session_id']}").json()["status"] == "CLOSED"
+    assert client.post(f"/api/sessions/{placed['session_id']}/finish").status_code == 400
+    assert client.post("/api/sessions/SES404/finish").status_code == 404
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from app.models.customer import Customer
+from app.models.menu import MenuItem
+from app.models.order import Order, OrderItem, OrderStatus
+
+
+def add_orders(db, count: int):
+    db.add(Customer(id=1, name="Guest", phone_number="9999999999"))
+    db.add_all([
+        MenuItem(id=1, name="Dosa", price=60, category="Main"),
+        MenuItem(id=2, name="Coffee", price=30, category="Drinks"),
+    ])
+    now = datetime.now()
+    for i in range(count):
+        created_at = now - timedelta(minutes=i)
+        order = Order(
+            id=i + 1, order_number=f"ORD{i}", customer_id=1, table_number=f"T{i % 3}",
+            status=OrderStatus.KITCHEN, total_price=90, created_at=created_at,
+            order_date=created_at.date(), order_time=created_at.time()
+        )
+        db.add(order)
+        db.flush()
+        db.add_all([
+            OrderItem(order_id=order.id, menu_item_id=1, quantity=1, price=60, subtotal=60),
+            OrderItem(order_id=order.id, menu_item_id=2, quantity=1, price=30, subtotal=30),
+        ])
+    db.commit()
+
+
+def test_kitchen_orders_query_count_does_not_grow_with_orders(db, query_budget):
+    add_orders(db, 20)
+
+    response = query_budget(3, "GET", "/api/kitchen/orders")
+
+    assert response.status_code == 200
+    orders = response.json()
+    assert len(orders) == 20
+    assert orders[0]["customer_name"] == "Guest"
+    assert sorted(item["name"] for item in orders[0]["items"]) == ["Coffee", "Dosa"]
+
+
+def test_menu_is_served_from_cache(db, query_budget):
+    add_orders(db, 1)
+
+    first = query_budget(2, "GET", "/api/menu")
+    assert first.status_code == 200
+    assert [item["name"] for item in first.json()] == ["Coffee", "Dosa"]
+
+    # Only the cache version check once the menu is cached
+    again = query_budget(1, "GET", "/api/menu")
+    assert again.content == first.content
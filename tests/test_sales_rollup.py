@@ -0,0 +1,40 @@
+from app.models.order import Order, OrderStatus
+from app.models.sales_rollup import DailySales, ItemSales, RolledUpOrder
+from app.services.sales_rollup import claim_orders, record_paid_orders
+from tests.test_query_budgets import add_orders
+
+
+def paid_orders(db, count: int):
+    add_orders(db, count)
+    orders = db.query(Order).order_by(Order.id).all()
+    for order in orders:
+        order.status = OrderStatus.COMPLETED
+    db.commit()
+    return orders
+
+
+def test_claim_skips_orders_another_request_already_claimed(db):
+    orders = paid_orders(db, 3)
+    # Committed by a concurrent bill request after this one read the rollup table
+    db.add(RolledUpOrder(order_id=orders[1].id, sales_date=orders[1].created_at.date()))
+    db.commit()
+
+    claimed = claim_orders(db, orders)
+
+    assert [order.id for order in claimed] == [orders[0].id, orders[2].id]
+    assert db.query(RolledUpOrder).count() == 3
+
+
+def test_orders_are_counted_once(db):
+    orders = paid_orders(db, 3)
+
+    assert record_paid_orders(db, orders) == 3
+    db.commit()
+    assert record_paid_orders(db, orders) == 0
+    db.commit()
+
+    days = db.query(DailySales).all()
+    assert sum(day.orders_count for day in days) == 3
+    assert sum(day.items_sold for day in days) == 6
+    assert sum(float(day.revenue) for day in days) == 270.0
+    assert sum(row.quantity for row in db.query(ItemSales)) == 6
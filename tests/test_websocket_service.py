@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+from app.services.websocket_service import KITCHEN_TOPIC, WS_MAX_QUEUE, WebSocketManager
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        self.sent.append(json.loads(message))
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+async def reconnect_after(events: int, last_seq: int) -> FakeWebSocket:
+    manager = WebSocketManager()
+    for i in range(events):
+        await manager.broadcast_new_order({"id": i + 1, "table_number": "T1"})
+
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, [KITCHEN_TOPIC], last_seq=last_seq)
+    # Let the sender task drain the client queue
+    await asyncio.sleep(0.05)
+    manager.disconnect(websocket)
+    return websocket
+
+
+def test_resume_replays_missed_events():
+    websocket = asyncio.run(reconnect_after(30, last_seq=10))
+
+    assert websocket.close_code is None
+    assert [event["seq"] for event in websocket.sent] == list(range(11, 31))
+
+
+def test_resume_beyond_the_client_queue_asks_for_a_resync():
+    # Still inside the replay buffer, but more than one client queue holds
+    websocket = asyncio.run(reconnect_after(WS_MAX_QUEUE + 50, last_seq=10))
+
+    assert websocket.close_code is None
+    assert websocket.sent == [{"type": "resync_required", "seq": WS_MAX_QUEUE + 50}]